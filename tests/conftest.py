@@ -0,0 +1,9 @@
+"""
+Shared pytest fixtures for the utils package
+"""
+
+import os
+import sys
+
+# Make "import utils" work when pytest is run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
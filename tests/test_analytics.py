@@ -0,0 +1,76 @@
+"""
+Tests for results summaries, run comparison and regression detection
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.analytics import attach_labels, compare_runs, detect_regressions, summarize
+
+
+def _results(n=400, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "row_index": np.arange(n),
+        "faithfulness": np.clip(rng.uniform(0.3, 0.9, n) + shift, 0, 1),
+        "context_recall": rng.uniform(0.0, 1.0, n),
+        "scenario": np.where(np.arange(n) % 2, "perfect", "low_context_recall"),
+    })
+
+
+def test_summary_matches_pandas_statistics():
+    results = _results()
+    results.loc[3, "faithfulness"] = np.nan
+
+    summary = summarize(results, ["faithfulness"], quantiles=(0.5,), n_boot=200)
+    values = results["faithfulness"].dropna()
+
+    row = summary.loc["faithfulness"]
+    assert row["count"] == len(values)
+    assert row["mean"] == pytest.approx(values.mean())
+    assert row["std"] == pytest.approx(values.std())
+    assert row["p50"] == pytest.approx(values.median())
+    assert row["ci_low"] < row["mean"] < row["ci_high"]
+
+
+def test_summary_groups_by_scenario_and_tags():
+    results = _results(8)
+    results["tags"] = [["a"], ["a", "b"]] * 4
+
+    by_scenario = summarize(results, ["faithfulness"], by="scenario", n_boot=0)
+    by_tag = summarize(results, ["faithfulness"], by="tags", n_boot=0)
+
+    assert by_scenario.loc[("perfect", "faithfulness"), "count"] == 4
+    assert by_tag.loc[("a", "faithfulness"), "count"] == 8
+    assert by_tag.loc[("b", "faithfulness"), "count"] == 4
+
+
+def test_attach_labels_aligns_on_row_index():
+    shard = pd.DataFrame({"row_index": [2, 0], "faithfulness": [0.1, 0.9]})
+
+    labelled = attach_labels(shard, ["x", "y", "z"])
+
+    assert labelled["scenario"].tolist() == ["z", "x"]
+    with pytest.raises(ValueError):
+        attach_labels(pd.DataFrame({"faithfulness": [0.1, 0.9]}), ["x"])
+
+
+def test_compare_runs_paired_delta():
+    baseline = _results()
+    candidate = baseline.assign(faithfulness=baseline["faithfulness"] - 0.1)
+
+    table = compare_runs(baseline, candidate, ["faithfulness"], on="row_index", n_boot=200)
+
+    row = table.loc["faithfulness"]
+    assert row["delta"] == pytest.approx(-0.1, abs=0.01)
+    assert row["delta_ci_high"] < 0
+
+
+def test_detect_regressions_ignores_noise_and_flags_drops():
+    baseline = _results(seed=1)
+
+    assert detect_regressions(baseline, _results(seed=2), ["faithfulness"], n_boot=200).empty
+    regressed = detect_regressions(baseline, _results(shift=-0.2, seed=2), ["faithfulness"],
+                                   n_boot=200)
+    assert list(regressed.index) == ["faithfulness"]
@@ -0,0 +1,70 @@
+"""
+Tests for packing judge prompts into batched requests
+"""
+
+import asyncio
+import json
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from utils.batch_judge import BatchedChatModel, pack_requests, split_usage, unpack_replies
+
+
+class _ArrayModel(BaseChatModel):
+    """Answers a packed batch with one reply per request and fixed token usage"""
+
+    calls: list = []
+
+    @property
+    def _llm_type(self):
+        return "array"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise NotImplementedError
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls.append(kwargs)
+        requests = json.loads(messages[-1].content)
+        replies = [f"reply {request['id']}" for request in requests]
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=json.dumps(replies)))],
+            llm_output={"token_usage": {"prompt_tokens": 100, "completion_tokens": 11, "total_tokens": 111}},
+        )
+
+
+def test_split_usage_keeps_the_remainder():
+    usage = {"prompt_tokens": 100, "completion_tokens": 11, "model": "x"}
+
+    shares = [split_usage(usage, 3, index) for index in range(3)]
+
+    assert [share["completion_tokens"] for share in shares] == [4, 4, 3]
+    assert sum(share["prompt_tokens"] for share in shares) == 100
+    assert "model" not in shares[0]
+
+
+def test_pack_and_unpack_round_trip():
+    packed = pack_requests([[HumanMessage(content="a")], [HumanMessage(content="b")]])
+
+    assert [request["id"] for request in json.loads(packed[-1].content)] == [0, 1]
+    assert unpack_replies('```json\n["x", {"y": 1}]\n```', 2) == ["x", '{"y": 1}']
+    assert unpack_replies('["x"]', 2) is None
+
+
+def test_batch_usage_adds_up_and_max_tokens_grows_with_the_batch():
+    inner = _ArrayModel(calls=[])
+    llm = BatchedChatModel(llm=inner, max_batch_size=3, max_wait=0.5)
+
+    async def judge():
+        return await asyncio.gather(*(
+            llm._agenerate([HumanMessage(content=f"prompt {i}")]) for i in range(3)
+        ))
+
+    results = asyncio.run(judge())
+
+    assert [r.generations[0].text for r in results] == ["reply 0", "reply 1", "reply 2"]
+    assert sum(r.llm_output["token_usage"]["total_tokens"] for r in results) == 111
+    # 1000 completion tokens per item when the wrapped model sets no limit
+    assert inner.calls == [{"max_tokens": 3000}]
+    assert llm.stats()["requests_saved"] == 2
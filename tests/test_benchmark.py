@@ -0,0 +1,87 @@
+"""
+Tests for the evaluation pipeline benchmark helpers
+"""
+
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from utils import benchmark
+from utils.benchmark import (
+    benchmark_size, benchmark_size_in_subprocess, compare_to_baseline, latency_percentiles
+)
+
+
+def _report(rows_per_sec, p95_ms, peak_memory_mb=None):
+    return {"results": [{
+        "rows": 50,
+        "rows_per_sec": rows_per_sec,
+        "peak_memory_mb": peak_memory_mb,
+        "metrics": {"faithfulness": {"p95_ms": p95_ms}},
+    }]}
+
+
+def test_latency_percentiles_in_milliseconds():
+    result = latency_percentiles([0.01] * 99 + [1.0])
+
+    assert result["count"] == 100
+    assert result["p50_ms"] == pytest.approx(10.0)
+    assert result["p99_ms"] > result["p50_ms"]
+    assert latency_percentiles([])["p95_ms"] is None
+
+
+def test_compare_to_baseline_flags_throughput_and_latency():
+    assert compare_to_baseline(_report(10.0, 100.0), _report(10.5, 95.0)) == []
+
+    messages = compare_to_baseline(_report(5.0, 200.0), _report(10.0, 100.0))
+
+    assert len(messages) == 2
+    assert "throughput" in messages[0]
+    assert "faithfulness p95" in messages[1]
+
+
+def test_benchmark_size_times_evaluation_and_reports_peak_rss(monkeypatch):
+    evaluated = []
+
+    def evaluate(dataset, metrics, llm=None, embeddings=None, callbacks=None, **kwargs):
+        evaluated.append(len(dataset))
+
+    monkeypatch.setitem(sys.modules, "ragas", SimpleNamespace(evaluate=evaluate))
+    metric = SimpleNamespace(name="faithfulness")
+
+    result = benchmark_size(20, [metric], llm=None, embeddings=None)
+
+    assert evaluated == [20]
+    assert result["rows"] == 20
+    assert result["rows_per_sec"] > 0
+    assert result["metrics"]["faithfulness"]["count"] == 0
+    if benchmark.resource is not None:
+        assert result["peak_memory_mb"] > 1
+
+
+def test_compare_to_baseline_flags_peak_memory():
+    assert compare_to_baseline(_report(10.0, 100.0, 105.0), _report(10.0, 100.0, 100.0)) == []
+
+    messages = compare_to_baseline(_report(10.0, 100.0, 150.0), _report(10.0, 100.0, 100.0))
+
+    assert messages == ["50 rows: peak RSS 150.0 MB > baseline 100.0 MB"]
+
+
+def test_each_size_runs_in_its_own_process(monkeypatch):
+    launched = []
+
+    def run(command, cwd=None, env=None, check=False):
+        launched.append((command, env["AZURE_ENDPOINT"]))
+        output = command[command.index("--worker-output") + 1]
+        with open(output, "w") as f:
+            json.dump({"rows": int(command[command.index("--worker-size") + 1])}, f)
+
+    monkeypatch.setattr(benchmark.subprocess, "run", run)
+
+    results = [benchmark_size_in_subprocess(size, "http://mock") for size in (50, 200)]
+
+    assert results == [{"rows": 50}, {"rows": 200}]
+    assert [command[1:3] for command, _ in launched] == [["-m", "utils.benchmark"]] * 2
+    assert {endpoint for _, endpoint in launched} == {"http://mock"}
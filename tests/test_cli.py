@@ -0,0 +1,118 @@
+"""
+Tests for sharded evaluation: shard ranges, shard loading and merging parts
+"""
+
+import json
+import os
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+import utils.langchain_wrappers
+from utils.cli import aggregate_scores, merge_parts, part_path, read_shard, run_shard, shard_bounds
+from utils.dataset_creator import (
+    count_dataset_rows, iter_synthetic_rows, load_dataset_file, load_dataset_rows, save_dataset
+)
+
+
+@pytest.mark.parametrize("num_rows,num_shards", [(10, 3), (7, 7), (2, 5), (0, 2)])
+def test_shard_bounds_cover_every_row_once(num_rows, num_shards):
+    bounds = [shard_bounds(num_rows, num_shards, index) for index in range(num_shards)]
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == num_rows
+    assert all(end == start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+    sizes = [end - start for start, end in bounds]
+    assert max(sizes) - min(sizes) <= 1
+    with pytest.raises(ValueError):
+        shard_bounds(num_rows, num_shards, num_shards)
+
+
+@pytest.fixture(params=["csv", "jsonl", "parquet"])
+def dataset_file(request, tmp_path):
+    """Dataset of 25 rows written in chunks of 4 (several Parquet row groups)"""
+    path = str(tmp_path / f"data.{request.param}")
+    save_dataset(iter_synthetic_rows(25, num_contexts=2), path, chunk_size=4)
+    return path
+
+
+def test_count_dataset_rows(dataset_file):
+    assert count_dataset_rows(dataset_file, chunk_size=3) == 25
+
+
+@pytest.mark.parametrize("start,end", [(0, 25), (0, 4), (3, 9), (8, 12), (24, 25), (5, 5)])
+def test_load_dataset_rows_matches_full_load(dataset_file, start, end):
+    full = load_dataset_file(dataset_file)
+
+    rows = load_dataset_rows(dataset_file, start, end, chunk_size=3)
+
+    assert len(rows) == end - start
+    if len(rows):
+        expected = full.iloc[start:end].reset_index(drop=True)
+        pd.testing.assert_frame_equal(rows, expected)
+        assert isinstance(rows["retrieved_contexts"].iloc[0], list)
+
+
+def test_read_shard_reads_only_its_range(dataset_file):
+    rows, start, end, num_rows = read_shard(dataset_file, num_shards=3, shard_index=1)
+
+    assert (start, end, num_rows) == (9, 17, 25)
+    assert rows["question"].tolist() == load_dataset_file(dataset_file)["question"].iloc[9:17].tolist()
+
+
+def _write_part(output_dir, index, num_shards, row_indices, num_rows):
+    part = part_path(output_dir, index, num_shards)
+    with open(part, "w") as f:
+        for row_index in row_indices:
+            f.write(json.dumps({"row_index": row_index, "faithfulness": row_index / 10}) + "\n")
+    with open(f"{part}.done.json", "w") as f:
+        json.dump({"num_rows": num_rows}, f)
+
+
+def test_merge_parts_orders_rows_and_checks_coverage(tmp_path):
+    output_dir = str(tmp_path / "parts")
+    os.makedirs(output_dir)
+    _write_part(output_dir, 1, 2, [2, 3], 4)
+    _write_part(output_dir, 0, 2, [0, 1], 4)
+
+    merged = merge_parts(output_dir, str(tmp_path / "store"))
+
+    assert merged["row_index"].tolist() == [0, 1, 2, 3]
+    assert aggregate_scores(merged) == {"faithfulness": pytest.approx(0.15)}
+
+
+def test_merge_parts_rejects_gaps_and_unfinished_shards(tmp_path):
+    output_dir = str(tmp_path / "parts")
+    os.makedirs(output_dir)
+    _write_part(output_dir, 0, 2, [0, 1], 5)
+    _write_part(output_dir, 1, 2, [2, 3], 5)
+
+    with pytest.raises(ValueError, match="gaps"):
+        merge_parts(output_dir, str(tmp_path / "store"))
+
+    os.remove(f"{part_path(output_dir, 1, 2)}.done.json")
+    with pytest.raises(ValueError, match="not finished"):
+        merge_parts(output_dir, str(tmp_path / "store"))
+
+
+def test_more_shards_than_rows_merge(tmp_path, monkeypatch):
+    def evaluate(dataset, metrics, llm=None, embeddings=None, **kwargs):
+        scores = dataset.to_pandas().assign(faithfulness=0.5)
+        return types.SimpleNamespace(to_pandas=lambda: scores)
+
+    metrics = types.SimpleNamespace(faithfulness=types.SimpleNamespace(name="faithfulness"))
+    monkeypatch.setitem(sys.modules, "ragas", types.SimpleNamespace(evaluate=evaluate, metrics=metrics))
+    monkeypatch.setattr(utils.langchain_wrappers, "create_langchain_llm", lambda *a, **k: None)
+    monkeypatch.setattr(utils.langchain_wrappers, "create_langchain_embeddings", lambda *a, **k: None)
+    dataset = str(tmp_path / "data.jsonl")
+    save_dataset(iter_synthetic_rows(2), dataset)
+    output_dir = str(tmp_path / "parts")
+
+    for index in range(3):
+        run_shard(dataset, ["faithfulness"], num_shards=3, shard_index=index, output_dir=output_dir)
+    merged = merge_parts(output_dir, str(tmp_path / "store"))
+
+    assert os.path.getsize(part_path(output_dir, 2, 3)) == 0
+    assert merged["row_index"].tolist() == [0, 1]
+    assert aggregate_scores(merged) == {"faithfulness": pytest.approx(0.5)}
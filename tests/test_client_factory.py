@@ -0,0 +1,108 @@
+"""
+Tests for configuration loading and the shared HTTP clients
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from utils import client_factory
+from utils.client_factory import (
+    get_async_http_client,
+    get_http_client,
+    load_api_config,
+    reset_clients,
+)
+from utils.mock_dial_server import MockDialServer
+
+
+@pytest.fixture(autouse=True)
+def clean_clients(monkeypatch):
+    # Keep a developer's .env out of the tests
+    monkeypatch.setattr(client_factory, "load_dotenv", lambda: None)
+    reset_clients()
+    yield
+    reset_clients()
+
+
+def test_missing_key_is_not_cached(monkeypatch):
+    monkeypatch.delenv("DIAL_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        load_api_config()
+
+    monkeypatch.setenv("DIAL_API_KEY", "late-key")
+
+    assert load_api_config()[0] == "late-key"
+
+
+def test_settings_are_cached_until_reset(monkeypatch):
+    monkeypatch.setenv("DIAL_API_KEY", "first")
+    assert load_api_config()[0] == "first"
+
+    monkeypatch.setenv("DIAL_API_KEY", "second")
+    assert load_api_config()[0] == "first"
+
+    reset_clients()
+    assert load_api_config()[0] == "second"
+
+
+def test_clients_are_shared_until_reset():
+    sync_client, async_client = get_http_client(), get_async_http_client()
+
+    assert get_http_client() is sync_client
+    assert get_async_http_client() is async_client
+
+    reset_clients()
+
+    assert sync_client.is_closed
+    assert get_http_client() is not sync_client
+    assert get_async_http_client() is not async_client
+
+
+def test_reset_closes_async_pools_of_open_loops(monkeypatch):
+    closed = []
+    original = httpx.AsyncHTTPTransport.aclose
+
+    async def aclose(transport):
+        closed.append(transport)
+        await original(transport)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "aclose", aclose)
+    loop = asyncio.new_event_loop()
+    try:
+        with MockDialServer() as server:
+            client = get_async_http_client()
+            response = loop.run_until_complete(
+                client.get(server.base_url + "/openai/deployments", headers={"api-key": "k"})
+            )
+            assert response.status_code == 200
+
+            reset_clients()
+
+            assert len(closed) == 1
+            with pytest.raises(RuntimeError):
+                loop.run_until_complete(client.get(server.base_url + "/openai/deployments"))
+    finally:
+        loop.close()
+
+
+def test_reset_inside_running_loop_closes_pool_in_background(monkeypatch):
+    closed = []
+    original = httpx.AsyncHTTPTransport.aclose
+
+    async def aclose(transport):
+        closed.append(transport)
+        await original(transport)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "aclose", aclose)
+
+    async def main(server):
+        await get_async_http_client().get(server.base_url + "/openai/deployments", headers={"api-key": "k"})
+        reset_clients()
+        await asyncio.sleep(0.01)
+
+    with MockDialServer() as server:
+        asyncio.run(main(server))
+
+    assert len(closed) == 1
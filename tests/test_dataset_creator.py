@@ -0,0 +1,113 @@
+"""
+Tests for synthetic dataset generation and dataset files
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from utils.dataset_creator import (
+    SCENARIOS, iter_synthetic_rows, iter_trace_rows, load_dataset_file, save_dataset
+)
+
+
+@pytest.mark.parametrize("num_contexts", [1, 3, 10])
+def test_synthetic_rows_have_exactly_num_contexts_unique_chunks(num_contexts):
+    rows = list(iter_synthetic_rows(4 * len(SCENARIOS), num_contexts=num_contexts))
+
+    for row in rows:
+        assert len(row["retrieved_contexts"]) == num_contexts, row["scenario"]
+        assert len(set(row["retrieved_contexts"])) == num_contexts, row["scenario"]
+
+
+def test_synthetic_rows_honour_context_range():
+    for row in iter_synthetic_rows(60, num_contexts=(2, 7), seed=3):
+        assert 2 <= len(row["retrieved_contexts"]) <= 7
+
+
+def test_low_context_precision_ranks_relevant_chunk_last():
+    rows = iter_synthetic_rows(10, scenarios=("low_context_precision",), num_contexts=4)
+
+    for row in rows:
+        assert row["answer"] in row["retrieved_contexts"][-1]
+        assert not any(row["answer"] in chunk for chunk in row["retrieved_contexts"][:-1])
+
+
+def test_synthetic_rows_are_reproducible_by_seed():
+    first = list(iter_synthetic_rows(12, num_contexts=3, seed=7))
+
+    assert first == list(iter_synthetic_rows(12, num_contexts=3, seed=7))
+    assert first != list(iter_synthetic_rows(12, num_contexts=3, seed=8))
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl", "parquet"])
+def test_streamed_dataset_round_trips(tmp_path, extension):
+    rows = list(iter_synthetic_rows(25, num_contexts=2))
+    filename = str(tmp_path / f"data.{extension}")
+
+    save_dataset(iter(rows), filename, chunk_size=10)
+    loaded = load_dataset_file(filename)
+
+    assert len(loaded) == 25
+    assert loaded["retrieved_contexts"].tolist() == [row["retrieved_contexts"] for row in rows]
+    assert loaded["scenario"].tolist() == [row["scenario"] for row in rows]
+
+
+def test_unknown_extension_is_saved_as_csv(tmp_path):
+    filename = str(tmp_path / "data.txt")
+
+    save_dataset(pd.DataFrame({"question": ["q1", "q2"], "answer": ["a1", "a2"]}), filename)
+
+    assert pd.read_csv(filename)["question"].tolist() == ["q1", "q2"]
+
+
+def _write_traces(path, questions):
+    with open(path, "w") as f:
+        for question in questions:
+            f.write(json.dumps({"query": question, "output": f"answer to {question}"}) + "\n")
+
+
+def test_trace_rows_dedupe_exactly_or_within_a_window(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    _write_traces(path, ["a", "b", "A ", "c", "a", "b"])
+
+    exact = [row["question"] for row in iter_trace_rows(path)]
+    stats = {}
+    windowed = [row["question"] for row in iter_trace_rows(path, dedupe_window=2, stats=stats)]
+
+    assert exact == ["a", "b", "c"]
+    # "a" is refreshed by its near repeat "A "; "b" has left the window when it comes back
+    assert windowed == ["a", "b", "c", "b"]
+    assert stats["duplicate"] == 2
+
+
+@pytest.mark.parametrize("pattern", ["missing.jsonl", "*.jsonl", "."])
+def test_trace_paths_without_files_raise(tmp_path, monkeypatch, pattern):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "notes.txt").write_text("not a trace")
+
+    with pytest.raises(FileNotFoundError):
+        next(iter_trace_rows(pattern))
+
+
+def test_parquet_columns_null_in_the_first_chunk_take_later_values(tmp_path):
+    path = str(tmp_path / "traces.parquet")
+    rows = [{"question": f"q{i}", "answer": "a", "ground_truth": None if i < 3 else "g",
+             "retrieved_contexts": [], "trace_id": None if i < 3 else f"t{i}"} for i in range(5)]
+
+    save_dataset(iter(rows), path, chunk_size=2)
+
+    loaded = load_dataset_file(path)
+    assert loaded["ground_truth"].tolist()[3:] == ["g", "g"]
+    assert loaded["trace_id"].tolist()[3:] == ["t3", "t4"]
+
+
+def test_scenarios_are_weighted_explicitly():
+    rows = iter_synthetic_rows(6, scenarios={"perfect": 2, "partial_answer": 1})
+    weighted = [row["scenario"] for row in rows]
+
+    assert weighted == ["perfect", "perfect", "partial_answer"] * 2
+    assert len(set(SCENARIOS)) == len(SCENARIOS)
+    with pytest.raises(ValueError):
+        list(iter_synthetic_rows(2, scenarios=("perfect", "perfect")))
@@ -0,0 +1,82 @@
+"""
+Tests for the memory-mapped embedding store and the deduplicating wrapper
+"""
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from utils.embedding_store import CachedEmbeddings, EmbeddingStore, text_key
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    calls: list = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def _vectors(*values, dim=4):
+    return np.array([[value] * dim for value in values], dtype=np.float32)
+
+
+def test_put_and_get(tmp_path):
+    store = EmbeddingStore(str(tmp_path), model="model")
+    store.put_many(["a", "b"], _vectors(1.0, 2.0))
+
+    found = store.get_many(["a", "b", "missing"])
+
+    assert set(found) == {"a", "b"}
+    np.testing.assert_array_equal(found["b"], _vectors(2.0)[0])
+    assert len(store) == 2
+
+
+def test_existing_keys_are_not_appended_twice(tmp_path):
+    store = EmbeddingStore(str(tmp_path), model="model")
+    store.put_many(["a"], _vectors(1.0))
+    store.put_many(["a", "b"], _vectors(9.0, 2.0))
+
+    np.testing.assert_array_equal(store.get_many(["a"])["a"], _vectors(1.0)[0])
+    assert (tmp_path / "model" / "vectors.f32").stat().st_size == 2 * 4 * 4
+
+
+def test_partial_trailing_row_is_discarded_before_appending(tmp_path):
+    store = EmbeddingStore(str(tmp_path), model="model")
+    store.put_many(["a", "b"], _vectors(1.0, 2.0))
+    # Simulate a writer killed in the middle of a row
+    with open(store.vectors_path, "ab") as f:
+        f.write(b"\x00" * 6)
+
+    store.put_many(["c"], _vectors(2.3))
+
+    reopened = EmbeddingStore(str(tmp_path), model="model")
+    found = reopened.get_many(["a", "b", "c"])
+    np.testing.assert_array_equal(found["a"], _vectors(1.0)[0])
+    np.testing.assert_array_equal(found["c"], _vectors(2.3)[0])
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    store = EmbeddingStore(str(tmp_path), model="model")
+    store.put_many(["a"], _vectors(1.0))
+    with pytest.raises(ValueError):
+        store.put_many(["b"], _vectors(1.0, dim=3))
+    assert len(store) == 1
+
+
+def test_cached_embeddings_embed_each_text_once(tmp_path):
+    inner = CountingEmbeddings(size=8, calls=[])
+    embeddings = CachedEmbeddings(inner, EmbeddingStore(str(tmp_path), model="fake"), batch_size=2)
+
+    first = embeddings.embed_documents(["x", "y", "x", "z"])
+    second = embeddings.embed_documents(["z", "y"])
+
+    assert [len(batch) for batch in inner.calls] == [2, 1]
+    assert first[0] == first[2]
+    assert second == [first[3], first[1]]
+    assert embeddings.stats() == {"requested": 6, "embedded": 3, "stored": 3}
+
+
+def test_text_key_is_content_addressed():
+    assert text_key("same") == text_key("same")
+    assert text_key("same") != text_key("other")
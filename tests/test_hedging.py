@@ -0,0 +1,95 @@
+"""
+Tests for hedged, deadline-bounded requests
+"""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from utils.hedging import HedgedChatModel, RequestHedger
+
+
+class _SlowModel(BaseChatModel):
+    """Answers with its name after a fixed delay, sync and async"""
+
+    name: str
+    delay: float
+
+    @property
+    def _llm_type(self):
+        return "slow"
+
+    def _result(self):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.name))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.delay)
+        return self._result()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        return self._result()
+
+
+def _hedged(delays, **options):
+    return HedgedChatModel(
+        llms=[_SlowModel(name=f"d{i}", delay=delay) for i, delay in enumerate(delays)],
+        deployments=[f"d{i}" for i in range(len(delays))],
+        initial_delay=0.05,
+        **options
+    )
+
+
+def test_sync_calls_are_hedged():
+    llm = _hedged([1.0, 0.01])
+
+    generation = llm._generate([HumanMessage(content="q")]).generations[0]
+
+    assert generation.text == "d1"
+    assert generation.generation_info == {"deployment": "d1", "hedged": True}
+    assert llm.stats()["hedges_won"] == 1
+
+
+def test_sync_calls_respect_the_deadline():
+    llm = _hedged([1.0], deadline=0.1)
+
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        llm._generate([HumanMessage(content="q")])
+
+    assert time.perf_counter() - start < 0.5
+    assert llm.stats()["deadline_exceeded"] == 1
+
+
+def test_losers_and_timeouts_record_their_latency():
+    hedger = RequestHedger(["a", "b"], initial_delay=0.05, deadline=0.2)
+
+    async def answer(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    async def race():
+        await hedger.run([lambda: answer(1.0), lambda: answer(0.01)])
+        with pytest.raises(TimeoutError):
+            await hedger.run([lambda: answer(1.0), lambda: answer(1.0)])
+
+    asyncio.run(race())
+
+    latencies = sorted(hedger._latencies)
+    # Winner, cancelled loser, and both requests cut off by the deadline
+    assert len(latencies) == 4
+    assert latencies[0] < 0.05
+    assert latencies[1] >= 0.05 and latencies[-1] >= 0.15
+
+
+def test_hedge_delay_follows_the_observed_quantile():
+    hedger = RequestHedger(["a", "b"], min_samples=5, hedge_quantile=0.5, min_delay=0.0)
+    assert hedger.hedge_delay() == hedger.initial_delay
+
+    hedger._latencies.extend([0.1, 0.2, 0.3, 0.4, 0.5])
+
+    assert hedger.hedge_delay() == pytest.approx(0.3)
@@ -0,0 +1,56 @@
+"""
+Tests for the import-time report and the lazy imports it guards
+"""
+
+import subprocess
+import sys
+
+from utils.import_benchmark import _PROJECT_ROOT, check_budgets, compare_to_baseline, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:       200 |        900 | utils
+import time:       300 |        700 |   utils.cli
+"""
+
+
+def _report(**times):
+    return {"results": [{"statement": name, "import_ms": ms} for name, ms in times.items()]}
+
+
+def test_parse_importtime_reads_depth_and_times():
+    assert parse_importtime(IMPORTTIME) == [
+        ("_io", 100, 100, 1),
+        ("utils", 200, 900, 0),
+        ("utils.cli", 300, 700, 1),
+    ]
+
+
+def test_check_budgets_flags_only_slow_targets():
+    report = _report(a=10.0, b=80.0, c=500.0)
+
+    assert check_budgets(report, {"a": 50.0, "b": 50.0}) == ["b: 80.0 ms > budget 50.0 ms"]
+
+
+def test_compare_to_baseline_ignores_noise():
+    baseline = _report(a=10.0, b=100.0)
+
+    assert compare_to_baseline(_report(a=14.0, b=120.0), baseline) == []
+    assert compare_to_baseline(_report(a=14.0, b=130.0, new=1e6), baseline) == [
+        "b: 130.0 ms > baseline 100.0 ms"
+    ]
+
+
+def test_plain_model_factory_does_not_import_optional_wrappers():
+    optional = ("pandas", "utils.telemetry", "utils.hedging", "utils.rate_limiter",
+                "utils.embedding_store", "utils.batch_judge", "utils.model_explorer")
+    code = (
+        "import sys; from utils import create_langchain_llm, create_langchain_embeddings; "
+        f"print([m for m in {optional!r} if m in sys.modules])"
+    )
+
+    completed = subprocess.run([sys.executable, "-c", code], cwd=_PROJECT_ROOT,
+                               capture_output=True, text=True, check=True)
+
+    assert completed.stdout.strip() == "[]"
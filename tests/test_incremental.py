@@ -0,0 +1,100 @@
+"""
+Tests for fingerprint-based incremental evaluation
+"""
+
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+from utils.incremental import compute_fingerprints, evaluate_incremental, plan_reevaluation
+from utils.results_store import load_results
+
+
+class FakeMetric:
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.fixture
+def fake_ragas(monkeypatch):
+    """ragas stand-in that scores each row by its answer length and records batch sizes"""
+    calls = []
+
+    def evaluate(dataset, metrics, llm=None, embeddings=None, **kwargs):
+        df = dataset.to_pandas()
+        calls.append(([metric.name for metric in metrics], len(df)))
+        scores = pd.DataFrame({metric.name: [len(a) / 10 for a in df["answer"]] for metric in metrics})
+        return types.SimpleNamespace(to_pandas=lambda: scores)
+
+    monkeypatch.setitem(sys.modules, "ragas", types.SimpleNamespace(evaluate=evaluate))
+    return calls
+
+
+def _dataset(answers=("a", "bb", "ccc")):
+    return pd.DataFrame({
+        "question": [f"q{i}" for i in range(len(answers))],
+        "answer": list(answers),
+        "ground_truth": ["g"] * len(answers),
+        "retrieved_contexts": [["c"]] * len(answers),
+        "scenario": ["perfect", "low_faithfulness", "perfect"][:len(answers)],
+    })
+
+
+def test_fingerprints_only_change_with_the_metric_inputs():
+    metrics = [FakeMetric("faithfulness"), FakeMetric("context_recall")]
+    before = compute_fingerprints(_dataset(), metrics, metric_versions={})
+    after = compute_fingerprints(_dataset(("a", "changed", "ccc")), metrics, metric_versions={})
+
+    assert (before["faithfulness_fp"] != after["faithfulness_fp"]).tolist() == [False, True, False]
+    # context_recall does not read the answer
+    assert (before["context_recall_fp"] == after["context_recall_fp"]).all()
+
+
+def test_plan_reuses_fresh_scores_and_retries_failures():
+    metric = FakeMetric("faithfulness")
+    fingerprints = compute_fingerprints(_dataset(), [metric], metric_versions={"faithfulness": "v1"})
+    previous = pd.DataFrame({
+        "user_input": ["q0", "q1", "q2"],
+        "faithfulness": [0.1, float("nan"), 0.3],
+        "faithfulness_fp": fingerprints["faithfulness_fp"],
+    })
+
+    _, stale, prior = plan_reevaluation(_dataset(), [metric], previous,
+                                        metric_versions={"faithfulness": "v1"})
+
+    assert stale["faithfulness"].tolist() == [False, True, False]
+    assert prior["faithfulness"].tolist()[::2] == [0.1, 0.3]
+
+
+def test_second_run_only_scores_changed_rows(tmp_path, fake_ragas):
+    path = str(tmp_path / "store")
+    metrics = [FakeMetric("faithfulness")]
+
+    evaluate_incremental(_dataset(), metrics, previous_path=path)
+    results = evaluate_incremental(_dataset(("a", "changed", "ccc")), metrics, previous_path=path)
+
+    assert fake_ragas == [(["faithfulness"], 3), (["faithfulness"], 1)]
+    assert results["faithfulness"].tolist() == pytest.approx([0.1, 0.7, 0.3])
+    assert load_results(path)["faithfulness"].tolist() == pytest.approx([0.1, 0.7, 0.3])
+
+
+def test_dataset_columns_are_carried_through(tmp_path, fake_ragas):
+    path = str(tmp_path / "store")
+
+    results = evaluate_incremental(_dataset(), [FakeMetric("faithfulness")], previous_path=path)
+
+    assert results["scenario"].tolist() == ["perfect", "low_faithfulness", "perfect"]
+    assert load_results(path)["scenario"].tolist() == results["scenario"].tolist()
+    assert "question" not in results.columns and "user_input" in results.columns
+
+
+def test_no_paths_returns_results_without_saving(tmp_path, fake_ragas, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    results = evaluate_incremental(_dataset(), [FakeMetric("faithfulness")],
+                                   previous_path=None, output_path=None)
+
+    assert len(results) == 3
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,84 @@
+"""
+Tests for the persistent judge response cache
+"""
+
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from utils.llm_cache import CacheMissError, SQLiteLLMCache
+
+
+def _llm_string(model="gpt-4.1-mini", temperature=0.1, **extra):
+    serialized = {"id": ["langchain", "chat_models", "ChatOpenAI"],
+                  "kwargs": {"model_name": model, "temperature": temperature, **extra}}
+    return json.dumps(serialized) + "---[('stop', None)]"
+
+
+def _generation(text):
+    return [ChatGeneration(message=AIMessage(content=text), generation_info={"finish_reason": "stop"})]
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"))
+    assert cache.lookup("prompt", _llm_string()) is None
+
+    cache.update("prompt", _llm_string(), _generation("answer"))
+    cached = cache.lookup("prompt", _llm_string())
+
+    assert cached[0].text == "answer"
+    assert cached[0].generation_info == {"finish_reason": "stop", "cached": True}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_key_ignores_credentials_but_not_sampling_params():
+    base = SQLiteLLMCache.make_key("prompt", _llm_string())
+    assert SQLiteLLMCache.make_key("prompt", _llm_string(openai_api_key="other")) == base
+    assert SQLiteLLMCache.make_key("prompt", _llm_string(max_retries=7)) == base
+    assert SQLiteLLMCache.make_key("prompt", _llm_string(temperature=0.7)) != base
+    assert SQLiteLLMCache.make_key("prompt", _llm_string(model="gpt-4o-mini")) != base
+    assert SQLiteLLMCache.make_key("other prompt", _llm_string()) != base
+
+
+def test_eviction_keeps_cache_within_budget(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"), max_size_mb=0.001)
+    for i in range(20):
+        cache.update(f"prompt {i}", _llm_string(), _generation("x" * 100))
+
+    assert cache.stats()["size_bytes"] <= cache.max_size_bytes
+    assert cache.evictions > 0
+    # The most recent entry survives, the oldest is gone
+    assert cache.lookup("prompt 19", _llm_string()) is not None
+    assert cache.lookup("prompt 0", _llm_string()) is None
+
+
+def test_replay_mode_is_read_only(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteLLMCache(path).update("prompt", _llm_string(), _generation("answer"))
+
+    replay = SQLiteLLMCache(path, replay=True)
+    assert replay.lookup("prompt", _llm_string())[0].text == "answer"
+    with pytest.raises(CacheMissError):
+        replay.lookup("unknown", _llm_string())
+    replay.update("unknown", _llm_string(), _generation("ignored"))
+    with pytest.raises(PermissionError):
+        replay.clear()
+
+
+def test_replay_requires_existing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SQLiteLLMCache(str(tmp_path / "missing.sqlite"), replay=True)
+
+
+def test_chat_model_calls_are_served_from_cache(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"))
+    llm = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+    assert llm.invoke("question").content == "first"
+    # A cache hit returns the stored answer instead of the next fake response
+    assert llm.invoke("question").content == "first"
+    assert cache.stats()["hits"] == 1
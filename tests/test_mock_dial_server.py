@@ -0,0 +1,143 @@
+"""
+Tests for the offline DIAL mock server
+"""
+
+import json
+
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel
+
+from utils.batch_judge import pack_requests, unpack_replies
+from utils.mock_dial_server import MockDialServer, parse_latency
+
+HEADERS = {"api-key": "mock-key"}
+CHAT_PATH = "/openai/deployments/gpt-4.1-mini-2025-04-14/chat/completions"
+
+
+class StatementFaithfulnessAnswer(BaseModel):
+    statement: str
+    reason: str
+    verdict: int
+
+
+class NLIStatementOutput(BaseModel):
+    statements: list[StatementFaithfulnessAnswer]
+
+
+def _ragas_prompt(output_model, prompt_input):
+    """Prompt laid out like a RAGAS PydanticPrompt: schema, one example, then the input"""
+    example = {"statements": [{"statement": "x", "reason": "y", "verdict": 1}]}
+    return (
+        "Judge the faithfulness of a series of statements based on a given context.\n"
+        "Please return the output in a JSON format that complies with the following schema "
+        f"as specified in JSON Schema:\n{json.dumps(output_model.model_json_schema())}\n"
+        "--------EXAMPLES-----------\n"
+        f"Example 1\nInput: {json.dumps({'context': 'c', 'statements': ['x']})}\n"
+        f"Output: {json.dumps(example)}\n"
+        "-----------------------------\n\n"
+        "Now perform the same with the following input\n"
+        f"input: {json.dumps(prompt_input)}\nOutput: "
+    )
+
+
+@pytest.fixture
+def server():
+    with MockDialServer() as mock:
+        yield mock
+
+
+def _chat(server, messages, **options):
+    response = httpx.post(
+        server.base_url + CHAT_PATH, headers=HEADERS, json={"messages": messages, **options}
+    )
+    response.raise_for_status()
+    return response
+
+
+def test_ragas_prompt_gets_schema_valid_reply(server):
+    prompt = _ragas_prompt(NLIStatementOutput, {"context": "c", "statements": ["a", "b", "c"]})
+
+    content = _chat(server, [{"role": "user", "content": prompt}]).json()["choices"][0]["message"]["content"]
+
+    parsed = NLIStatementOutput.model_validate_json(content)
+    assert len(parsed.statements) == 3
+    assert all(item.verdict in (0, 1) for item in parsed.statements)
+
+
+def test_replies_are_deterministic(server):
+    messages = [{"role": "user", "content": "Hello"}]
+
+    first = _chat(server, messages).json()["choices"][0]["message"]["content"]
+
+    assert first.startswith("Mock response")
+    assert first == _chat(server, messages).json()["choices"][0]["message"]["content"]
+
+
+def test_batched_requests_get_one_reply_each(server):
+    prompt = _ragas_prompt(NLIStatementOutput, {"context": "c", "statements": ["a"]})
+    packed = pack_requests([[HumanMessage(content=prompt)], [HumanMessage(content="Hi")]])
+    messages = [{"role": "system" if m.type == "system" else "user", "content": m.content}
+                for m in packed]
+
+    content = _chat(server, messages).json()["choices"][0]["message"]["content"]
+    replies = unpack_replies(content, 2)
+
+    assert replies is not None
+    NLIStatementOutput.model_validate_json(replies[0])
+    assert replies[1].startswith("Mock response")
+
+
+def test_streamed_reply_matches_plain_reply(server):
+    messages = [{"role": "user", "content": "Stream me"}]
+    plain = _chat(server, messages).json()["choices"][0]["message"]["content"]
+
+    chunks = [
+        json.loads(line[len("data: "):])
+        for line in _chat(server, messages, stream=True).text.splitlines()
+        if line.startswith("data: {")
+    ]
+
+    assert "".join(chunk["choices"][0]["delta"]["content"] for chunk in chunks) == plain
+
+
+def test_injected_rate_limits_carry_retry_after():
+    with MockDialServer(rate_limit_rate=1.0, retry_after=3) as mock:
+        response = httpx.post(mock.base_url + CHAT_PATH, headers=HEADERS, json={"messages": []})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert mock.request_counts[("completions", 429)] == 1
+
+
+def test_missing_api_key_and_unknown_deployment(server):
+    assert httpx.post(server.base_url + CHAT_PATH, json={}).status_code == 401
+    response = httpx.post(
+        server.base_url + "/openai/deployments/nope/chat/completions", headers=HEADERS, json={}
+    )
+    assert response.status_code == 404
+
+
+def test_embeddings_are_deterministic_unit_vectors(server):
+    from langchain_openai import OpenAIEmbeddings
+
+    embeddings = OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        api_key="mock-key",
+        base_url=server.base_url + "/openai/deployments/text-embedding-3-small-1",
+        check_embedding_ctx_length=False,
+    )
+
+    first, second = embeddings.embed_documents(["alpha", "beta"])
+
+    assert len(first) == 1536
+    assert sum(value * value for value in first) == pytest.approx(1.0, abs=1e-4)
+    assert embeddings.embed_query("alpha") == pytest.approx(first)
+    assert first != second
+
+
+def test_parse_latency_specs():
+    assert parse_latency(None) == ("constant", 0.0)
+    assert parse_latency(0.02) == ("constant", 0.02)
+    assert parse_latency("lognormal:0.05:1.0") == ("lognormal", 0.05, 1.0)
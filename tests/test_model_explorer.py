@@ -0,0 +1,101 @@
+"""
+Tests for deployment probing and the ranked catalogue
+"""
+
+import json
+import os
+
+import pytest
+
+from utils.client_factory import reset_clients
+from utils.mock_dial_server import MockDialServer
+from utils.model_explorer import (
+    _has_content,
+    get_ranked_catalogue,
+    load_catalogue,
+    probe_deployments,
+    rank_deployments,
+)
+
+DEPLOYMENTS = {"gpt-4.1-mini-2025-04-14": "llm", "text-embedding-3-small-1": "embedding"}
+
+
+@pytest.fixture
+def dial(monkeypatch):
+    """Start a mock DIAL server with the given options and point the utils at it"""
+    servers = []
+
+    def start(**options):
+        server = MockDialServer(**options).start()
+        servers.append(server)
+        monkeypatch.setenv("AZURE_ENDPOINT", server.base_url)
+        monkeypatch.setenv("DIAL_API_KEY", "mock-key")
+        reset_clients()
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+    reset_clients()
+
+
+def test_only_chunks_with_text_count_as_first_token():
+    role_only = {"choices": [{"index": 0, "delta": {"role": "assistant"}}]}
+    empty = {"choices": [{"index": 0, "delta": {"content": ""}}]}
+    text = {"choices": [{"index": 0, "delta": {"content": "OK"}}]}
+
+    assert not _has_content(f"data: {json.dumps(role_only)}")
+    assert not _has_content(f"data: {json.dumps(empty)}")
+    assert not _has_content("data: [DONE]")
+    assert not _has_content(": keep-alive")
+    assert _has_content(f"data: {json.dumps(text)}")
+
+
+def test_probe_measures_ttft_before_the_stream_ends(dial):
+    dial(responder=lambda messages: "one two three four five", stream_interval=0.02)
+
+    (llm,) = probe_deployments({"gpt-4.1-mini-2025-04-14": "llm"}, samples=2)
+
+    assert llm["healthy"] and llm["errors"] == 0
+    assert llm["ttft_p50"] < llm["latency_p50"] - 0.05
+
+
+def test_rank_puts_healthy_fast_deployments_first():
+    results = rank_deployments([
+        {"deployment": "slow", "error_rate": 0.0, "latency_p50": 0.5, "latency_p95": 0.9},
+        {"deployment": "broken", "error_rate": 1.0, "latency_p50": None, "latency_p95": None},
+        {"deployment": "fast", "error_rate": 0.0, "latency_p50": 0.1, "latency_p95": 0.2},
+    ])
+
+    assert [r["deployment"] for r in results] == ["fast", "slow", "broken"]
+    assert [r["healthy"] for r in results] == [True, True, False]
+
+
+def test_failed_probe_is_not_cached(dial, tmp_path):
+    path = str(tmp_path / "catalogue.json")
+    dial(error_rate=1.0)
+
+    catalogue = get_ranked_catalogue(path=path, deployments=DEPLOYMENTS, samples=2)
+
+    assert not any(result["healthy"] for result in catalogue)
+    assert not os.path.exists(path)
+
+
+def test_empty_probe_is_not_cached(dial, tmp_path):
+    path = str(tmp_path / "catalogue.json")
+    dial()
+
+    assert get_ranked_catalogue(path=path, deployments={}) == []
+    assert not os.path.exists(path)
+
+
+def test_healthy_probe_is_cached_and_reused(dial, tmp_path):
+    path = str(tmp_path / "catalogue.json")
+    server = dial()
+
+    catalogue = get_ranked_catalogue(path=path, deployments=DEPLOYMENTS, samples=2)
+    requests = sum(server.request_counts.values())
+
+    assert load_catalogue(path) == catalogue
+    assert get_ranked_catalogue(path=path, deployments=DEPLOYMENTS, samples=2) == catalogue
+    assert sum(server.request_counts.values()) == requests
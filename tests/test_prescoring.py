@@ -0,0 +1,107 @@
+"""
+Tests for the local pre-scoring cascade
+"""
+
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.prescoring import compute_proxy_scores, resolve_locally, run_cascade, threshold_sweep
+
+
+def _dataset(rows):
+    return pd.DataFrame([
+        {"question": q, "answer": a, "ground_truth": g, "retrieved_contexts": c}
+        for q, a, g, c in rows
+    ])
+
+
+CLEAR_CUT = _dataset([
+    # Answer and reference copied from the context
+    ("When was Acme founded?", "Acme was founded in 1999.", "Acme was founded in 1999.",
+     ["Acme was founded in 1999."]),
+    # Context shares nothing with the reference or the answer
+    ("When was Acme founded?", "Acme was founded in 1999.", "Acme was founded in 1999.",
+     ["Bananas grow on tropical plants."]),
+])
+
+
+@pytest.fixture
+def fake_ragas(monkeypatch):
+    """ragas stand-in that scores every row 0.5 and records what it was asked"""
+    calls = []
+
+    class Result:
+        def __init__(self, dataset, metrics):
+            self._frame = pd.DataFrame({metric.name: [0.5] * len(dataset) for metric in metrics})
+
+        def to_pandas(self):
+            return self._frame
+
+    def evaluate(dataset, metrics, llm=None, embeddings=None, **kwargs):
+        calls.append(([metric.name for metric in metrics], len(dataset)))
+        return Result(dataset, metrics)
+
+    monkeypatch.setitem(sys.modules, "ragas", SimpleNamespace(evaluate=evaluate))
+    return calls
+
+
+def test_clear_cut_rows_resolve_locally():
+    resolved = resolve_locally(compute_proxy_scores(CLEAR_CUT))
+
+    assert resolved["faithfulness"].tolist() == [1.0, 0.0]
+    assert resolved["context_recall"].tolist() == [1.0, 0.0]
+    assert resolved["faithfulness_source"].tolist() == ["local", "local"]
+
+
+def test_stop_word_only_dataset_is_uncertain():
+    df = _dataset([("What is it?", "It is.", "It is this.", ["This is it."])])
+
+    proxies = compute_proxy_scores(df)
+    resolved = resolve_locally(proxies)
+
+    assert proxies.isna().all().all()
+    assert (resolved[[f"{m}_source" for m in proxies.columns]] == "llm").all().all()
+
+
+def test_stop_word_only_row_is_uncertain_next_to_normal_rows():
+    df = pd.concat([CLEAR_CUT, _dataset([("What?", "It is.", "It is.", ["This is it."])])])
+
+    resolved = resolve_locally(compute_proxy_scores(df.reset_index(drop=True)))
+
+    assert resolved["faithfulness_source"].tolist() == ["local", "local", "llm"]
+    assert np.isnan(resolved["faithfulness"].iloc[2])
+
+
+def test_cascade_sends_only_uncertain_rows(fake_ragas):
+    metric = SimpleNamespace(name="faithfulness")
+    df = pd.concat([CLEAR_CUT, _dataset([("What?", "It is.", "It is.", ["This is it."])])])
+
+    results = run_cascade(df, [metric])
+
+    assert fake_ragas == [(["faithfulness"], 1)]
+    assert results["faithfulness"].tolist() == [1.0, 0.0, 0.5]
+
+
+def test_metric_without_proxy_goes_to_the_llm_for_every_row(fake_ragas):
+    metric = SimpleNamespace(name="answer_relevancy")
+
+    results = run_cascade(CLEAR_CUT, [metric])
+
+    assert fake_ragas == [(["answer_relevancy"], 2)]
+    assert results["answer_relevancy"].tolist() == [0.5, 0.5]
+    assert results["answer_relevancy_source"].tolist() == ["llm", "llm"]
+    assert results["answer_relevancy_proxy"].isna().all()
+
+
+def test_threshold_sweep_trades_coverage_for_error():
+    proxies = pd.DataFrame({"faithfulness": [0.0, 0.5, 1.0]})
+    llm = pd.DataFrame({"faithfulness": [0.0, 1.0, 0.0]})
+
+    sweep = threshold_sweep(proxies, llm, "faithfulness", lows=(0.0,), highs=(1.0,))
+
+    assert sweep["local_fraction"].iloc[0] == pytest.approx(2 / 3)
+    assert sweep["mae_local"].iloc[0] == pytest.approx(0.5)
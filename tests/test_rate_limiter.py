@@ -0,0 +1,145 @@
+"""
+Tests for the RPM/TPM scheduler and its LangChain wrappers
+"""
+
+import asyncio
+import email.utils
+import time
+
+import httpx
+import openai
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from utils.llm_cache import SQLiteLLMCache
+from utils.rate_limiter import (
+    DeploymentBudget,
+    RateLimitScheduler,
+    ScheduledChatModel,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+def _rate_limit_error(headers=None):
+    request = httpx.Request("POST", "http://test/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_bucket_queues_reservations_beyond_capacity():
+    bucket = TokenBucket(rate_per_minute=60, burst_seconds=2)  # 1/s, capacity 2
+
+    assert bucket.reserve(2) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2.0, abs=0.05)
+
+
+def test_reserve_and_refund_are_clamped_to_capacity():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1)  # capacity 10
+
+    bucket.reserve(1000)
+    assert bucket.level == pytest.approx(0.0, abs=0.1)
+    bucket.refund(1000)
+    assert bucket.level <= bucket.capacity
+    bucket.refund(-1000)
+    assert bucket.level >= -bucket.capacity - 0.1
+
+
+def test_on_success_refunds_only_what_was_reserved():
+    budget = DeploymentBudget(rpm=60, tpm=600, burst_seconds=1)  # token capacity 10
+    budget.reserve(1000)
+    budget.on_success(estimated_tokens=1000, actual_tokens=5)
+    assert budget.tokens.level <= 5.1
+
+
+def test_scale_rate_keeps_level_within_capacity():
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1)
+    bucket.scale_rate(0.5)
+    assert bucket.level <= bucket.capacity
+
+
+def test_parse_retry_after_headers():
+    assert parse_retry_after(_rate_limit_error({"retry-after-ms": "1500"})) == 1.5
+    assert parse_retry_after(_rate_limit_error({"retry-after": "3"})) == 3.0
+    assert parse_retry_after(_rate_limit_error(), default=2.0) == 2.0
+    assert parse_retry_after(ValueError("no response"), default=0.5) == 0.5
+
+
+def test_parse_retry_after_http_dates_and_garbage():
+    future = email.utils.formatdate(time.time() + 30, usegmt=True)
+    # "-0000" marks an unknown zone and parses as a naive datetime
+    naive = email.utils.formatdate(time.time() + 30)
+
+    assert parse_retry_after(_rate_limit_error({"retry-after": future})) == pytest.approx(30, abs=2)
+    assert parse_retry_after(_rate_limit_error({"retry-after": naive})) == pytest.approx(30, abs=2)
+    assert parse_retry_after(_rate_limit_error({"retry-after": "soon"}), default=2.0) == 2.0
+    garbage = _rate_limit_error({"retry-after-ms": "x", "retry-after": "x"})
+    assert parse_retry_after(garbage, default=3.0) == 3.0
+
+
+def test_scheduler_retries_rate_limited_calls():
+    scheduler = RateLimitScheduler(default_rpm=6000, default_tpm=10**6)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _rate_limit_error({"retry-after-ms": "10"})
+        return "ok"
+
+    result, queue_wait, retries = asyncio.run(scheduler.arun("deployment", 10, call))
+
+    assert (result, retries) == ("ok", 2)
+    assert queue_wait > 0
+    assert scheduler.stats()["deployment"]["rate_limited"] == 2
+
+
+def test_scheduler_gives_up_after_max_attempts():
+    scheduler = RateLimitScheduler(default_rpm=6000, default_tpm=10**6, max_attempts=2)
+
+    def call():
+        raise _rate_limit_error({"retry-after-ms": "1"})
+
+    with pytest.raises(openai.RateLimitError):
+        scheduler.run("deployment", 10, call)
+
+
+def test_scheduled_model_reports_queue_wait_but_does_not_cache_it(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"))
+    llm = ScheduledChatModel(
+        llm=FakeListChatModel(responses=["answer"]),
+        scheduler=RateLimitScheduler(),
+        deployment="fake",
+        cache=cache
+    )
+
+    fresh = llm.generate([[HumanMessage(content="question")]]).generations[0][0]
+    cached = llm.generate([[HumanMessage(content="question")]]).generations[0][0]
+
+    assert fresh.generation_info["retries"] == 0
+    assert cached.text == "answer"
+    assert "queue_wait" not in (cached.generation_info or {})
+    assert "retries" not in (cached.generation_info or {})
+
+
+def test_scheduled_model_reserves_the_call_max_tokens():
+    scheduler = RateLimitScheduler()
+    reserved = []
+    run = scheduler.run
+
+    def spy(deployment, tokens, call):
+        reserved.append(tokens)
+        return run(deployment, tokens, call)
+
+    scheduler.run = spy
+    llm = ScheduledChatModel(
+        llm=FakeListChatModel(responses=["a", "b"]), scheduler=scheduler, deployment="fake"
+    )
+    messages = [HumanMessage(content="question")]
+
+    llm._generate(messages)
+    llm._generate(messages, max_tokens=8000)
+
+    assert reserved[1] - reserved[0] == 8000
@@ -0,0 +1,84 @@
+"""
+Tests for the compact columnar results store
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from utils import results_store
+from utils.results_store import convert_csv, load_contexts, load_results, read_results_table, save_results
+
+
+def _results():
+    return pd.DataFrame({
+        "user_input": ["q1", "q2", None],
+        "retrieved_contexts": [["a", "b"], ["b"], []],
+        "response": ["r1", "r2", "r3"],
+        "faithfulness": [1.0, 0.5, np.nan],
+        "scenario": ["perfect", "partial_answer", "perfect"],
+    })
+
+
+def test_round_trip_keeps_rows_columns_and_order(tmp_path):
+    results = _results()
+
+    loaded = load_results(save_results(results, str(tmp_path / "store")))
+
+    assert list(loaded.columns) == list(results.columns)
+    assert loaded["retrieved_contexts"].tolist() == [["a", "b"], ["b"], []]
+    assert loaded["user_input"].tolist()[:2] == ["q1", "q2"]
+    assert pd.isna(loaded["user_input"].iloc[2])
+    assert loaded["scenario"].tolist() == results["scenario"].tolist()
+    np.testing.assert_allclose(loaded["faithfulness"], results["faithfulness"])
+
+
+def test_contexts_are_stored_once(tmp_path):
+    path = save_results(_results(), str(tmp_path / "store"))
+
+    assert load_contexts(path)["text"].tolist() == ["a", "b"]
+    assert read_results_table(path).column("context_ids").to_pylist() == [[0, 1], [1], []]
+
+
+def test_column_projection(tmp_path):
+    path = save_results(_results(), str(tmp_path / "store"))
+
+    loaded = load_results(path, columns=["faithfulness"])
+
+    assert list(loaded.columns) == ["faithfulness"]
+
+
+def test_offsets_past_int32_use_large_list(tmp_path, monkeypatch):
+    # Pretend int32 offsets end at 2 so the three references need int64 offsets
+    monkeypatch.setattr(results_store, "_MAX_LIST_OFFSET", 2)
+    path = save_results(_results(), str(tmp_path / "store"))
+
+    ids = read_results_table(path).column("context_ids")
+    loaded = load_results(path)
+
+    assert pa.types.is_large_list(ids.type)
+    assert loaded["retrieved_contexts"].tolist() == [["a", "b"], ["b"], []]
+
+
+def test_convert_csv_parses_stringified_contexts(tmp_path):
+    csv_path = str(tmp_path / "results.csv")
+    _results().to_csv(csv_path, index=False)
+
+    loaded = load_results(convert_csv(csv_path, str(tmp_path / "store")))
+
+    assert loaded["retrieved_contexts"].tolist() == [["a", "b"], ["b"], []]
+    assert loaded["faithfulness"].iloc[1] == pytest.approx(0.5)
+
+
+def test_mixed_type_text_columns_are_stored_as_strings(tmp_path):
+    results = pd.DataFrame({
+        "user_input": ["When?", "Why?", "Who?"],
+        "reference": ["Acme", 1990, np.nan],
+        "faithfulness": [0.5, 1.0, 0.0],
+    })
+
+    loaded = load_results(save_results(results, str(tmp_path / "store")))
+
+    assert loaded["reference"].tolist()[:2] == ["Acme", "1990"]
+    assert pd.isna(loaded["reference"].iloc[2])
@@ -0,0 +1,130 @@
+"""
+Tests for checkpointed shard-by-shard evaluation
+"""
+
+import json
+import sys
+import types
+
+import pytest
+
+from utils.streaming_evaluator import (
+    evaluate_in_shards,
+    iter_results,
+    iter_shards,
+    load_shard_results,
+    manifest_path,
+)
+
+
+class FakeMetric:
+    name = "faithfulness"
+
+
+@pytest.fixture
+def fake_ragas(monkeypatch):
+    """ragas stand-in whose evaluate scores each row by its question length"""
+    calls = []
+
+    def evaluate(dataset, metrics, llm=None, embeddings=None, **kwargs):
+        calls.append(len(dataset))
+        df = dataset.to_pandas()
+        df["faithfulness"] = [len(q) / 7 for q in df["question"]]
+        return types.SimpleNamespace(to_pandas=lambda: df)
+
+    monkeypatch.setitem(sys.modules, "ragas", types.SimpleNamespace(evaluate=evaluate))
+    return calls
+
+
+def _rows(n):
+    return [{"question": f"question {i}" + "?" * i, "answer": "a"} for i in range(n)]
+
+
+def test_iter_shards_splits_any_iterable():
+    shards = list(iter_shards(iter(range(7)), 3))
+    assert shards == [(0, [0, 1, 2]), (1, [3, 4, 5]), (2, [6])]
+
+
+def test_results_are_written_with_global_row_indices(tmp_path, fake_ragas):
+    output = str(tmp_path / "results.jsonl")
+    manifest = evaluate_in_shards(_rows(5), [FakeMetric()], output_path=output, shard_size=2,
+                                  row_offset=10)
+
+    results = load_shard_results(output)
+    assert fake_ragas == [2, 2, 1]
+    assert manifest["rows_done"] == 5
+    assert results["row_index"].tolist() == [10, 11, 12, 13, 14]
+    # Scores survive the JSON round trip bit for bit
+    assert results["faithfulness"].tolist() == [len(r["question"]) / 7 for r in _rows(5)]
+    assert sum(len(chunk) for chunk in iter_results(output, chunksize=2)) == 5
+
+
+def test_rerun_skips_completed_shards(tmp_path, fake_ragas):
+    output = str(tmp_path / "results.jsonl")
+    evaluate_in_shards(_rows(4), [FakeMetric()], output_path=output, shard_size=2)
+    evaluate_in_shards(_rows(4), [FakeMetric()], output_path=output, shard_size=2)
+
+    assert fake_ragas == [2, 2]
+    assert len(load_shard_results(output)) == 4
+
+
+def test_uncommitted_rows_are_dropped_on_resume(tmp_path, fake_ragas):
+    output = str(tmp_path / "results.jsonl")
+    evaluate_in_shards(_rows(2), [FakeMetric()], output_path=output, shard_size=2)
+    with open(output, "a") as f:
+        f.write('{"row_index": 99, "faith')  # killed mid-write
+
+    evaluate_in_shards(_rows(4), [FakeMetric()], output_path=output, shard_size=2)
+
+    assert load_shard_results(output)["row_index"].tolist() == [0, 1, 2, 3]
+
+
+def test_changed_dataset_is_detected(tmp_path, fake_ragas):
+    output = str(tmp_path / "results.jsonl")
+    evaluate_in_shards(_rows(2), [FakeMetric()], output_path=output, shard_size=2)
+    changed = _rows(2)
+    changed[0]["answer"] = "different"
+
+    with pytest.raises(ValueError, match="differs"):
+        evaluate_in_shards(changed, [FakeMetric()], output_path=output, shard_size=2)
+
+
+def test_changed_settings_are_rejected(tmp_path, fake_ragas):
+    output = str(tmp_path / "results.jsonl")
+    evaluate_in_shards(_rows(2), [FakeMetric()], output_path=output, shard_size=2)
+
+    with pytest.raises(ValueError, match="shard_size"):
+        evaluate_in_shards(_rows(2), [FakeMetric()], output_path=output, shard_size=3)
+
+
+def test_existing_file_without_manifest_is_not_overwritten(tmp_path, fake_ragas):
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps({"row_index": 0, "faithfulness": 1.0}) + "\n")
+
+    with pytest.raises(FileExistsError):
+        evaluate_in_shards(_rows(2), [FakeMetric()], output_path=str(output), shard_size=2)
+    assert fake_ragas == []
+    assert output.read_text().startswith('{"row_index": 0')
+
+    evaluate_in_shards(_rows(2), [FakeMetric()], output_path=str(output), shard_size=2,
+                       overwrite=True)
+    assert len(load_shard_results(str(output))) == 2
+    with open(manifest_path(str(output))) as f:
+        assert json.load(f)["rows_done"] == 2
+
+
+def test_numeric_looking_strings_round_trip(tmp_path, fake_ragas):
+    from utils.results_store import load_results, save_results
+
+    output = str(tmp_path / "results.jsonl")
+    rows = [{"question": "When?", "answer": "1990", "reference": "1990"},
+            {"question": "When again?", "answer": "2001", "reference": "2001"}]
+    evaluate_in_shards(rows, [FakeMetric()], output_path=output, shard_size=1)
+
+    results = load_shard_results(output)
+    chunk = next(iter_results(output))
+
+    assert results["reference"].tolist() == ["1990", "2001"]
+    assert chunk["answer"].tolist() == ["1990", "2001"]
+    store = save_results(results, str(tmp_path / "store"))
+    assert load_results(store)["reference"].tolist() == ["1990", "2001"]
@@ -0,0 +1,95 @@
+"""
+Tests for request telemetry
+"""
+
+import asyncio
+import json
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from utils.batch_judge import BatchedChatModel
+from utils.llm_cache import SQLiteLLMCache
+from utils.telemetry import TelemetryRecorder
+
+
+def _recorder():
+    telemetry = TelemetryRecorder(prices={"judge": (1.0, 2.0)})
+    for latency in (0.1, 0.2, 3.0):
+        telemetry.record("chat", "judge", prompt_tokens=1000, completion_tokens=500,
+                         latency=latency, metric="faithfulness")
+    telemetry.record("chat", "judge", prompt_tokens=1000, completion_tokens=500,
+                     latency=0.001, metric="faithfulness", cached=True)
+    return telemetry
+
+
+def test_cache_hits_are_not_counted_as_requests():
+    summary = _recorder().summary()
+
+    row = summary.loc["faithfulness"]
+    assert (row["requests"], row["cache_hits"]) == (3, 1)
+    assert row["prompt_tokens"] == 3000
+    assert row["cost_usd"] == 3 * (1.0 + 1.0)
+
+
+def test_prometheus_counts_cache_hits_separately():
+    text = _recorder().prometheus_text()
+
+    labels = '{kind="chat",deployment="judge",metric="faithfulness"}'
+    assert f"ragas_requests_total{labels} 3" in text
+    assert f"ragas_cache_hits_total{labels} 1" in text
+    assert f"ragas_request_latency_seconds_count{labels} 3" in text
+    assert f"ragas_prompt_tokens_total{labels} 3000" in text
+
+
+def test_llm_cache_hits_are_recorded_as_cached(tmp_path):
+    telemetry = TelemetryRecorder()
+    llm = FakeListChatModel(responses=["yes", "yes"], cache=SQLiteLLMCache(str(tmp_path / "c.sqlite")),
+                            callbacks=[telemetry])
+
+    llm.invoke("Is it?")
+    llm.invoke("Is it?")
+
+    assert telemetry.to_frame()["cached"].tolist() == [False, True]
+    assert telemetry.summary(by="kind").loc["chat", "requests"] == 1
+
+
+class _ArrayModel(BaseChatModel):
+    """Answers a packed batch with one reply per request"""
+
+    @property
+    def _llm_type(self):
+        return "array"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise NotImplementedError
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        replies = [f"reply {request['id']}" for request in json.loads(messages[-1].content)]
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=json.dumps(replies)))],
+            llm_output={"token_usage": {"prompt_tokens": 90, "completion_tokens": 11}},
+        )
+
+
+def test_packed_batches_count_as_one_request():
+    telemetry = TelemetryRecorder()
+    llm = BatchedChatModel(llm=_ArrayModel(), max_batch_size=3, max_wait=0.05,
+                           callbacks=[telemetry])
+
+    async def judge():
+        return await asyncio.gather(*(llm.ainvoke(f"prompt {i}") for i in range(6)))
+
+    asyncio.run(judge())
+
+    summary = telemetry.summary(by="kind").loc["chat"]
+    assert (summary["requests"], summary["completion_tokens"]) == (2, 22)
+    text = telemetry.prometheus_text()
+    assert 'ragas_requests_total{kind="chat",deployment="",metric=""} 2' in text
+    assert 'ragas_request_latency_seconds_count{kind="chat",deployment="",metric=""} 2' in text
+    # Waiting for the batch to fill is queue wait, not request latency
+    frame = telemetry.to_frame()
+    assert (frame["queue_wait"] > 0).all()
+    assert (frame["latency"] < frame["duration"]).all()
@@ -3,16 +3,72 @@ Utils package for RAGAS evaluation
 Contains model exploration, dataset creation, and LangChain wrapper utilities
 """
 
-from .model_explorer import get_available_models, load_api_config
-from .dataset_creator import create_fake_ragas_dataset, save_dataset, create_ragas_dataset
-from .langchain_wrappers import create_langchain_llm, create_langchain_embeddings
+import importlib
 
-__all__ = [
-    'get_available_models',
-    'load_api_config', 
-    'create_fake_ragas_dataset',
-    'create_ragas_dataset',
-    'save_dataset',
-    'create_langchain_llm',
-    'create_langchain_embeddings'
-]
+# Public name -> submodule defining it. Submodules are imported on first
+# attribute access (PEP 562), so "import utils" stays cheap and a quick tool
+# only pays for the dependencies of the functions it actually uses.
+_EXPORTS = {
+    'get_available_models': 'model_explorer',
+    'load_api_config': 'client_factory',
+    'get_http_client': 'client_factory',
+    'get_async_http_client': 'client_factory',
+    'configure_http_clients': 'client_factory',
+    'create_fake_ragas_dataset': 'dataset_creator',
+    'create_ragas_dataset': 'dataset_creator',
+    'save_dataset': 'dataset_creator',
+    'iter_synthetic_rows': 'dataset_creator',
+    'create_synthetic_dataset': 'dataset_creator',
+    'load_dataset_file': 'dataset_creator',
+    'count_dataset_rows': 'dataset_creator',
+    'load_dataset_rows': 'dataset_creator',
+    'iter_trace_rows': 'dataset_creator',
+    'load_trace_dataset': 'dataset_creator',
+    'create_langchain_llm': 'langchain_wrappers',
+    'create_langchain_embeddings': 'langchain_wrappers',
+    'SQLiteLLMCache': 'llm_cache',
+    'CacheMissError': 'llm_cache',
+    'EmbeddingStore': 'embedding_store',
+    'CachedEmbeddings': 'embedding_store',
+    'RateLimitScheduler': 'rate_limiter',
+    'BatchedChatModel': 'batch_judge',
+    'HedgedChatModel': 'hedging',
+    'HedgedEmbeddings': 'hedging',
+    'evaluate_in_shards': 'streaming_evaluator',
+    'iter_results': 'streaming_evaluator',
+    'load_shard_results': 'streaming_evaluator',
+    'compute_proxy_scores': 'prescoring',
+    'resolve_locally': 'prescoring',
+    'run_cascade': 'prescoring',
+    'calibration_report': 'prescoring',
+    'attach_labels': 'analytics',
+    'summarize': 'analytics',
+    'compare_runs': 'analytics',
+    'detect_regressions': 'analytics',
+    'save_results': 'results_store',
+    'load_results': 'results_store',
+    'load_contexts': 'results_store',
+    'convert_csv': 'results_store',
+    'compute_fingerprints': 'incremental',
+    'plan_reevaluation': 'incremental',
+    'evaluate_incremental': 'incremental',
+    'TelemetryRecorder': 'telemetry',
+    'InstrumentedEmbeddings': 'telemetry',
+    'MockDialServer': 'mock_dial_server',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,290 @@
+"""
+Results Analytics for RAGAS Evaluation
+Contains vectorized summaries, bootstrap confidence intervals, run comparison and regression detection
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_METRICS = ("context_recall", "context_precision", "faithfulness", "answer_correctness")
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Bootstrap resamples are drawn over value bins rather than rows, so their cost
+# does not grow with the number of results
+BOOTSTRAP_BINS = 256
+
+
+def metric_columns(results, metrics=None):
+    """
+    Resolve the score columns to analyse
+
+    Args:
+        results: Results DataFrame
+        metrics: RAGAS metric objects or column names (default: the four
+            standard metrics present in results)
+
+    Returns:
+        list: Column names
+    """
+    if metrics is None:
+        return [name for name in DEFAULT_METRICS if name in results.columns]
+    names = [getattr(metric, "name", metric) for metric in metrics]
+    missing = [name for name in names if name not in results.columns]
+    if missing:
+        raise KeyError(f"Results have no score column for {missing}")
+    return names
+
+
+def attach_labels(results, labels, column="scenario"):
+    """
+    Add a label column (scenario, tag, ...) to a results DataFrame
+
+    Labels are aligned on row_index when the results have one (shard output),
+    otherwise by position; a length mismatch raises instead of mislabelling rows.
+
+    Args:
+        results: Results DataFrame
+        labels: Sequence with one label per dataset row
+        column: Name of the new column (default: "scenario")
+
+    Returns:
+        pd.DataFrame: Copy of results with the label column
+    """
+    labels = np.asarray(labels, dtype=object)
+    labelled = results.copy()
+    if "row_index" in labelled.columns:
+        positions = labelled["row_index"].to_numpy()
+        if len(positions) and positions.max() >= len(labels):
+            raise ValueError(f"row_index {positions.max()} has no label ({len(labels)} labels)")
+        labelled[column] = labels[positions]
+    else:
+        if len(labels) != len(labelled):
+            raise ValueError(f"Got {len(labels)} labels for {len(labelled)} result rows")
+        labelled[column] = labels
+    return labelled
+
+
+def _explode_tags(results, by):
+    """Repeat rows whose group column holds a list of tags, one row per tag"""
+    for column in [by] if isinstance(by, str) else by:
+        values = results[column]
+        first = values.dropna().iloc[0] if values.notna().any() else None
+        if isinstance(first, (list, tuple, np.ndarray)):
+            results = results.explode(column)
+    return results
+
+
+def _bin(values, bins):
+    """Map finite values to equal-width bins between their minimum and maximum"""
+    low, high = values.min(), values.max()
+    scale = bins / (high - low) if high > low else 0.0
+    return np.minimum(((values - low) * scale).astype(np.int64), bins - 1)
+
+
+def _bootstrap_means(codes, values, num_groups, n_boot, rng, bins=BOOTSTRAP_BINS):
+    """
+    Poisson bootstrap distribution of the mean of every group
+
+    Rows are summarised as per-(group, bin) counts and means. Each resample
+    reweights every row with a Poisson(1) count, so the resampled count of a
+    bin is Poisson(bin count) and all groups and resamples are drawn in one
+    vectorized call of n_boot x groups x bins, however many rows there are.
+
+    Returns:
+        np.ndarray: Shape (num_groups, n_boot), NaN for empty groups
+    """
+    if values.size == 0:
+        return np.full((num_groups, n_boot), np.nan)
+
+    flat = codes * bins + _bin(values, bins)
+    counts = np.bincount(flat, minlength=num_groups * bins).reshape(num_groups, bins)
+    sums = np.bincount(flat, weights=values, minlength=num_groups * bins).reshape(num_groups, bins)
+    bin_means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+    draws = rng.poisson(counts, size=(n_boot, num_groups, bins)).astype(np.float64)
+    totals = draws.sum(axis=2)
+    weighted = np.einsum("bgk,gk->bg", draws, bin_means)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (weighted / totals).T
+
+
+def summarize(results, metrics=None, by=None, quantiles=DEFAULT_QUANTILES, n_boot=1000,
+              confidence=0.95, seed=0):
+    """
+    Per-metric count, mean, std, quantiles and bootstrap confidence interval
+
+    Args:
+        results: Results DataFrame (e.g. result.to_pandas() or load_shard_results())
+        metrics: RAGAS metric objects or column names (default: standard metrics present)
+        by: Optional column name or list of names to group by (scenario, tag, ...);
+            list-valued tag columns count a row once per tag
+        quantiles: Quantiles to report (default: 5%, 25%, 50%, 75%, 95%)
+        n_boot: Bootstrap resamples for the confidence interval, 0 disables it (default: 1000)
+        confidence: Confidence level of the interval (default: 0.95)
+        seed: Bootstrap random seed (default: 0)
+
+    Returns:
+        pd.DataFrame: One row per metric (per group and metric when by is set)
+    """
+    columns = metric_columns(results, metrics)
+    rng = np.random.default_rng(seed)
+    alpha = (1.0 - confidence) / 2.0
+
+    if by is None:
+        codes = np.zeros(len(results), dtype=np.int64)
+        keys = pd.Index([None])
+    else:
+        results = _explode_tags(results, by)
+        grouper = results.groupby(by, sort=True, observed=True, dropna=True)
+        codes = grouper.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        keys = grouper.size().index
+        valid = codes >= 0
+        results, codes = results[valid], codes[valid]
+
+    num_groups = len(keys)
+    tables = []
+    for column in columns:
+        values = results[column].to_numpy(dtype=np.float64)
+        finite = np.isfinite(values)
+        group_codes, group_values = codes[finite], values[finite]
+
+        count = np.bincount(group_codes, minlength=num_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.bincount(group_codes, weights=group_values, minlength=num_groups) / count
+            squares = np.bincount(group_codes, weights=(group_values - mean[group_codes]) ** 2,
+                                  minlength=num_groups)
+            std = np.where(count > 1, np.sqrt(squares / np.maximum(count - 1, 1)), np.nan)
+        table = pd.DataFrame({"metric": column, "count": count, "mean": mean, "std": std})
+
+        if quantiles:
+            grouped = pd.Series(group_values).groupby(group_codes, sort=True)
+            table = table.join(
+                grouped.quantile(list(quantiles)).unstack().rename(columns=lambda q: f"p{q * 100:g}")
+            )
+        if n_boot:
+            boot = _bootstrap_means(group_codes, group_values, num_groups, n_boot, rng)
+            with warnings.catch_warnings():
+                # Empty groups have all-NaN resamples
+                warnings.simplefilter("ignore", RuntimeWarning)
+                table["ci_low"] = np.nanquantile(boot, alpha, axis=1)
+                table["ci_high"] = np.nanquantile(boot, 1.0 - alpha, axis=1)
+        table.index = keys
+        tables.append(table)
+
+    summary = pd.concat(tables)
+    if by is None:
+        return summary.set_index("metric")
+    return summary.set_index("metric", append=True)
+
+
+def _paired_frames(baseline, candidate, on, by, columns):
+    """Inner-join two runs on their row keys, keeping only the columns needed"""
+    keys = [on] if isinstance(on, str) else list(on)
+    labels = [by] if by is not None and by not in keys and by in baseline.columns else []
+    merged = baseline[keys + labels + columns].merge(
+        candidate[keys + columns], on=keys, how="inner", suffixes=("_baseline", "_candidate")
+    )
+    if merged.empty:
+        raise ValueError(f"Runs share no rows on {on}")
+    return merged
+
+
+def compare_runs(baseline, candidate, metrics=None, on=None, by=None, n_boot=1000,
+                 confidence=0.95, seed=0):
+    """
+    Compare the mean scores of two evaluation runs
+
+    With on set (e.g. "row_index" or "user_input") rows are paired and the
+    interval is bootstrapped over per-row differences; otherwise the two runs
+    are resampled independently.
+
+    Args:
+        baseline: Results DataFrame of the reference run
+        candidate: Results DataFrame of the new run
+        metrics: RAGAS metric objects or column names (default: standard metrics in both)
+        on: Optional column(s) that identify the same row in both runs
+        by: Optional column name to compare per group (scenario, tag, ...)
+        n_boot: Bootstrap resamples (default: 1000)
+        confidence: Confidence level of the delta interval (default: 0.95)
+        seed: Bootstrap random seed (default: 0)
+
+    Returns:
+        pd.DataFrame: Per metric (and group) baseline and candidate means and
+            counts, delta = candidate - baseline, and delta_ci_low/delta_ci_high
+    """
+    columns = [c for c in metric_columns(baseline, metrics) if c in candidate.columns]
+    options = {"quantiles": (), "n_boot": n_boot, "confidence": confidence, "seed": seed}
+
+    if on is not None:
+        merged = _paired_frames(baseline, candidate, on, by, columns)
+        means = {**options, "n_boot": 0}
+        base = summarize(merged.rename(columns={f"{c}_baseline": c for c in columns}),
+                         columns, by, **means)
+        cand = summarize(merged.rename(columns={f"{c}_candidate": c for c in columns}),
+                         columns, by, **means)
+        diffs = pd.DataFrame({c: merged[f"{c}_candidate"] - merged[f"{c}_baseline"] for c in columns})
+        if by is not None:
+            diffs[by] = merged[by]
+        delta = summarize(diffs, columns, by, **options)
+        table = pd.DataFrame({
+            "baseline_count": base["count"],
+            "baseline_mean": base["mean"],
+            "candidate_count": cand["count"],
+            "candidate_mean": cand["mean"],
+            "delta": delta["mean"],
+        })
+        if n_boot:
+            table["delta_ci_low"] = delta["ci_low"]
+            table["delta_ci_high"] = delta["ci_high"]
+        return table
+
+    base = summarize(baseline, columns, by, **options)
+    cand = summarize(candidate, columns, by, **options)
+    table = pd.DataFrame({
+        "baseline_count": base["count"],
+        "baseline_mean": base["mean"],
+        "candidate_count": cand["count"],
+        "candidate_mean": cand["mean"],
+    })
+    table["delta"] = table["candidate_mean"] - table["baseline_mean"]
+    if n_boot:
+        # Independent runs: the delta's variance is the sum of both variances
+        half_widths = [
+            (frame["ci_high"] - frame["ci_low"]) / 2.0 for frame in (base, cand)
+        ]
+        spread = np.sqrt(half_widths[0] ** 2 + half_widths[1] ** 2)
+        table["delta_ci_low"] = table["delta"] - spread
+        table["delta_ci_high"] = table["delta"] + spread
+    return table
+
+
+def detect_regressions(baseline, candidate, metrics=None, on=None, by=None, tolerance=0.02,
+                       n_boot=1000, confidence=0.95, seed=0):
+    """
+    Find metrics (and groups) whose mean dropped significantly between two runs
+
+    A regression is a drop larger than tolerance whose confidence interval lies
+    entirely below zero.
+
+    Args:
+        baseline: Results DataFrame of the reference run
+        candidate: Results DataFrame of the new run
+        metrics: RAGAS metric objects or column names (default: standard metrics in both)
+        on: Optional column(s) pairing rows across runs
+        by: Optional column name to check per group (scenario, tag, ...)
+        tolerance: Allowed absolute drop in mean score (default: 0.02)
+        n_boot: Bootstrap resamples (default: 1000)
+        confidence: Confidence level (default: 0.95)
+        seed: Bootstrap random seed (default: 0)
+
+    Returns:
+        pd.DataFrame: The compare_runs rows that regressed (empty when there are none)
+    """
+    table = compare_runs(baseline, candidate, metrics, on=on, by=by, n_boot=n_boot,
+                         confidence=confidence, seed=seed)
+    regressed = table["delta"] < -tolerance
+    if n_boot:
+        regressed &= table["delta_ci_high"] < 0
+    return table[regressed]
@@ -0,0 +1,270 @@
+"""
+Batched Judge for RAGAS Evaluation
+Contains a chat model wrapper that packs many independent judge prompts into one request
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+BATCH_SYSTEM_PROMPT = (
+    "You will receive a JSON array of independent requests. Each request has an id and a list "
+    "of chat messages. Answer every request exactly as if it had been sent to you on its own, "
+    "following its instructions and output format. Return only a JSON array with one element "
+    "per request, in the same order. Each element must be a string containing your complete "
+    "reply to that request."
+)
+
+# Request options that change the shape of the reply and cannot be shared by a batch
+_UNBATCHABLE_KWARGS = ("tools", "functions", "tool_choice", "function_call", "response_format", "n")
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+def pack_requests(requests):
+    """
+    Build the chat messages of one batched request
+
+    Args:
+        requests: List of message lists, one per independent judge request
+
+    Returns:
+        list: System and user messages asking for a JSON array of replies
+    """
+    payload = [
+        {
+            "id": index,
+            "messages": [
+                {"role": _ROLES.get(message.type, message.type), "content": str(message.content)}
+                for message in messages
+            ],
+        }
+        for index, messages in enumerate(requests)
+    ]
+    return [
+        SystemMessage(content=BATCH_SYSTEM_PROMPT),
+        HumanMessage(content=json.dumps(payload, ensure_ascii=False)),
+    ]
+
+
+def unpack_replies(text, expected):
+    """
+    Parse a batched reply into one string per request
+
+    Args:
+        text: Raw completion text
+        expected: Number of requests in the batch
+
+    Returns:
+        list: Reply strings, or None when the reply is not a JSON array of
+            the expected length
+    """
+    text = _CODE_FENCE.sub("", text.strip())
+    start, end = text.find("["), text.rfind("]")
+    try:
+        replies = json.loads(text[start:end + 1] if start >= 0 and end > start else text)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(replies, dict):
+        replies = replies.get("responses") or replies.get("replies")
+    if not isinstance(replies, list) or len(replies) != expected:
+        return None
+    return [reply if isinstance(reply, str) else json.dumps(reply) for reply in replies]
+
+
+def split_usage(usage, count, index):
+    """
+    Token usage share of one item of a batch
+
+    Counts are split evenly and the remainder goes to the first items, so the
+    shares of all items add up to the batch's usage.
+
+    Args:
+        usage: token_usage of the batched request
+        count: Number of items in the batch
+        index: Position of the item in the batch
+
+    Returns:
+        dict: The item's share of every integer counter
+    """
+    share = {}
+    for name, value in usage.items():
+        if isinstance(value, int):
+            base, extra = divmod(value, count)
+            share[name] = base + (1 if index < extra else 0)
+    return share
+
+
+class _PendingBatch:
+    def __init__(self):
+        self.items = []
+        self.timer = None
+
+
+class BatchedChatModel(BaseChatModel):
+    """
+    Chat model wrapper that coalesces concurrent judge calls into batched requests
+
+    RAGAS issues many small, independent async judge calls (statement and
+    sentence checks across rows). Calls arriving within max_wait seconds of
+    each other are packed, up to max_batch_size, into one request whose
+    reply is a JSON array, and the replies are handed back to their callers.
+    If a batched reply cannot be parsed or the request fails, the items of
+    that batch are sent one by one instead. Synchronous calls and calls with
+    tools, stop sequences or multiple completions are passed through.
+
+    Token usage of a batch is split across its items (see split_usage), and
+    generation_info of the batched request is copied to every item with the
+    batch size and a batch_id added, so telemetry counts the packed request
+    once. Each item's queue_wait includes the time it waited for its batch.
+    """
+
+    llm: BaseChatModel
+    max_batch_size: int = 16
+    max_wait: float = 0.05
+    max_batch_tokens: int = 16384
+
+    _pending: dict = PrivateAttr(default_factory=dict)
+    _tasks: set = PrivateAttr(default_factory=set)
+    _counts: dict = PrivateAttr(default_factory=lambda: {
+        "items": 0, "batches": 0, "batched_items": 0, "fallbacks": 0, "requests": 0,
+    })
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self):
+        return f"batched-{self.llm._llm_type}"
+
+    @property
+    def _identifying_params(self):
+        return self.llm._identifying_params
+
+    def _get_llm_string(self, stop=None, **kwargs):
+        # Keep cache keys identical to those of the unwrapped model
+        return self.llm._get_llm_string(stop=stop, **kwargs)
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self._counts[name] += value
+
+    def stats(self):
+        """
+        Return batching counters
+
+        Returns:
+            dict: items judged, batches sent, items answered from batches,
+                batches that fell back to single calls, HTTP requests made and
+                requests_saved compared to one request per item
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        counts["requests_saved"] = counts["items"] - counts["requests"]
+        return counts
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._count(items=1, requests=1)
+        return self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _batchable(self, stop, kwargs):
+        return self.max_batch_size > 1 and stop is None and not any(
+            kwargs.get(name) not in (None, 1) for name in _UNBATCHABLE_KWARGS
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if not self._batchable(stop, kwargs):
+            self._count(items=1, requests=1)
+            return await self.llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        # Only requests with identical options (e.g. temperature) share a batch
+        key = (loop, json.dumps(kwargs, sort_keys=True, default=str))
+        future = loop.create_future()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch()
+            batch.timer = loop.call_later(self.max_wait, self._flush, key, batch)
+        batch.items.append((messages, future, time.perf_counter()))
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key, batch):
+        """Send a pending batch (called when it is full or max_wait has passed)"""
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        batch.timer.cancel()
+        # Hold a reference so the task is not garbage collected while it runs
+        task = key[0].create_task(self._run_batch(batch.items, json.loads(key[1])))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, items, kwargs):
+        self._count(items=len(items))
+        if len(items) == 1:
+            await self._run_single(items[0], kwargs)
+            return
+
+        per_item_tokens = getattr(self.llm, "max_tokens", None) or getattr(
+            getattr(self.llm, "llm", None), "max_tokens", None
+        ) or 1000
+        options = dict(kwargs, max_tokens=min(self.max_batch_tokens, per_item_tokens * len(items)))
+        self._count(requests=1)
+        try:
+            sent = time.perf_counter()
+            result = await self.llm._agenerate(pack_requests([item[0] for item in items]), **options)
+            generation = result.generations[0]
+            replies = unpack_replies(generation.text, len(items))
+        except Exception:
+            replies = None
+
+        if replies is None:
+            # Unparseable or failed batch: answer each item with its own request
+            self._count(fallbacks=1)
+            await asyncio.gather(*(self._run_single(item, kwargs) for item in items))
+            return
+
+        self._count(batches=1, batched_items=len(items))
+        usage = (result.llm_output or {}).get("token_usage") or {}
+        info = dict(generation.generation_info or {}, batch_size=len(items), batch_id=uuid.uuid4().hex)
+        for index, ((_, future, queued), reply) in enumerate(zip(items, replies)):
+            if not future.done():
+                share = split_usage(usage, len(items), index)
+                item_info = dict(info, queue_wait=float(info.get("queue_wait") or 0.0) + sent - queued)
+                reply_generation = ChatGeneration(message=AIMessage(content=reply), generation_info=item_info)
+                future.set_result(ChatResult(
+                    generations=[reply_generation],
+                    llm_output={**(result.llm_output or {}), "token_usage": share},
+                ))
+
+    async def _run_single(self, item, kwargs):
+        messages, future, queued = item
+        self._count(requests=1)
+        sent = time.perf_counter()
+        try:
+            result = await self.llm._agenerate(messages, **kwargs)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        for generation in result.generations:
+            info = dict(generation.generation_info or {})
+            info["queue_wait"] = float(info.get("queue_wait") or 0.0) + sent - queued
+            generation.generation_info = info
+        if not future.done():
+            future.set_result(result)
+
+    def _combine_llm_outputs(self, llm_outputs):
+        return self.llm._combine_llm_outputs(llm_outputs)
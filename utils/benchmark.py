@@ -0,0 +1,323 @@
+"""
+Evaluation Pipeline Benchmark
+Contains an end-to-end throughput benchmark of the RAGAS pipeline against the mock DIAL server
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .dataset_creator import create_synthetic_dataset
+from .langchain_wrappers import create_langchain_llm, create_langchain_embeddings
+from .mock_dial_server import MockDialServer
+
+DEFAULT_SIZES = (50, 200, 1000)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class MetricLatencyRecorder(BaseCallbackHandler):
+    """
+    Callback handler that times every per-row metric computation
+
+    RAGAS opens one chain run per (row, metric) named after the metric; the
+    duration of each such run is recorded.
+
+    Args:
+        metric_names: Names of the metrics to time
+    """
+
+    def __init__(self, metric_names):
+        self.latencies = {name: [] for name in metric_names}
+        self._starts = {}
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        if name in self.latencies:
+            with self._lock:
+                self._starts[run_id] = (name, time.perf_counter())
+
+    def _finish(self, run_id):
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            if started is not None:
+                name, start = started
+                self.latencies[name].append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+
+def latency_percentiles(values):
+    """Return p50/p95/p99 in milliseconds (None when there are no samples)"""
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "count": 0}
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1000.0, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "count": len(values)}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def benchmark_size(num_rows, metrics, llm, embeddings, seed=0):
+    """
+    Evaluate one synthetic dataset and measure throughput, latency and memory
+
+    Memory is the process peak RSS read from the OS, so the timed evaluation
+    runs without allocation tracing. The peak is a high-water mark of the
+    whole process; run_benchmark calls this in a fresh process per size, so
+    each size gets its own peak. startup_memory_mb is the peak before the
+    evaluation started (imports, models and the dataset).
+
+    Args:
+        num_rows: Dataset size
+        metrics: List of RAGAS metrics
+        llm: LangChain LLM pointing at the mock server
+        embeddings: LangChain embeddings pointing at the mock server
+        seed: Synthetic dataset seed (default: 0)
+
+    Returns:
+        dict: rows, seconds, rows_per_sec, startup_memory_mb, peak_memory_mb
+            and per-metric latency percentiles
+    """
+    from ragas import evaluate
+
+    dataset = create_synthetic_dataset(num_rows, seed=seed, num_contexts=3)
+    recorder = MetricLatencyRecorder([metric.name for metric in metrics])
+    startup_memory = peak_rss_mb()
+
+    start = time.perf_counter()
+    evaluate(
+        dataset,
+        metrics=metrics,
+        llm=llm,
+        embeddings=embeddings,
+        callbacks=[recorder],
+        show_progress=False
+    )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "rows": num_rows,
+        "seconds": elapsed,
+        "rows_per_sec": num_rows / elapsed if elapsed else None,
+        "startup_memory_mb": startup_memory,
+        "peak_memory_mb": peak_rss_mb(),
+        "metrics": {
+            name: latency_percentiles(values) for name, values in recorder.latencies.items()
+        },
+    }
+
+
+def _benchmark_worker(num_rows, seed, output):
+    """Benchmark one size in this process against the server in AZURE_ENDPOINT"""
+    from ragas.metrics import context_recall, context_precision, faithfulness, answer_correctness
+
+    metrics = [context_recall, context_precision, faithfulness, answer_correctness]
+    llm = create_langchain_llm()
+    embeddings = create_langchain_embeddings()
+    # The mock embeds raw text; skip tiktoken, which downloads its encodings
+    embeddings.check_embedding_ctx_length = False
+    result = benchmark_size(num_rows, metrics, llm, embeddings, seed=seed)
+    with open(output, "w") as f:
+        json.dump(result, f)
+
+
+def benchmark_size_in_subprocess(num_rows, base_url, seed=0):
+    """
+    Run benchmark_size in a fresh interpreter so its peak RSS belongs to this size alone
+
+    Args:
+        num_rows: Dataset size
+        base_url: Endpoint of a running mock DIAL server
+        seed: Synthetic dataset seed (default: 0)
+
+    Returns:
+        dict: The result of benchmark_size
+    """
+    env = dict(os.environ, AZURE_ENDPOINT=base_url, DIAL_API_KEY="mock-key")
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "result.json")
+        subprocess.run(
+            [sys.executable, "-m", "utils.benchmark", "--worker-size", str(num_rows),
+             "--seed", str(seed), "--worker-output", output],
+            cwd=_PROJECT_ROOT, env=env, check=True
+        )
+        with open(output) as f:
+            return json.load(f)
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, latency="lognormal:0.05:0.5", error_rate=0.0,
+                  rate_limit_rate=0.0, seed=0):
+    """
+    Run the evaluation pipeline against a local mock DIAL server at several sizes
+
+    The server runs in this process; every size is evaluated in a fresh
+    interpreter, so peak memory is measured per size.
+
+    Args:
+        sizes: Dataset sizes to benchmark (default: 50, 200, 1000)
+        latency: Mock server latency distribution (default: lognormal:0.05:0.5)
+        error_rate: Fraction of injected HTTP 500 responses (default: 0.0)
+        rate_limit_rate: Fraction of injected HTTP 429 responses (default: 0.0)
+        seed: Seed for the server and the synthetic datasets (default: 0)
+
+    Returns:
+        dict: Benchmark configuration and one result per size
+    """
+    server = MockDialServer(
+        latency=latency,
+        error_rate=error_rate,
+        rate_limit_rate=rate_limit_rate,
+        retry_after=0,
+        seed=seed
+    )
+
+    with server:
+        results = []
+        for size in sizes:
+            print(f"Benchmarking {size} rows...")
+            results.append(benchmark_size_in_subprocess(size, server.base_url, seed=seed))
+
+    return {
+        "config": {
+            "latency": latency,
+            "error_rate": error_rate,
+            "rate_limit_rate": rate_limit_rate,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=0.10):
+    """
+    Find throughput, latency and peak memory regressions against a previous report
+
+    Args:
+        report: Report returned by run_benchmark
+        baseline: Earlier report with the same sizes
+        tolerance: Allowed relative slowdown (default: 0.10)
+
+    Returns:
+        list: Human-readable regression messages (empty when there are none)
+    """
+    previous = {result["rows"]: result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(result["rows"])
+        if old is None:
+            continue
+        if old["rows_per_sec"] and result["rows_per_sec"] < old["rows_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{result['rows']} rows: throughput {result['rows_per_sec']:.2f} rows/s "
+                f"< baseline {old['rows_per_sec']:.2f} rows/s"
+            )
+        memory, old_memory = result.get("peak_memory_mb"), old.get("peak_memory_mb")
+        if memory and old_memory and memory > old_memory * (1 + tolerance):
+            regressions.append(
+                f"{result['rows']} rows: peak RSS {memory:.1f} MB > baseline {old_memory:.1f} MB"
+            )
+        for name, latency in result["metrics"].items():
+            old_p95 = old["metrics"].get(name, {}).get("p95_ms")
+            if old_p95 and latency["p95_ms"] and latency["p95_ms"] > old_p95 * (1 + tolerance):
+                regressions.append(
+                    f"{result['rows']} rows: {name} p95 {latency['p95_ms']:.1f} ms "
+                    f"> baseline {old_p95:.1f} ms"
+                )
+    return regressions
+
+
+def print_report(report):
+    """Print a benchmark report as a table"""
+    for result in report["results"]:
+        memory, startup = result["peak_memory_mb"], result.get("startup_memory_mb")
+        if memory is None:
+            memory_text = "n/a"
+        elif startup is None:
+            memory_text = f"{memory:.1f} MB"
+        else:
+            memory_text = f"{memory:.1f} MB (+{memory - startup:.1f} MB during evaluation)"
+        print(f"\n{result['rows']} rows: {result['rows_per_sec']:.2f} rows/s, "
+              f"{result['seconds']:.1f} s, peak RSS {memory_text}")
+        print(f"  {'metric':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, latency in result["metrics"].items():
+            if latency["count"]:
+                print(f"  {name:<22}{latency['p50_ms']:>10.1f}{latency['p95_ms']:>10.1f}"
+                      f"{latency['p99_ms']:>10.1f}")
+            else:
+                print(f"  {name:<22}{'n/a':>10}{'n/a':>10}{'n/a':>10}")
+
+
+def main():
+    """Run the benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="RAGAS evaluation pipeline throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--latency", default="lognormal:0.05:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Compare against an earlier JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    # Used by benchmark_size_in_subprocess to run one size per process
+    parser.add_argument("--worker-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_size is not None:
+        _benchmark_worker(args.worker_size, args.seed, args.worker_output)
+        return
+
+    print("RAGAS Evaluation Pipeline Benchmark")
+    print("=" * 50)
+    report = run_benchmark(
+        sizes=args.sizes,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved as {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions detected:")
+            for message in regressions:
+                print(f"  - {message}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
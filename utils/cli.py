@@ -0,0 +1,285 @@
+"""
+Command-Line Evaluation for RAGAS
+Contains a sharded evaluate command for fanning work out across processes or nodes, and a merge command
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+DEFAULT_METRICS = ("context_recall", "context_precision", "faithfulness", "answer_correctness")
+
+_PART_NAME = re.compile(r"^part-(\d+)-of-(\d+)\.jsonl$")
+
+
+def shard_bounds(num_rows, num_shards, shard_index):
+    """
+    Contiguous row range of one shard
+
+    Rows are split into num_shards ranges whose sizes differ by at most one,
+    so every shard keeps global row indices and the merge is a concatenation.
+
+    Returns:
+        tuple: (start, end) with end exclusive
+    """
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"shard_index must be in [0, {num_shards}), got {shard_index}")
+    base, extra = divmod(num_rows, num_shards)
+    start = shard_index * base + min(shard_index, extra)
+    return start, start + base + (1 if shard_index < extra else 0)
+
+
+def part_path(output_dir, shard_index, num_shards):
+    """Results part written by one shard"""
+    return os.path.join(output_dir, f"part-{shard_index:05d}-of-{num_shards:05d}.jsonl")
+
+
+def _done_path(part):
+    return f"{part}.done.json"
+
+
+def resolve_metrics(names):
+    """Map metric names to RAGAS metric objects"""
+    from ragas import metrics as ragas_metrics
+
+    resolved = []
+    for name in names:
+        metric = getattr(ragas_metrics, name, None)
+        if metric is None:
+            raise ValueError(f"Unknown RAGAS metric: {name}")
+        resolved.append(metric)
+    return resolved
+
+
+def read_dataset(path):
+    """Load a dataset file, or the built-in demo dataset when path is "demo" """
+    from .dataset_creator import create_ragas_dataset, load_dataset_file
+
+    if path == "demo":
+        return create_ragas_dataset().to_pandas()
+    return load_dataset_file(path)
+
+
+def read_shard(path, num_shards=1, shard_index=0):
+    """
+    Load only the rows of one shard
+
+    Dataset files are counted and then streamed, so each process holds its
+    own rows rather than the whole dataset.
+
+    Args:
+        path: Dataset file or "demo"
+        num_shards: Total number of shards (default: 1)
+        shard_index: Shard to load (default: 0)
+
+    Returns:
+        tuple: (rows DataFrame, start, end, total number of rows)
+    """
+    from .dataset_creator import count_dataset_rows, load_dataset_rows
+
+    if path == "demo":
+        df = read_dataset(path)
+        start, end = shard_bounds(len(df), num_shards, shard_index)
+        return df.iloc[start:end].reset_index(drop=True), start, end, len(df)
+
+    num_rows = count_dataset_rows(path)
+    start, end = shard_bounds(num_rows, num_shards, shard_index)
+    return load_dataset_rows(path, start, end), start, end, num_rows
+
+
+def run_shard(dataset_path, metric_names=DEFAULT_METRICS, llm_deployment="gpt-4.1-mini-2025-04-14",
+              embedding_deployment="text-embedding-3-small-1", num_shards=1, shard_index=0,
+              output_dir="ragas_results", shard_size=100, cache_path=None):
+    """
+    Evaluate one shard of a dataset into its own results part
+
+    The part is checkpointed like evaluate_in_shards, so a killed shard
+    resumes where it stopped. A .done.json marker is written when it completes.
+    A shard without rows (more shards than rows) writes an empty part.
+
+    Args:
+        dataset_path: CSV/JSONL/Parquet dataset file or "demo"
+        metric_names: RAGAS metric names (default: the four standard metrics)
+        llm_deployment: Judge deployment (default: gpt-4.1-mini-2025-04-14)
+        embedding_deployment: Embedding deployment (default: text-embedding-3-small-1)
+        num_shards: Total number of shards (default: 1)
+        shard_index: Shard evaluated by this process (default: 0)
+        output_dir: Directory for the result parts (default: "ragas_results")
+        shard_size: Checkpoint granularity in rows (default: 100)
+        cache_path: Optional SQLite judge cache file
+
+    Returns:
+        str: The part file written
+    """
+    rows, start, end, num_rows = read_shard(dataset_path, num_shards, shard_index)
+    print(f"Shard {shard_index + 1}/{num_shards}: rows {start}-{end - 1} of {num_rows}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    part = part_path(output_dir, shard_index, num_shards)
+    if end > start:
+        from .langchain_wrappers import create_langchain_llm, create_langchain_embeddings
+        from .llm_cache import SQLiteLLMCache
+        from .streaming_evaluator import evaluate_in_shards
+
+        cache = SQLiteLLMCache(cache_path) if cache_path else None
+        evaluate_in_shards(
+            rows.to_dict("records"),
+            resolve_metrics(metric_names),
+            llm=create_langchain_llm(llm_deployment, cache=cache),
+            embeddings=create_langchain_embeddings(embedding_deployment),
+            output_path=part,
+            shard_size=shard_size,
+            row_offset=start,
+            show_progress=False
+        )
+    else:
+        open(part, "w").close()
+
+    with open(_done_path(part), "w") as f:
+        json.dump({
+            "dataset": dataset_path,
+            "metrics": list(metric_names),
+            "llm_deployment": llm_deployment,
+            "embedding_deployment": embedding_deployment,
+            "start": start,
+            "end": end,
+            "rows": end - start,
+            "num_rows": num_rows,
+        }, f, indent=2)
+    return part
+
+
+def merge_parts(output_dir="ragas_results", output="ragas_evaluation_results", csv_path=None):
+    """
+    Combine the result parts of all shards into one results table
+
+    Parts are checked for completeness (every shard finished, row indices
+    cover the dataset exactly once) and concatenated in row order, so
+    aggregate scores equal those of a single-process run. Empty parts, from
+    shards that got no rows, are skipped.
+
+    Args:
+        output_dir: Directory with the result parts (default: "ragas_results")
+        output: Results store to write, see save_results (default: "ragas_evaluation_results")
+        csv_path: Optional CSV copy of the merged results
+
+    Returns:
+        pd.DataFrame: Merged results ordered by row_index
+    """
+    import numpy as np
+    import pandas as pd
+
+    from .results_store import save_results
+    from .streaming_evaluator import load_shard_results
+
+    parts = sorted(glob.glob(os.path.join(output_dir, "part-*-of-*.jsonl")))
+    if not parts:
+        raise FileNotFoundError(f"No result parts found in {output_dir}")
+
+    counts = {int(_PART_NAME.match(os.path.basename(p)).group(2)) for p in parts}
+    if len(counts) != 1:
+        raise ValueError(f"Parts from different shard counts in {output_dir}: {sorted(counts)}")
+    num_shards = counts.pop()
+    missing = [
+        index for index in range(num_shards)
+        if not os.path.exists(_done_path(part_path(output_dir, index, num_shards)))
+    ]
+    if missing:
+        raise ValueError(f"Shards {missing} of {num_shards} have not finished")
+
+    frames = []
+    for index in range(num_shards):
+        part = part_path(output_dir, index, num_shards)
+        with open(_done_path(part)) as f:
+            done = json.load(f)
+        num_rows = done["num_rows"]
+        # Shards without rows (more shards than rows) leave an empty part
+        if done.get("rows") != 0:
+            frames.append(load_shard_results(part))
+    if not frames:
+        raise ValueError(f"Parts in {output_dir} hold no rows")
+    merged = pd.concat(frames, ignore_index=True).sort_values("row_index", kind="stable", ignore_index=True)
+    if not np.array_equal(merged["row_index"].to_numpy(), np.arange(num_rows)):
+        raise ValueError(
+            f"Merged parts hold {len(merged)} rows with gaps or duplicates; expected {num_rows}"
+        )
+
+    save_results(merged, output)
+    if csv_path:
+        merged.to_csv(csv_path, index=False)
+    return merged
+
+
+def aggregate_scores(results):
+    """Mean of every metric column, ignoring failed (NaN) rows like RAGAS does"""
+    import numpy as np
+    import pandas as pd
+
+    columns = [name for name in DEFAULT_METRICS if name in results.columns] or [
+        name for name in results.columns
+        if name != "row_index" and pd.api.types.is_float_dtype(results[name])
+    ]
+    return {name: float(np.nanmean(results[name].to_numpy(dtype=np.float64))) for name in columns}
+
+
+def main(argv=None):
+    """Run the evaluate or merge command"""
+    parser = argparse.ArgumentParser(description="Sharded RAGAS evaluation")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evaluate = commands.add_parser("evaluate", help="Evaluate one shard of a dataset")
+    evaluate.add_argument("--dataset", required=True,
+                          help='CSV/JSONL/Parquet dataset file, or "demo" for the built-in dataset')
+    evaluate.add_argument("--metrics", nargs="+", default=list(DEFAULT_METRICS))
+    evaluate.add_argument("--llm-deployment", default="gpt-4.1-mini-2025-04-14")
+    evaluate.add_argument("--embedding-deployment", default="text-embedding-3-small-1")
+    evaluate.add_argument("--num-shards", type=int, default=1)
+    evaluate.add_argument("--shard-index", type=int, default=0)
+    evaluate.add_argument("--output-dir", default="ragas_results")
+    evaluate.add_argument("--shard-size", type=int, default=100,
+                          help="Rows per checkpoint within the shard")
+    evaluate.add_argument("--cache", help="SQLite judge cache file shared between runs")
+
+    merge = commands.add_parser("merge", help="Merge the result parts of all shards")
+    merge.add_argument("--output-dir", default="ragas_results")
+    merge.add_argument("--output", default="ragas_evaluation_results",
+                       help="Results store directory to write")
+    merge.add_argument("--csv", help="Also write the merged results as CSV")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "evaluate":
+        print("RAGAS Sharded Evaluation")
+        print("=" * 50)
+        part = run_shard(
+            args.dataset,
+            metric_names=args.metrics,
+            llm_deployment=args.llm_deployment,
+            embedding_deployment=args.embedding_deployment,
+            num_shards=args.num_shards,
+            shard_index=args.shard_index,
+            output_dir=args.output_dir,
+            shard_size=args.shard_size,
+            cache_path=args.cache
+        )
+        print(f"Status: Success Shard results saved as {part}")
+        return
+
+    print("RAGAS Result Merge")
+    print("=" * 50)
+    try:
+        merged = merge_parts(args.output_dir, args.output, args.csv)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Status: Success {len(merged)} rows merged into {args.output}")
+    print("Aggregate scores:")
+    for name, score in aggregate_scores(merged).items():
+        print(f"  - {name}: {score:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Client Factory for EPAM DIAL API
+Contains cached configuration loading and shared, pooled HTTP clients for all utils entry points
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+
+import httpx
+from dotenv import load_dotenv
+
+# Connection pool settings, overridable through the environment or configure_http_clients()
+_http_settings = {
+    "max_connections": int(os.getenv("DIAL_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("DIAL_MAX_KEEPALIVE_CONNECTIONS", "50")),
+    "keepalive_expiry": float(os.getenv("DIAL_KEEPALIVE_EXPIRY", "60")),
+    "http2": None,
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+# API settings, cached once an API key has been found
+_api_settings = {}
+
+
+def read_api_settings():
+    """
+    Read API settings from the environment and .env file once per process
+
+    Settings are only cached once an API key is found, so a key that is
+    added later (e.g. to .env) is picked up by the next call.
+
+    Returns:
+        tuple: (api_key or None, azure_endpoint, api_version)
+    """
+    if "settings" in _api_settings:
+        return _api_settings["settings"]
+
+    load_dotenv()
+
+    api_key = os.getenv('DIAL_API_KEY')
+    azure_endpoint = os.getenv('AZURE_ENDPOINT', 'https://ai-proxy.lab.epam.com')
+    api_version = os.getenv('API_VERSION', '2024-02-01')
+
+    if api_key:
+        _api_settings["settings"] = (api_key, azure_endpoint, api_version)
+    return api_key, azure_endpoint, api_version
+
+
+def load_api_config():
+    """Load API configuration from .env file (read once and cached)"""
+    api_key, azure_endpoint, api_version = read_api_settings()
+
+    if not api_key:
+        raise ValueError("DIAL_API_KEY not found in .env file")
+
+    return api_key, azure_endpoint, api_version
+
+
+def http2_available():
+    """Return True when the optional h2 package is installed"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def configure_http_clients(max_connections=None, max_keepalive_connections=None,
+                           keepalive_expiry=None, http2=None):
+    """
+    Tune the shared connection pools
+
+    Existing clients are closed, so call this before creating models.
+
+    Args:
+        max_connections: Maximum concurrent connections per client (default: 100)
+        max_keepalive_connections: Idle connections kept open (default: 50)
+        keepalive_expiry: Seconds an idle connection is kept (default: 60)
+        http2: Force HTTP/2 on or off; None enables it when h2 is installed
+    """
+    for name, value in (("max_connections", max_connections),
+                        ("max_keepalive_connections", max_keepalive_connections),
+                        ("keepalive_expiry", keepalive_expiry),
+                        ("http2", http2)):
+        if value is not None:
+            _http_settings[name] = value
+    reset_clients()
+
+
+def _transport_kwargs():
+    http2 = _http_settings["http2"]
+    return {
+        "limits": httpx.Limits(
+            max_connections=_http_settings["max_connections"],
+            max_keepalive_connections=_http_settings["max_keepalive_connections"],
+            keepalive_expiry=_http_settings["keepalive_expiry"],
+        ),
+        "http2": http2_available() if http2 is None else http2,
+    }
+
+
+class _LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport that keeps one connection pool per event loop
+
+    Async connections are bound to the loop that opened them, while RAGAS may
+    run successive evaluations on different loops. Keeping a pool per loop lets
+    a single AsyncClient be shared safely.
+    """
+
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs
+        self._transports = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._closing = set()
+        self._closed = False
+
+    def _transport(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot send a request, as the client has been closed.")
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+                self._transports[loop] = transport
+            return transport
+
+    async def handle_async_request(self, request):
+        return await self._transport().handle_async_request(request)
+
+    def close(self):
+        """
+        Close the pools of every event loop and refuse further requests
+
+        Each pool is closed on its own loop: awaited in the background on the
+        running loop, handed to a loop running in another thread, or run to
+        completion on an idle loop. Pools of closed loops went with their loop.
+        """
+        with self._lock:
+            self._closed = True
+            transports = list(self._transports.items())
+            self._transports.clear()
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+
+        for loop, transport in transports:
+            if loop.is_closed():
+                continue
+            if loop is current:
+                task = loop.create_task(transport.aclose())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(transport.aclose(), loop)
+            elif current is None:
+                loop.run_until_complete(transport.aclose())
+
+    async def aclose(self):
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        self.close()
+        if transport is not None:
+            await transport.aclose()
+
+
+def get_http_client():
+    """
+    Return the process-wide pooled keep-alive HTTP client
+
+    Returns:
+        httpx.Client: Shared by the LLM, embeddings and deployment explorer
+    """
+    with _clients_lock:
+        if "sync" not in _clients:
+            _clients["sync"] = httpx.Client(
+                transport=httpx.HTTPTransport(**_transport_kwargs()),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+        return _clients["sync"]
+
+
+def get_async_http_client():
+    """
+    Return the process-wide pooled keep-alive async HTTP client
+
+    Returns:
+        httpx.AsyncClient: Shared by the async LLM and embedding calls
+    """
+    with _clients_lock:
+        if "async" not in _clients:
+            _clients["async_transport"] = _LoopLocalTransport(**_transport_kwargs())
+            _clients["async"] = httpx.AsyncClient(
+                transport=_clients["async_transport"],
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+        return _clients["async"]
+
+
+def reset_clients():
+    """Drop the cached configuration and close the shared clients (e.g. after changing the environment)"""
+    _api_settings.clear()
+    with _clients_lock:
+        client = _clients.pop("sync", None)
+        _clients.pop("async", None)
+        async_transport = _clients.pop("async_transport", None)
+    if client is not None:
+        client.close()
+    if async_transport is not None:
+        # Closes the keep-alive connections of every event loop the client was used on
+        async_transport.close()
@@ -1,10 +1,62 @@
 """
 Dataset Creator Utility for RAGAS Evaluation
-Contains functions to create fake datasets for testing RAGAS metrics
+Contains functions to create fake datasets for testing RAGAS metrics and to stream production traces
 """
 
+import ast
+import hashlib
+import io
+import itertools
+import json
+import os
+import random
+from collections import OrderedDict
+
 import pandas as pd
 
+# Scenario families covered by the synthetic generator (same as the hand-written dataset)
+SCENARIOS = (
+    "perfect",
+    "low_context_recall",
+    "low_context_precision",
+    "low_faithfulness",
+    "low_answer_correctness",
+    "partial_answer",
+)
+
+_NAME_PARTS = ["Al", "Bor", "Cal", "Dun", "El", "Fen", "Gar", "Hol", "Ir", "Jor", "Kel", "Lum",
+               "Mor", "Nel", "Or", "Pel", "Quin", "Ros", "Sel", "Tor", "Ul", "Var", "Wen", "Zan"]
+_CITIES = ["Lisbon", "Oslo", "Kyoto", "Lima", "Nairobi", "Perth", "Quebec", "Seville", "Tallinn",
+           "Valencia", "Warsaw", "Zurich", "Austin", "Bergen", "Cordoba", "Dublin"]
+_PEOPLE = ["Ada Moreno", "Ben Okafor", "Clara Weiss", "Dmitri Volkov", "Elena Rossi", "Farid Haddad",
+           "Grace Lin", "Hugo Blanc", "Ines Duarte", "Jonas Berg", "Kira Tanaka", "Liam Walsh"]
+_PRODUCTS = ["solar inverters", "river ferries", "field microscopes", "wool textiles", "rail signals",
+             "coffee roasters", "weather balloons", "harbour cranes", "violin strings", "seed banks"]
+_FILLER = [
+    "The surrounding region has a temperate climate with mild winters.",
+    "Local markets are busiest during the autumn harvest season.",
+    "Several museums in the area focus on maritime history.",
+    "Public transport connects the old town with the northern suburbs.",
+    "Annual festivals attract visitors from neighbouring countries.",
+    "Cooking classes are a popular weekend activity for residents.",
+    "The main library was renovated with a modern reading room.",
+    "Hiking trails follow the river valley for many kilometres.",
+]
+
+# (attribute, question template, fact template, value generator)
+_ATTRIBUTES = [
+    ("founded", "When was {e} founded?", "{e} was founded in {v}.",
+     lambda rng: str(rng.randint(1820, 2020))),
+    ("location", "Where is {e} headquartered?", "{e} is headquartered in {v}.",
+     lambda rng: rng.choice(_CITIES)),
+    ("employees", "How many people does {e} employ?", "{e} employs {v} people.",
+     lambda rng: f"{rng.randint(12, 95000):,}"),
+    ("founder", "Who founded {e}?", "{e} was founded by {v}.",
+     lambda rng: rng.choice(_PEOPLE)),
+    ("product", "What is {e} best known for?", "{e} is best known for its {v}.",
+     lambda rng: rng.choice(_PRODUCTS)),
+]
+
 def create_fake_ragas_dataset():
     """
     Create a fake dataset with diverse examples covering different RAG evaluation scenarios
@@ -182,9 +234,656 @@ def create_ragas_dataset():
     
     return dataset
 
-def save_dataset(df, filename="fake_ragas_data.csv"):
-    """Save the dataset to a CSV file"""
-    df.to_csv(filename, index=False)
+def _entity_facts(rng):
+    """Create a fictional entity with a value for every attribute"""
+    entity = "".join(rng.sample(_NAME_PARTS, 2)) + rng.choice([" Labs", " Works", " Group", " Trust"])
+    values = {name: make_value(rng) for name, _, _, make_value in _ATTRIBUTES}
+    return entity, values
+
+
+def _fact(attribute, entity, value):
+    template = next(fact for name, _, fact, _ in _ATTRIBUTES if name == attribute)
+    return template.format(e=entity, v=value)
+
+
+def _chunk(rng, sentences, context_sentences):
+    """Pad sentences with filler text up to context_sentences and join them"""
+    padding = [rng.choice(_FILLER) for _ in range(max(context_sentences - len(sentences), 0))]
+    return " ".join(sentences + padding)
+
+
+def _distractor_chunks(rng, count, context_sentences):
+    """Create count distinct chunks about other fictional entities"""
+    chunks = []
+    seen = set()
+    while len(chunks) < count:
+        entity, values = _entity_facts(rng)
+        names = [name for name, _, _, _ in _ATTRIBUTES]
+        for name in rng.sample(names, len(names)):
+            chunk = _chunk(rng, [_fact(name, entity, values[name])], context_sentences)
+            if chunk not in seen and len(chunks) < count:
+                seen.add(chunk)
+                chunks.append(chunk)
+    return chunks
+
+
+def _synthetic_row(rng, scenario, num_contexts, context_sentences):
+    """Build one evaluation row for a scenario family"""
+    entity, values = _entity_facts(rng)
+    attribute, question, _, make_value = rng.choice(_ATTRIBUTES)
+    others = [name for name, _, _, _ in _ATTRIBUTES if name != attribute]
+    key_fact = _fact(attribute, entity, values[attribute])
+    side_facts = [_fact(name, entity, values[name]) for name in others]
+    ground_truth = values[attribute]
+    answer = key_fact
+
+    distractors = _distractor_chunks(rng, num_contexts - 1, context_sentences)
+
+    if scenario == "perfect":
+        contexts = [_chunk(rng, [key_fact] + side_facts[:1], context_sentences)]
+    elif scenario == "low_context_recall":
+        # The key fact is never retrieved
+        contexts = [_chunk(rng, side_facts[:2], context_sentences)]
+    elif scenario == "low_context_precision":
+        # Mostly irrelevant chunks, with the relevant one ranked last; a single
+        # chunk buries the key fact behind unrelated sentences instead
+        if distractors:
+            contexts = distractors + [_chunk(rng, [key_fact], context_sentences)]
+        else:
+            noise = [rng.choice(_FILLER) for _ in range(max(context_sentences - 1, 2))]
+            contexts = [" ".join(noise + [key_fact])]
+    elif scenario == "low_faithfulness":
+        # Answer adds claims that are not in the retrieved context
+        contexts = [_chunk(rng, [key_fact], context_sentences)]
+        invented = {name: _ATTRIBUTES[i][3](rng) for i, (name, _, _, _) in enumerate(_ATTRIBUTES)}
+        answer = " ".join([key_fact] + [_fact(name, entity, invented[name]) for name in others[:2]])
+    elif scenario == "low_answer_correctness":
+        # Good context, but the answer states a different value
+        contexts = [_chunk(rng, [key_fact] + side_facts[:1], context_sentences)]
+        wrong = make_value(rng)
+        while wrong == values[attribute]:
+            wrong = make_value(rng)
+        answer = _fact(attribute, entity, wrong)
+    elif scenario == "partial_answer":
+        # Reference covers several facts, the answer only one of them
+        contexts = [_chunk(rng, [key_fact] + side_facts[:2], context_sentences)]
+        ground_truth = "; ".join([values[attribute]] + [values[name] for name in others[:2]])
+        question = f"Summarize what is known about {{e}}: {attribute}, {others[0]} and {others[1]}."
+    else:
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    if scenario != "low_context_precision":
+        # Fill up to num_contexts with unrelated chunks, keeping the scenario's own chunk first
+        contexts = contexts + distractors
+    return {
+        "question": question.format(e=entity),
+        "answer": answer,
+        "context": " ".join(contexts),
+        "ground_truth": ground_truth,
+        "retrieved_contexts": contexts,
+        "scenario": scenario,
+    }
+
+
+def iter_synthetic_rows(num_rows, scenarios=SCENARIOS, num_contexts=1, context_sentences=3, seed=0):
+    """
+    Stream synthetic RAGAS rows in the same schema as create_ragas_dataset
+
+    Rows cycle through the scenario families and are generated one at a time,
+    so any number of rows can be produced in constant memory. Each row is
+    seeded from (seed, row index), which makes generation reproducible and lets
+    parallel workers generate disjoint slices.
+
+    Args:
+        num_rows: Number of rows to generate
+        scenarios: Scenario families to cycle through, each listed once, or a
+            {scenario: weight} dict with integer weights (default: all of SCENARIOS)
+        num_contexts: Retrieved contexts per row, an int or a (min, max) range (default: 1)
+        context_sentences: Sentences per context chunk, an int or a (min, max) range (default: 3)
+        seed: Base random seed (default: 0)
+
+    Yields:
+        dict: question, answer, context, ground_truth, retrieved_contexts and scenario
+    """
+    if isinstance(scenarios, dict):
+        cycle = [name for name, weight in scenarios.items() for _ in range(weight)]
+    else:
+        cycle = list(scenarios)
+        duplicates = sorted({name for name in cycle if cycle.count(name) > 1})
+        if duplicates:
+            raise ValueError(
+                f"Scenarios {duplicates} are listed more than once; pass a {{scenario: weight}} dict "
+                "to weight scenarios"
+            )
+    for index in range(num_rows):
+        rng = random.Random(seed * 1_000_003 + index)
+        contexts = num_contexts if isinstance(num_contexts, int) else rng.randint(*num_contexts)
+        sentences = (context_sentences if isinstance(context_sentences, int)
+                     else rng.randint(*context_sentences))
+        yield _synthetic_row(rng, cycle[index % len(cycle)], contexts, sentences)
+
+
+def create_synthetic_dataset(num_rows, cache_dir=None, **generator_kwargs):
+    """
+    Create a HuggingFace Dataset of synthetic rows without building them in memory
+
+    Rows are streamed from iter_synthetic_rows into Arrow files on disk in
+    batches, and the returned dataset is memory-mapped.
+
+    Args:
+        num_rows: Number of rows to generate
+        cache_dir: Optional HuggingFace cache directory for the Arrow files
+        **generator_kwargs: Options passed to iter_synthetic_rows
+
+    Returns:
+        Dataset: Memory-mapped HuggingFace dataset
+    """
+    from datasets import Dataset
+
+    return Dataset.from_generator(
+        iter_synthetic_rows,
+        gen_kwargs={"num_rows": num_rows, **generator_kwargs},
+        cache_dir=cache_dir
+    )
+
+
+def _parquet_schema(chunk):
+    """
+    Schema of a streamed Parquet file, fixed by its first chunk
+
+    The dataset columns get their known types. Any other column that is null
+    throughout the first chunk is stored as string rather than the null type,
+    so later chunks with values can still be written.
+    """
+    import pyarrow as pa
+
+    known = {
+        "question": pa.string(),
+        "answer": pa.string(),
+        "context": pa.string(),
+        "ground_truth": pa.string(),
+        "retrieved_contexts": pa.list_(pa.string()),
+        "scenario": pa.string(),
+    }
+    fields = []
+    for field in pa.Table.from_pylist(chunk).schema:
+        inferred = pa.string() if pa.types.is_null(field.type) else field.type
+        fields.append(pa.field(field.name, known.get(field.name, inferred)))
+    return pa.schema(fields)
+
+
+def _write_chunk(chunk, filename, file_format, state):
+    """Append one chunk of row dicts to filename, keeping writer state between calls"""
+    if file_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if "writer" not in state:
+            state["schema"] = _parquet_schema(chunk)
+            state["writer"] = pq.ParquetWriter(filename, state["schema"])
+        state["writer"].write_table(pa.Table.from_pylist(chunk, schema=state["schema"]))
+    elif file_format == "jsonl":
+        with open(filename, "a", encoding="utf-8") as f:
+            for row in chunk:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        pd.DataFrame(chunk).to_csv(
+            filename, mode="a", header=not state.get("header_written"), index=False
+        )
+        state["header_written"] = True
+
+
+def save_dataset(df, filename="fake_ragas_data.csv", chunk_size=10000):
+    """
+    Save the dataset to a CSV, JSONL or Parquet file
+
+    A DataFrame is written in one go. Any other iterable of row dicts (for
+    example iter_synthetic_rows) is streamed to disk in chunks of chunk_size
+    rows, so the full dataset is never held in memory.
+
+    Args:
+        df: pandas DataFrame or iterable of row dicts
+        filename: Output file; the format follows the extension (.jsonl, .parquet,
+            anything else is written as CSV)
+        chunk_size: Rows per chunk when streaming an iterable (default: 10000)
+
+    Returns:
+        str: The output filename
+    """
+    file_format = os.path.splitext(filename)[1].lstrip(".").lower()
+    if file_format not in ("csv", "jsonl", "parquet"):
+        # Any other name is written as CSV, as save_dataset always did
+        file_format = "csv"
+
+    if isinstance(df, pd.DataFrame):
+        if file_format == "parquet":
+            df.to_parquet(filename, index=False)
+        elif file_format == "jsonl":
+            df.to_json(filename, orient="records", lines=True, force_ascii=False)
+        else:
+            df.to_csv(filename, index=False)
+        print(f"Dataset saved as {filename}")
+        print(f"Dataset shape: {df.shape}")
+        return filename
+
+    if os.path.exists(filename):
+        os.remove(filename)
+
+    state = {}
+    num_rows = 0
+    chunk = []
+    try:
+        for row in df:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                _write_chunk(chunk, filename, file_format, state)
+                num_rows += len(chunk)
+                chunk = []
+        if chunk:
+            _write_chunk(chunk, filename, file_format, state)
+            num_rows += len(chunk)
+    finally:
+        if "writer" in state:
+            state["writer"].close()
+
     print(f"Dataset saved as {filename}")
-    print(f"Dataset shape: {df.shape}")
+    print(f"Dataset rows: {num_rows}")
     return filename
+
+
+def load_dataset_file(filename):
+    """
+    Load a dataset written by save_dataset (CSV, JSONL or Parquet)
+
+    List columns such as retrieved_contexts come back as Python lists; CSV
+    stores them as stringified lists, which are parsed here.
+
+    Args:
+        filename: Dataset file; the format follows the extension
+
+    Returns:
+        pd.DataFrame: The dataset rows
+    """
+    file_format = os.path.splitext(filename)[1].lstrip(".").lower()
+    if file_format == "parquet":
+        df = pd.read_parquet(filename)
+    elif file_format == "jsonl":
+        df = pd.read_json(filename, lines=True, dtype=False)
+    elif file_format == "csv":
+        df = pd.read_csv(filename, keep_default_na=False)
+    else:
+        raise ValueError(f"Unsupported dataset format: {filename}")
+    return _parse_list_columns(df)
+
+
+def _parse_list_columns(df):
+    """Turn context columns (stringified in CSV, arrays in Parquet) into Python lists"""
+    for column in ("retrieved_contexts", "contexts"):
+        if column in df.columns:
+            df[column] = [
+                ast.literal_eval(value) if isinstance(value, str) else list(value)
+                for value in df[column]
+            ]
+    return df
+
+
+def count_dataset_rows(filename, chunk_size=10000):
+    """
+    Count the rows of a dataset file without loading it
+
+    Parquet reads the count from the footer; JSONL counts non-blank lines;
+    CSV is parsed in chunks of one column, so quoted multi-line values are
+    counted correctly.
+
+    Args:
+        filename: Dataset file written by save_dataset
+        chunk_size: Rows per parsed CSV chunk (default: 10000)
+
+    Returns:
+        int: Number of rows
+    """
+    file_format = os.path.splitext(filename)[1].lstrip(".").lower()
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(filename).metadata.num_rows
+    if file_format == "jsonl":
+        with open(filename, "rb") as f:
+            return sum(1 for line in f if line.strip())
+    if file_format == "csv":
+        chunks = pd.read_csv(filename, usecols=[0], chunksize=chunk_size, keep_default_na=False)
+        return sum(len(chunk) for chunk in chunks)
+    raise ValueError(f"Unsupported dataset format: {filename}")
+
+
+def load_dataset_rows(filename, start, end, chunk_size=10000):
+    """
+    Load rows [start, end) of a dataset file, keeping at most one chunk of other rows in memory
+
+    Parquet only reads the row groups that overlap the range; JSONL and CSV
+    are streamed and only the requested rows are kept.
+
+    Args:
+        filename: Dataset file written by save_dataset
+        start: First row to load
+        end: Row after the last one to load
+        chunk_size: Rows per streamed batch (default: 10000)
+
+    Returns:
+        pd.DataFrame: The rows, with a fresh 0-based index
+    """
+    file_format = os.path.splitext(filename)[1].lstrip(".").lower()
+    if file_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(filename)
+        groups, skip, position = [], None, 0
+        for index in range(parquet.metadata.num_row_groups):
+            group_rows = parquet.metadata.row_group(index).num_rows
+            if position < end and position + group_rows > start:
+                groups.append(index)
+                skip = position if skip is None else skip
+            position += group_rows
+        batches = []
+        position = skip or 0
+        for batch in parquet.iter_batches(batch_size=chunk_size, row_groups=groups):
+            low, high = max(start - position, 0), min(end - position, batch.num_rows)
+            if high > low:
+                batches.append(batch.slice(low, high - low))
+            position += batch.num_rows
+        table = pa.Table.from_batches(batches, schema=parquet.schema_arrow)
+        df = table.to_pandas()
+    elif file_format == "jsonl":
+        with open(filename, encoding="utf-8") as f:
+            lines = list(itertools.islice((line for line in f if line.strip()), start, end))
+        df = pd.read_json(io.StringIO("".join(lines)), lines=True, dtype=False) if lines else pd.DataFrame()
+    elif file_format == "csv":
+        chunks, position = [], 0
+        for chunk in pd.read_csv(filename, chunksize=chunk_size, keep_default_na=False):
+            if position + len(chunk) > start:
+                chunks.append(chunk.iloc[max(start - position, 0):max(end - position, 0)])
+            position += len(chunk)
+            if position >= end:
+                break
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    else:
+        raise ValueError(f"Unsupported dataset format: {filename}")
+    return _parse_list_columns(df.reset_index(drop=True))
+
+
+# Source fields tried, in order, for each evaluation column when no mapping is given
+TRACE_FIELD_CANDIDATES = {
+    "question": ("question", "user_input", "query", "input"),
+    "answer": ("answer", "response", "output"),
+    "ground_truth": ("ground_truth", "reference", "expected_answer"),
+    "retrieved_contexts": ("retrieved_contexts", "contexts", "documents"),
+}
+
+# Keys holding the text of a retrieved document given as a dict
+_CONTEXT_TEXT_KEYS = ("text", "page_content", "content")
+
+
+def _trace_files(path):
+    """
+    Expand a file, directory, glob pattern or list of those into sorted trace files
+
+    Raises:
+        FileNotFoundError: When an entry matches no trace file
+    """
+    import glob
+
+    paths = [path] if isinstance(path, str) else list(path)
+    files = []
+    for entry in paths:
+        pattern = os.path.join(entry, "*") if os.path.isdir(entry) else entry
+        if any(c in pattern for c in "*?["):
+            matches = [
+                match for match in sorted(glob.glob(pattern))
+                if match.endswith((".jsonl", ".jsonl.gz", ".parquet"))
+            ]
+        else:
+            matches = [pattern] if os.path.isfile(pattern) else []
+        if not matches:
+            raise FileNotFoundError(f"No trace files match {entry}")
+        files.extend(matches)
+    return files
+
+
+def _source_columns(fields):
+    """Top-level columns a mapping reads, or None when a callable needs whole records"""
+    columns = set()
+    for source in fields.values():
+        if callable(source):
+            return None
+        for candidate in (source,) if isinstance(source, str) else source:
+            columns.add(candidate.split(".")[0].replace("[]", ""))
+    return sorted(columns)
+
+
+def _iter_trace_batches(filename, chunk_size, columns=None):
+    """Read one JSONL (optionally gzipped) or Parquet trace file in batches of records"""
+    if filename.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(filename)
+        if columns is not None:
+            columns = [name for name in columns if name in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pylist()
+    elif filename.endswith((".jsonl", ".jsonl.gz")):
+        import gzip
+
+        opener = gzip.open if filename.endswith(".gz") else open
+        with opener(filename, "rt", encoding="utf-8") as f:
+            batch = []
+            for line in f:
+                if line.strip():
+                    batch.append(json.loads(line))
+                if len(batch) >= chunk_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+    else:
+        raise ValueError(f"Unsupported trace format: {filename}")
+
+
+def _lookup(record, path):
+    """
+    Read a dotted path from a nested record
+
+    "[]" after a key maps the rest of the path over a list, e.g.
+    "retrieval.documents[].text" returns the text of every document.
+    """
+    value = record
+    parts = path.split(".")
+    for position, part in enumerate(parts):
+        over_list = part.endswith("[]")
+        key = part[:-2] if over_list else part
+        if key:
+            if not isinstance(value, dict) or key not in value:
+                return None
+            value = value[key]
+        if over_list:
+            rest = ".".join(parts[position + 1:])
+            if not isinstance(value, (list, tuple)):
+                return None
+            return [_lookup(item, rest) if rest else item for item in value]
+    return value
+
+
+def _field_getter(source):
+    """Compile a field mapping entry into a callable(record)"""
+    if callable(source):
+        return source
+    candidates = (source,) if isinstance(source, str) else tuple(source)
+    if any("." in candidate or "[]" in candidate for candidate in candidates):
+        def get(record):
+            for candidate in candidates:
+                value = _lookup(record, candidate)
+                if value is not None:
+                    return value
+            return None
+        return get
+
+    # Plain top-level keys, the common case, skip path parsing
+    def get_key(record):
+        for candidate in candidates:
+            value = record.get(candidate)
+            if value is not None:
+                return value
+        return None
+    return get_key
+
+
+def _as_contexts(value):
+    """Normalize retrieved documents to a list of strings"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    contexts = []
+    for item in value:
+        if isinstance(item, dict):
+            item = next((item[key] for key in _CONTEXT_TEXT_KEYS if key in item), None)
+        if item is not None:
+            contexts.append(str(item))
+    return contexts
+
+
+def question_hash(question):
+    """sha256 of a question with whitespace and case normalized, used for dedupe and sampling"""
+    normalized = " ".join(str(question).split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).digest()
+
+
+def iter_trace_rows(path, fields=None, filter_fn=None, sample_rate=None, seed=0, dedupe=True,
+                    required=("question", "answer"), chunk_size=10000, stats=None, dedupe_window=None):
+    """
+    Stream production RAG traces as rows in the create_ragas_dataset schema
+
+    Trace files are read chunk_size records at a time, so memory stays
+    bounded regardless of file size. Each record is mapped into question,
+    answer, context, ground_truth and retrieved_contexts, then filtered,
+    sampled and deduplicated on the fly. Sampling keeps a question when its
+    hash falls below sample_rate, so the same questions are picked on every
+    run and by every process; dedupe keeps the first occurrence of each
+    question hash.
+
+    Exact dedupe remembers every distinct question hash, about 100 bytes
+    each (roughly 1 GB per 10 million distinct questions). With
+    dedupe_window the memory is bounded instead: only the most recently seen
+    questions are remembered (LRU), so repeats further apart than the window
+    are kept again.
+
+    Args:
+        path: JSONL, gzipped JSONL or Parquet file, a directory or glob of
+            them, or a list of those
+        fields: Optional mapping of output column to source field: a dotted
+            path such as "request.query" ("docs[].text" maps over a list), a
+            tuple of paths tried in order, or a callable(record). Standard
+            columns not given use TRACE_FIELD_CANDIDATES; extra entries
+            (e.g. {"trace_id": "id"}) become extra columns
+        filter_fn: Optional callable(row) -> bool applied to mapped rows
+        sample_rate: Optional fraction of distinct questions to keep (default: None, all)
+        seed: Sampling seed; another seed picks a different sample (default: 0)
+        dedupe: Drop rows whose question was already seen (default: True)
+        required: Columns that must be present; rows missing one are skipped
+            (default: ("question", "answer"))
+        chunk_size: Records read per batch (default: 10000)
+        stats: Optional dict updated in place with read, kept, incomplete,
+            filtered, sampled_out and duplicate counts
+        dedupe_window: Optional number of distinct recent questions to
+            remember for dedupe (default: None, every question)
+
+    Yields:
+        dict: question, answer, context, ground_truth, retrieved_contexts and
+            any extra mapped columns
+    """
+    fields = {**TRACE_FIELD_CANDIDATES, **(fields or {})}
+    columns = _source_columns(fields)
+    getters = {name: _field_getter(source) for name, source in fields.items()}
+    get_question = getters.pop("question")
+    counts = stats if stats is not None else {}
+    for name in ("read", "kept", "incomplete", "filtered", "sampled_out", "duplicate"):
+        counts.setdefault(name, 0)
+    seen = set() if dedupe_window is None else OrderedDict()
+    salt = str(seed).encode("utf-8")
+    threshold = None if sample_rate is None else int(sample_rate * 2 ** 64)
+
+    for filename in _trace_files(path):
+        for batch in _iter_trace_batches(filename, chunk_size, columns):
+            for record in batch:
+                counts["read"] += 1
+                question = get_question(record)
+                if question in (None, ""):
+                    counts["incomplete"] += 1
+                    continue
+
+                # Sampling only looks at the question, so rejected records are never mapped
+                digest = question_hash(question)
+                if threshold is not None:
+                    bucket = int.from_bytes(hashlib.sha256(salt + digest).digest()[:8], "big")
+                    if bucket >= threshold:
+                        counts["sampled_out"] += 1
+                        continue
+
+                row = {"question": question}
+                row.update((name, get(record)) for name, get in getters.items())
+                row["retrieved_contexts"] = _as_contexts(row["retrieved_contexts"])
+                row["context"] = " ".join(row["retrieved_contexts"])
+                if any(row.get(name) in (None, "", []) for name in required):
+                    counts["incomplete"] += 1
+                    continue
+                if filter_fn is not None and not filter_fn(row):
+                    counts["filtered"] += 1
+                    continue
+                if dedupe:
+                    if digest in seen:
+                        counts["duplicate"] += 1
+                        if dedupe_window is not None:
+                            seen.move_to_end(digest)
+                        continue
+                    if dedupe_window is None:
+                        seen.add(digest)
+                    else:
+                        seen[digest] = None
+                        if len(seen) > dedupe_window:
+                            seen.popitem(last=False)
+
+                counts["kept"] += 1
+                yield {
+                    "question": row.pop("question"),
+                    "answer": row.pop("answer"),
+                    "context": row.pop("context"),
+                    "ground_truth": row.pop("ground_truth"),
+                    "retrieved_contexts": row.pop("retrieved_contexts"),
+                    **row,
+                }
+
+
+def load_trace_dataset(path, **trace_kwargs):
+    """
+    Create a lazily-materialized HuggingFace dataset from production traces
+
+    Nothing is read until the dataset is iterated, and rows are produced as
+    the files are streamed, so evaluate_in_shards can score the first shard
+    while the rest of the file is still unread.
+
+    Args:
+        path: Trace file(s), see iter_trace_rows
+        **trace_kwargs: Options passed to iter_trace_rows (fields, filter_fn,
+            sample_rate, seed, dedupe, dedupe_window, required, chunk_size)
+
+    Returns:
+        IterableDataset: Streaming HuggingFace dataset
+    """
+    from datasets import IterableDataset
+
+    # A tuple keeps all files in one generator call; datasets would split a
+    # list into shards with separate dedupe state
+    paths = tuple(_trace_files(path))
+    return IterableDataset.from_generator(
+        iter_trace_rows, gen_kwargs={"path": paths, **trace_kwargs}
+    )
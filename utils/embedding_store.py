@@ -0,0 +1,262 @@
+"""
+Embedding Store for RAGAS Evaluation
+Contains a deduplicating, batched embedding wrapper backed by a memory-mapped vector store
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_STORE_DIR = os.path.join(".ragas_cache", "embeddings")
+
+# Maximum number of keys per SQL "IN (...)" query
+_SQL_CHUNK = 500
+
+
+def text_key(text):
+    """Return the content hash used to address a text in the store"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Append-only float32 vector store for one embedding model
+
+    Vectors are appended to a raw float32 file that is read through np.memmap,
+    so lookups never load the whole store into RAM. A small SQLite index maps
+    text hashes to row numbers; writes take an exclusive SQLite transaction so
+    several worker processes can share one store safely.
+
+    Args:
+        directory: Root directory of the store (default: .ragas_cache/embeddings)
+        model: Embedding model or deployment name; each model gets its own files
+    """
+
+    def __init__(self, directory=DEFAULT_STORE_DIR, model="default"):
+        self.model = model
+        self.path = os.path.join(directory, re.sub(r"[^A-Za-z0-9._-]", "_", model))
+        os.makedirs(self.path, exist_ok=True)
+
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self._conn = sqlite3.connect(
+            os.path.join(self.path, "index.sqlite"),
+            timeout=60,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._mmap = None
+        self.dim = self._read_dim()
+
+    def _read_dim(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        return int(row[0]) if row else None
+
+    def _vectors(self, min_rows):
+        """Return a memory map that covers at least min_rows rows"""
+        if self._mmap is None or self._mmap.shape[0] < min_rows:
+            rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+            self._mmap = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+        return self._mmap
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def get_many(self, keys):
+        """
+        Look up vectors for a list of keys
+
+        Args:
+            keys: Text hashes as returned by text_key
+
+        Returns:
+            dict: Mapping of found keys to float32 vectors (missing keys are omitted)
+        """
+        if self.dim is None:
+            # Another process may have initialized the store since we opened it
+            self.dim = self._read_dim()
+        if not keys or self.dim is None:
+            return {}
+
+        with self._lock:
+            rows = {}
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start:start + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows.update(self._conn.execute(
+                    f"SELECT key, row FROM vectors WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+            if not rows:
+                return {}
+
+            vectors = self._vectors(max(rows.values()) + 1)
+            return {key: np.array(vectors[row]) for key, row in rows.items()}
+
+    def put_many(self, keys, vectors):
+        """
+        Append vectors for keys that are not yet stored
+
+        Args:
+            keys: Text hashes as returned by text_key
+            vectors: Sequence of vectors with the same length as keys
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(keys) == 0:
+            return
+
+        with self._lock:
+            # Exclusive write transaction: serializes appends across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.dim is None:
+                    self.dim = self._read_dim() or vectors.shape[1]
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO meta (name, value) VALUES ('dim', ?)",
+                        (str(self.dim),)
+                    )
+                if vectors.shape[1] != self.dim:
+                    raise ValueError(
+                        f"Vector dimension {vectors.shape[1]} does not match store dimension {self.dim}"
+                    )
+
+                existing = set()
+                for start in range(0, len(keys), _SQL_CHUNK):
+                    chunk = list(keys[start:start + _SQL_CHUNK])
+                    placeholders = ",".join("?" * len(chunk))
+                    existing.update(key for (key,) in self._conn.execute(
+                        f"SELECT key FROM vectors WHERE key IN ({placeholders})", chunk
+                    ))
+
+                new = [i for i, key in enumerate(keys) if key not in existing]
+                if new:
+                    row_bytes = self.dim * 4
+                    with open(self.vectors_path, "ab") as f:
+                        # Drop a partial row left by an interrupted writer, so the
+                        # new rows start on a row boundary (readers map from offset 0)
+                        first_row = f.tell() // row_bytes
+                        if f.tell() != first_row * row_bytes:
+                            f.truncate(first_row * row_bytes)
+                        f.write(vectors[new].tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._conn.executemany(
+                        "INSERT INTO vectors (key, row) VALUES (?, ?)",
+                        [(keys[i], first_row + offset) for offset, i in enumerate(new)]
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """Close the index database and release the memory map"""
+        self._mmap = None
+        self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain embeddings wrapper that only embeds texts it has not seen before
+
+    Texts are hashed and deduplicated within each call, looked up in an
+    EmbeddingStore, and only the unique missing texts are sent to the wrapped
+    model in batches of batch_size.
+
+    Args:
+        embeddings: The LangChain embeddings model to wrap
+        store: EmbeddingStore for the wrapped model
+        batch_size: Number of texts per embedding request (default: 512)
+    """
+
+    def __init__(self, embeddings, store, batch_size=512):
+        self.embeddings = embeddings
+        self.store = store
+        self.batch_size = batch_size
+        self.requested = 0
+        self.embedded = 0
+
+    def _plan(self, texts):
+        """Hash texts and return (keys, unique key -> text, stored vectors)"""
+        keys = [text_key(text) for text in texts]
+        unique = dict(zip(keys, texts))
+        self.requested += len(texts)
+        return keys, unique, self.store.get_many(list(unique))
+
+    def _store_batch(self, found, batch_keys, vectors):
+        self.store.put_many(batch_keys, vectors)
+        self.embedded += len(batch_keys)
+        for key, vector in zip(batch_keys, vectors):
+            found[key] = np.asarray(vector, dtype=np.float32)
+
+    def _missing_batches(self, unique, found):
+        missing = [key for key in unique if key not in found]
+        for start in range(0, len(missing), self.batch_size):
+            batch_keys = missing[start:start + self.batch_size]
+            yield batch_keys, [unique[key] for key in batch_keys]
+
+    def embed_array(self, texts):
+        """
+        Embed texts and return them as one float32 matrix
+
+        Args:
+            texts: List of strings
+
+        Returns:
+            np.ndarray: Array of shape (len(texts), dim)
+        """
+        keys, unique, found = self._plan(texts)
+        for batch_keys, batch_texts in self._missing_batches(unique, found):
+            self._store_batch(found, batch_keys, self.embeddings.embed_documents(batch_texts))
+        if not keys:
+            return np.empty((0, self.store.dim or 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    async def aembed_array(self, texts):
+        """Async version of embed_array"""
+        keys, unique, found = self._plan(texts)
+        for batch_keys, batch_texts in self._missing_batches(unique, found):
+            self._store_batch(
+                found, batch_keys, await self.embeddings.aembed_documents(batch_texts)
+            )
+        if not keys:
+            return np.empty((0, self.store.dim or 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def embed_documents(self, texts):
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text):
+        return self.embed_array([text])[0].tolist()
+
+    async def aembed_documents(self, texts):
+        return (await self.aembed_array(texts)).tolist()
+
+    async def aembed_query(self, text):
+        return (await self.aembed_array([text]))[0].tolist()
+
+    def stats(self):
+        """
+        Return deduplication counters
+
+        Returns:
+            dict: requested texts, texts actually embedded and stored vectors
+        """
+        return {
+            "requested": self.requested,
+            "embedded": self.embedded,
+            "stored": len(self.store),
+        }
@@ -0,0 +1,370 @@
+"""
+Hedged Requests for RAGAS Evaluation
+Contains chat model and embedding wrappers that race redundant deployments to cut tail latency
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from pydantic import PrivateAttr
+
+
+class RequestHedger:
+    """
+    Races one request across an ordered list of equivalent deployments
+
+    The first deployment is always tried. If it has not answered after the
+    hedge delay (the hedge_quantile of recently observed latencies, or
+    initial_delay until min_samples answers have been seen) the request is
+    also sent to the next deployment; the first successful answer wins and
+    the other requests are cancelled. A deployment that fails is replaced by
+    the next one immediately. With a deadline, the whole race is abandoned
+    with TimeoutError after that many seconds.
+
+    Requests that lose the race or run into the deadline record how long they
+    had been running, a lower bound on their latency, so a deployment that
+    stalls raises the hedge delay quantile instead of vanishing from it.
+    run() races coroutines; run_sync() races blocking calls in threads, whose
+    losers are abandoned rather than cancelled.
+
+    Args:
+        deployments: Deployment names, in order of preference
+        hedge_quantile: Latency quantile after which a hedge is sent (default: 0.95)
+        initial_delay: Hedge delay in seconds before enough latencies are known (default: 2.0)
+        min_delay: Lower bound of the hedge delay in seconds (default: 0.05)
+        deadline: Optional limit in seconds for one call including hedges (default: None)
+        max_hedges: Latency-triggered extra requests per call (default: 1)
+        window: Number of recent latencies the quantile is taken over (default: 500)
+        min_samples: Latencies needed before the quantile is used (default: 20)
+    """
+
+    def __init__(self, deployments, hedge_quantile=0.95, initial_delay=2.0, min_delay=0.05,
+                 deadline=None, max_hedges=1, window=500, min_samples=20):
+        self.deployments = list(deployments)
+        self.hedge_quantile = hedge_quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.deadline = deadline
+        self.max_hedges = max_hedges
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._counts = {
+            "requests": 0, "hedges_fired": 0, "hedges_won": 0, "failovers": 0, "deadline_exceeded": 0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _observe(self, *starts):
+        """Record the time since each start as a latency"""
+        now = time.perf_counter()
+        with self._lock:
+            self._latencies.extend(now - start for start in starts)
+
+    def _hedge_timeout(self, launched, count, hedges, starts):
+        """Seconds until the next hedge is due, or None when no hedge is left"""
+        if launched < count and len(hedges) < self.max_hedges:
+            return max(0.0, max(starts) + self.hedge_delay() - time.perf_counter())
+        return None
+
+    def _deadline_error(self):
+        self._count("deadline_exceeded")
+        return TimeoutError(f"No answer from {self.deployments} within the {self.deadline} s deadline")
+
+    def hedge_delay(self):
+        """Seconds to wait for an answer before sending a hedge"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        position = (len(latencies) - 1) * self.hedge_quantile
+        lower = int(position)
+        upper = min(lower + 1, len(latencies) - 1)
+        delay = latencies[lower] + (latencies[upper] - latencies[lower]) * (position - lower)
+        return max(self.min_delay, delay)
+
+    def stats(self):
+        """
+        Return hedging counters
+
+        Returns:
+            dict: calls made, hedges fired and won (answered by the hedge),
+                failovers after errors, calls that exceeded the deadline and
+                the current hedge delay in seconds
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        counts["hedge_delay"] = self.hedge_delay()
+        return counts
+
+    async def run(self, calls):
+        """
+        Run one request with hedging
+
+        Args:
+            calls: One zero-argument coroutine function per deployment, in the
+                same order as deployments
+
+        Returns:
+            tuple: (result, index of the deployment that answered, hedged)
+        """
+        self._count("requests")
+        if self.deadline is None:
+            return await self._race(calls)
+        try:
+            return await asyncio.wait_for(self._race(calls), self.deadline)
+        except asyncio.TimeoutError:
+            raise self._deadline_error() from None
+
+    async def _race(self, calls):
+        pending = {}
+        hedges = set()
+        launched = 0
+        last_error = None
+
+        def launch():
+            nonlocal launched
+            task = asyncio.ensure_future(calls[launched]())
+            pending[task] = (launched, time.perf_counter())
+            launched += 1
+            return launched - 1
+
+        try:
+            launch()
+            while True:
+                timeout = self._hedge_timeout(
+                    launched, len(calls), hedges, [start for _, start in pending.values()]
+                )
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than the hedge delay: ask the next deployment as well
+                    hedges.add(launch())
+                    self._count("hedges_fired")
+                    continue
+
+                for task in done:
+                    index, start = pending.pop(task)
+                    if task.exception() is None:
+                        self._observe(start)
+                        if index in hedges:
+                            self._count("hedges_won")
+                        return task.result(), index, bool(hedges)
+                    last_error = task.exception()
+
+                if not pending:
+                    if launched == len(calls):
+                        raise last_error
+                    launch()
+                    self._count("failovers")
+        finally:
+            # Cancel the losers (or everything, when the deadline expired)
+            self._observe(*(start for _, start in pending.values()))
+            for task in pending:
+                task.cancel()
+
+    def run_sync(self, calls):
+        """
+        Run one blocking request with hedging
+
+        Every attempt runs in its own daemon thread; the caller waits for the
+        first answer or the deadline.
+
+        Args:
+            calls: One zero-argument function per deployment, in the same
+                order as deployments
+
+        Returns:
+            tuple: (result, index of the deployment that answered, hedged)
+        """
+        self._count("requests")
+        expires = None if self.deadline is None else time.perf_counter() + self.deadline
+        pending = {}
+        hedges = set()
+        launched = 0
+        last_error = None
+
+        def launch():
+            nonlocal launched
+            future = concurrent.futures.Future()
+            call = calls[launched]
+
+            def attempt():
+                try:
+                    future.set_result(call())
+                except BaseException as e:
+                    future.set_exception(e)
+
+            threading.Thread(target=attempt, daemon=True).start()
+            pending[future] = (launched, time.perf_counter())
+            launched += 1
+            return launched - 1
+
+        try:
+            launch()
+            while True:
+                timeout = self._hedge_timeout(
+                    launched, len(calls), hedges, [start for _, start in pending.values()]
+                )
+                if expires is not None:
+                    remaining = max(0.0, expires - time.perf_counter())
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                if not done:
+                    if expires is not None and time.perf_counter() >= expires:
+                        raise self._deadline_error()
+                    hedges.add(launch())
+                    self._count("hedges_fired")
+                    continue
+
+                for future in done:
+                    index, start = pending.pop(future)
+                    if future.exception() is None:
+                        self._observe(start)
+                        if index in hedges:
+                            self._count("hedges_won")
+                        return future.result(), index, bool(hedges)
+                    last_error = future.exception()
+
+                if not pending:
+                    if launched == len(calls):
+                        raise last_error
+                    launch()
+                    self._count("failovers")
+        finally:
+            # Losers keep running in their threads; their answers are dropped
+            self._observe(*(start for _, start in pending.values()))
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Chat model wrapper that hedges async requests across equivalent deployments
+
+    See RequestHedger for the hedging rules; synchronous calls are hedged
+    with threads and bounded by the same deadline. The deployment that
+    answered and whether a hedge was sent are added to generation_info.
+    """
+
+    llms: list[BaseChatModel]
+    deployments: list[str]
+    hedge_quantile: float = 0.95
+    initial_delay: float = 2.0
+    deadline: Optional[float] = None
+    max_hedges: int = 1
+
+    _hedger: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context):
+        super().model_post_init(__context)
+        self._hedger = RequestHedger(
+            self.deployments,
+            hedge_quantile=self.hedge_quantile,
+            initial_delay=self.initial_delay,
+            deadline=self.deadline,
+            max_hedges=self.max_hedges
+        )
+
+    @property
+    def deployment(self):
+        """Primary deployment, used to identify the judge"""
+        return self.deployments[0]
+
+    @property
+    def _llm_type(self):
+        return f"hedged-{self.llms[0]._llm_type}"
+
+    @property
+    def _identifying_params(self):
+        return self.llms[0]._identifying_params
+
+    def _get_llm_string(self, stop=None, **kwargs):
+        # Keep cache keys identical to those of the primary deployment
+        return self.llms[0]._get_llm_string(stop=stop, **kwargs)
+
+    def stats(self):
+        """Hedging counters, see RequestHedger.stats"""
+        return self._hedger.stats()
+
+    def _annotate(self, result, index, hedged):
+        for generation in result.generations:
+            info = dict(generation.generation_info or {})
+            info.update({"deployment": self.deployments[index], "hedged": hedged})
+            generation.generation_info = info
+        return result
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self._annotate(*self._hedger.run_sync([
+            lambda llm=llm: llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            for llm in self.llms
+        ]))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self._annotate(*await self._hedger.run([
+            lambda llm=llm: llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            for llm in self.llms
+        ]))
+
+    def _combine_llm_outputs(self, llm_outputs):
+        return self.llms[0]._combine_llm_outputs(llm_outputs)
+
+
+class HedgedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that hedges async requests across equivalent deployments
+
+    Only list deployments of the same embedding model, since vectors from
+    different models are not comparable. Synchronous calls are hedged with
+    threads.
+
+    Args:
+        embeddings: LangChain embeddings models, one per deployment
+        deployments: Deployment names, in order of preference
+        **hedge_kwargs: Options for RequestHedger (hedge_quantile, deadline, ...)
+    """
+
+    def __init__(self, embeddings, deployments, **hedge_kwargs):
+        self.embeddings = list(embeddings)
+        self.deployment = deployments[0]
+        self.hedger = RequestHedger(deployments, **hedge_kwargs)
+
+    def stats(self):
+        """Hedging counters, see RequestHedger.stats"""
+        return self.hedger.stats()
+
+    def embed_documents(self, texts):
+        result, _, _ = self.hedger.run_sync([
+            lambda embeddings=embeddings: embeddings.embed_documents(texts)
+            for embeddings in self.embeddings
+        ])
+        return result
+
+    def embed_query(self, text):
+        result, _, _ = self.hedger.run_sync([
+            lambda embeddings=embeddings: embeddings.embed_query(text)
+            for embeddings in self.embeddings
+        ])
+        return result
+
+    async def aembed_documents(self, texts):
+        result, _, _ = await self.hedger.run([
+            lambda embeddings=embeddings: embeddings.aembed_documents(texts)
+            for embeddings in self.embeddings
+        ])
+        return result
+
+    async def aembed_query(self, text):
+        result, _, _ = await self.hedger.run([
+            lambda embeddings=embeddings: embeddings.aembed_query(text)
+            for embeddings in self.embeddings
+        ])
+        return result
@@ -0,0 +1,227 @@
+"""
+Import-Time Benchmark
+Contains a cold-start import report for the utils package based on python -X importtime
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Entry points whose cold start matters: the bare package, quick probes and evaluation workers
+DEFAULT_TARGETS = (
+    "import utils",
+    "from utils import load_api_config",
+    "from utils import get_available_models",
+    "import utils.test_api",
+    "import utils.cli",
+    "from utils import load_results",
+    "from utils import create_langchain_llm",
+    "from utils import create_langchain_embeddings",
+    "from utils import evaluate_in_shards",
+)
+
+# Import-time ceilings in milliseconds; "import utils" must not pull in any heavy dependency
+DEFAULT_BUDGETS_MS = {
+    "import utils": 50.0,
+}
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(output):
+    """
+    Parse the stderr of python -X importtime
+
+    Args:
+        output: Text written by the interpreter
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) tuples in import order
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip(" ")
+        # One space follows the separator; each nesting level adds two more
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def _run(statement):
+    """Import statement in a fresh interpreter; returns (entries, wall seconds)"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=_PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr), wall
+
+
+def measure_import(statement, repeat=5, startup=None, top=5):
+    """
+    Measure the cold-start import cost of one statement
+
+    Modules already imported by a bare interpreter (site, encodings, ...) are
+    excluded, so the total is what the statement itself adds.
+
+    Args:
+        statement: Python statement, e.g. "from utils import create_langchain_llm"
+        repeat: Fresh interpreters to run; the median is reported (default: 5)
+        startup: Module names imported by a bare interpreter (default: measured)
+        top: Number of heaviest top-level packages to list (default: 5)
+
+    Returns:
+        dict: statement, import_ms, wall_ms, modules and heaviest packages
+    """
+    if startup is None:
+        startup = {name for name, *_ in _run("pass")[0]}
+
+    totals, walls, runs = [], [], []
+    for _ in range(repeat):
+        entries, wall = _run(statement)
+        added = [entry for entry in entries if entry[0] not in startup]
+        # Entries at the smallest depth are the roots of everything the statement imported
+        roots = [entry for entry in added if entry[3] == min((e[3] for e in added), default=0)]
+        totals.append(sum(entry[2] for entry in roots) / 1000)
+        walls.append(wall * 1000)
+        runs.append(added)
+
+    median = statistics.median(totals)
+    added = runs[totals.index(min(totals, key=lambda total: abs(total - median)))]
+    packages = {}
+    for name, _, cumulative_us, _ in added:
+        package = name.split(".")[0]
+        if package != "utils" and "." not in name:
+            packages[package] = max(packages.get(package, 0), cumulative_us / 1000)
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "statement": statement,
+        "import_ms": median,
+        "wall_ms": statistics.median(walls),
+        "modules": len(added),
+        "heaviest": [{"package": name, "ms": ms} for name, ms in heaviest],
+    }
+
+
+def run_import_benchmark(targets=DEFAULT_TARGETS, repeat=5):
+    """
+    Measure the import cost of every target statement
+
+    Args:
+        targets: Import statements to measure (default: DEFAULT_TARGETS)
+        repeat: Fresh interpreters per statement (default: 5)
+
+    Returns:
+        dict: Report with the interpreter startup time and one result per target
+    """
+    entries, wall = _run("pass")
+    startup = {name for name, *_ in entries}
+    return {
+        "python": sys.version.split()[0],
+        "startup_wall_ms": wall * 1000,
+        "results": [measure_import(statement, repeat, startup) for statement in targets],
+    }
+
+
+def check_budgets(report, budgets=None):
+    """
+    Find targets whose import time exceeds their budget
+
+    Args:
+        report: Report returned by run_import_benchmark
+        budgets: Mapping of statement to milliseconds (default: DEFAULT_BUDGETS_MS)
+
+    Returns:
+        list: Human-readable messages (empty when every budget holds)
+    """
+    budgets = DEFAULT_BUDGETS_MS if budgets is None else budgets
+    return [
+        f"{result['statement']}: {result['import_ms']:.1f} ms > budget {budgets[result['statement']]:.1f} ms"
+        for result in report["results"]
+        if result["statement"] in budgets and result["import_ms"] > budgets[result["statement"]]
+    ]
+
+
+def compare_to_baseline(report, baseline, tolerance=0.25, min_ms=5.0):
+    """
+    Find import-time regressions against a previous report
+
+    Args:
+        report: Report returned by run_import_benchmark
+        baseline: Earlier report
+        tolerance: Allowed relative slowdown (default: 0.25)
+        min_ms: Absolute slowdown ignored as noise (default: 5.0)
+
+    Returns:
+        list: Human-readable regression messages (empty when there are none)
+    """
+    previous = {result["statement"]: result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(result["statement"])
+        if old is None:
+            continue
+        limit = max(old["import_ms"] * (1 + tolerance), old["import_ms"] + min_ms)
+        if result["import_ms"] > limit:
+            regressions.append(
+                f"{result['statement']}: {result['import_ms']:.1f} ms > baseline {old['import_ms']:.1f} ms"
+            )
+    return regressions
+
+
+def print_report(report):
+    """Print an import benchmark report as a table"""
+    print(f"Python {report['python']}, bare interpreter start {report['startup_wall_ms']:.0f} ms")
+    print(f"\n  {'statement':<44}{'import ms':>11}{'wall ms':>10}{'modules':>9}  heaviest")
+    for result in report["results"]:
+        heaviest = ", ".join(f"{item['package']} {item['ms']:.0f}" for item in result["heaviest"][:3])
+        print(f"  {result['statement']:<44}{result['import_ms']:>11.1f}{result['wall_ms']:>10.0f}"
+              f"{result['modules']:>9}  {heaviest}")
+
+
+def main():
+    """Run the import benchmark from the command line"""
+    parser = argparse.ArgumentParser(description="Cold-start import time of the utils package")
+    parser.add_argument("--targets", nargs="+", default=list(DEFAULT_TARGETS),
+                        help='Import statements to measure, e.g. "from utils import load_results"')
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Compare against an earlier JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    print("Utils Import-Time Benchmark")
+    print("=" * 50)
+    report = run_import_benchmark(args.targets, args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved as {args.output}")
+
+    problems = check_budgets(report)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems += compare_to_baseline(report, json.load(f), args.tolerance)
+    if problems:
+        print("\nImport-time regressions detected:")
+        for message in problems:
+            print(f"  - {message}")
+        sys.exit(1)
+    print("\nImport times within budget")
+
+
+if __name__ == "__main__":
+    main()
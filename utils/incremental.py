@@ -0,0 +1,263 @@
+"""
+Incremental Evaluation for RAGAS
+Contains per-metric input fingerprints so only changed (row, metric) pairs are re-scored
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .results_store import load_results, save_results
+
+# Inputs each metric reads; a row is re-scored for a metric only when one of these changes
+METRIC_INPUTS = {
+    "context_recall": ("user_input", "retrieved_contexts", "reference"),
+    "context_precision": ("user_input", "retrieved_contexts", "reference"),
+    "faithfulness": ("user_input", "response", "retrieved_contexts"),
+    "answer_correctness": ("user_input", "response", "reference"),
+}
+
+# Metrics whose score also depends on the embedding model
+EMBEDDING_METRICS = ("answer_correctness",)
+
+# RAGAS column names and the dataset column names they are read from
+INPUT_COLUMNS = {
+    "user_input": ("user_input", "question"),
+    "retrieved_contexts": ("retrieved_contexts", "contexts"),
+    "response": ("response", "answer"),
+    "reference": ("reference", "ground_truth"),
+}
+
+
+def fingerprint_column(metric_name):
+    """Name of the results column holding a metric's input fingerprint"""
+    return f"{metric_name}_fp"
+
+
+def model_identity(model):
+    """
+    Name the deployment behind a LangChain model or one of the utils wrappers
+
+    Returns:
+        str: Deployment or model name, or None when model is None
+    """
+    while model is not None:
+        for attribute in ("deployment", "model_name", "model"):
+            value = getattr(model, attribute, None)
+            if isinstance(value, str):
+                return value
+        inner = getattr(model, "llm", None) or getattr(model, "embeddings", None)
+        if inner is None:
+            return type(model).__name__
+        model = inner
+    return None
+
+
+def default_metric_version():
+    """Installed RAGAS version, so upgrading RAGAS invalidates old scores"""
+    try:
+        from importlib.metadata import version
+        return f"ragas-{version('ragas')}"
+    except Exception:
+        return "ragas-unknown"
+
+
+def _input_frame(dataset):
+    """Select the metric inputs of a dataset under their RAGAS names"""
+    df = dataset if isinstance(dataset, pd.DataFrame) else dataset.to_pandas()
+    inputs = {}
+    for name, aliases in INPUT_COLUMNS.items():
+        for alias in aliases:
+            if alias in df.columns:
+                inputs[name] = df[alias].reset_index(drop=True)
+                break
+    return df.reset_index(drop=True), pd.DataFrame(inputs)
+
+
+def _field_digests(values):
+    """sha256 of every value of one input column, hashed once and shared by all metrics"""
+    digests = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        digests[i] = hashlib.sha256(payload.encode("utf-8")).digest()
+    return digests
+
+
+def compute_fingerprints(dataset, metrics, llm=None, embeddings=None, metric_versions=None):
+    """
+    Fingerprint each row's inputs per metric
+
+    A fingerprint covers exactly the columns the metric reads (METRIC_INPUTS),
+    the judge deployment, the embedding deployment for embedding-based
+    metrics, and the metric version.
+
+    Args:
+        dataset: HuggingFace Dataset or DataFrame (dataset or RAGAS column names)
+        metrics: RAGAS metric objects or metric names
+        llm: Judge LLM (its deployment name is part of the fingerprint)
+        embeddings: Embedding model used by the metrics
+        metric_versions: Optional mapping of metric name to version string
+            (default: the installed RAGAS version for every metric)
+
+    Returns:
+        pd.DataFrame: One "<metric>_fp" column per metric
+    """
+    _, inputs = _input_frame(dataset)
+    judge = model_identity(llm)
+    embedder = model_identity(embeddings)
+    versions = metric_versions or {}
+    default_version = None
+
+    digests = {}
+    fingerprints = pd.DataFrame(index=inputs.index)
+    for metric in metrics:
+        name = getattr(metric, "name", metric)
+        fields = METRIC_INPUTS.get(name, tuple(INPUT_COLUMNS))
+        missing = [field for field in fields if field not in inputs.columns]
+        if missing:
+            raise KeyError(f"Dataset has no {missing} column for {name}")
+        for field in fields:
+            if field not in digests:
+                digests[field] = _field_digests(inputs[field])
+
+        if name not in versions and default_version is None:
+            default_version = default_metric_version()
+        config = json.dumps({
+            "metric": name,
+            "version": versions.get(name, default_version),
+            "judge": judge,
+            "embeddings": embedder if name in EMBEDDING_METRICS else None,
+        }, sort_keys=True).encode("utf-8")
+
+        rows = zip(*(digests[field] for field in fields))
+        fingerprints[fingerprint_column(name)] = [
+            hashlib.sha256(config + b"".join(parts)).hexdigest()[:16] for parts in rows
+        ]
+    return fingerprints
+
+
+def _row_keys(frame, key):
+    """Key column plus occurrence number, so duplicate keys still pair up in order"""
+    return pd.MultiIndex.from_arrays([frame[key].to_numpy(), frame.groupby(key).cumcount().to_numpy()])
+
+
+def plan_reevaluation(dataset, metrics, previous, llm=None, embeddings=None, key="user_input",
+                      metric_versions=None):
+    """
+    Decide which (row, metric) pairs must be re-scored
+
+    Args:
+        dataset: HuggingFace Dataset or DataFrame to evaluate
+        metrics: RAGAS metric objects
+        previous: Earlier results DataFrame (with "<metric>_fp" columns), or None
+        llm: Judge LLM
+        embeddings: Embedding model used by the metrics
+        key: RAGAS column that identifies a row across runs (default: "user_input")
+        metric_versions: Optional mapping of metric name to version string
+
+    Returns:
+        tuple: (fingerprints, stale, prior_scores) DataFrames aligned with the
+            dataset rows; stale holds one boolean column per metric
+    """
+    _, inputs = _input_frame(dataset)
+    fingerprints = compute_fingerprints(dataset, metrics, llm, embeddings, metric_versions)
+    names = [getattr(metric, "name", metric) for metric in metrics]
+    stale = pd.DataFrame(True, index=inputs.index, columns=names)
+    prior = pd.DataFrame(np.nan, index=inputs.index, columns=names)
+    if previous is None or len(previous) == 0 or key not in previous.columns:
+        return fingerprints, stale, prior
+
+    # Align previous rows with the current ones by key
+    positions = pd.Series(np.arange(len(previous)), index=_row_keys(previous, key))
+    matched = positions.reindex(_row_keys(inputs, key)).to_numpy()
+    found = ~np.isnan(matched)
+    source = matched[found].astype(np.int64)
+
+    for name in names:
+        column = fingerprint_column(name)
+        if column not in previous.columns or name not in previous.columns:
+            continue
+        old_fp = previous[column].to_numpy(dtype=object)[source]
+        old_score = previous[name].to_numpy(dtype=np.float64)[source]
+        new_fp = fingerprints[column].to_numpy(dtype=object)[found]
+        # Failed (NaN) scores are retried rather than reused
+        fresh = (old_fp == new_fp) & ~np.isnan(old_score)
+        stale.loc[found, name] = ~fresh
+        prior.loc[found, name] = np.where(fresh, old_score, np.nan)
+    return fingerprints, stale, prior
+
+
+def evaluate_incremental(dataset, metrics, llm=None, embeddings=None,
+                         previous_path="ragas_evaluation_results", output_path=None,
+                         key="user_input", metric_versions=None, **evaluate_kwargs):
+    """
+    Evaluate only the (row, metric) pairs whose inputs changed since the last run
+
+    Fingerprints are diffed against the results store at previous_path;
+    unchanged scores are reused and the stale pairs are sent to ragas.evaluate,
+    one call per distinct set of stale rows. The merged results, including
+    the new fingerprints and every other dataset column (e.g. scenario), are
+    written to output_path.
+
+    Args:
+        dataset: HuggingFace Dataset or DataFrame in the create_ragas_dataset schema
+        metrics: List of RAGAS metrics
+        llm: LangChain LLM passed to ragas.evaluate
+        embeddings: LangChain embeddings passed to ragas.evaluate
+        previous_path: Results store of the previous run (default: "ragas_evaluation_results");
+            a missing store (or None) means everything is evaluated
+        output_path: Results store to write (default: previous_path); with
+            neither path set the results are only returned
+        key: RAGAS column that identifies a row across runs (default: "user_input")
+        metric_versions: Optional mapping of metric name to version string
+        **evaluate_kwargs: Extra keyword arguments for ragas.evaluate
+
+    Returns:
+        pd.DataFrame: Results for every dataset row with scores and "<metric>_fp" columns
+    """
+    from datasets import Dataset
+    from ragas import evaluate
+
+    df, inputs = _input_frame(dataset)
+    names = [metric.name for metric in metrics]
+    previous = None
+    if previous_path and os.path.exists(previous_path):
+        wanted = [key] + [c for name in names for c in (name, fingerprint_column(name))]
+        previous = load_results(previous_path, columns=wanted, with_contexts=False)
+
+    fingerprints, stale, prior = plan_reevaluation(
+        df, metrics, previous, llm, embeddings, key, metric_versions
+    )
+    # Keep the other dataset columns (scenario, tags, ...) next to the RAGAS inputs
+    aliases = {alias for choices in INPUT_COLUMNS.values() for alias in choices}
+    produced = set(names) | set(fingerprints.columns)
+    extras = [c for c in df.columns if c not in aliases and c not in produced]
+    results = pd.concat([inputs, df[extras]], axis=1)
+    for name in names:
+        results[name] = prior[name]
+
+    # Metrics with the same stale rows share one evaluate call
+    groups = {}
+    for metric in metrics:
+        rows = np.flatnonzero(stale[metric.name].to_numpy())
+        print(f"{metric.name}: {len(rows)} rows to evaluate, {len(df) - len(rows)} reused")
+        if len(rows):
+            groups.setdefault(rows.tobytes(), (rows, []))[1].append(metric)
+
+    for rows, group_metrics in groups.values():
+        subset = Dataset.from_pandas(df.iloc[rows].reset_index(drop=True))
+        scores = evaluate(
+            subset, metrics=group_metrics, llm=llm, embeddings=embeddings, **evaluate_kwargs
+        ).to_pandas()
+        for metric in group_metrics:
+            results.loc[rows, metric.name] = scores[metric.name].to_numpy()
+
+    results = pd.concat([results, fingerprints], axis=1)
+    if output_path or previous_path:
+        save_results(results, output_path or previous_path)
+    return results
@@ -3,33 +3,28 @@ LangChain Wrappers for EPAM DIAL Models
 Contains functions to create LangChain-compatible LLM and embedding models
 """
 
-import os
-from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
-def load_api_config():
-    """Load API configuration from .env file"""
-    load_dotenv()
-    
-    api_key = os.getenv('DIAL_API_KEY')
-    azure_endpoint = os.getenv('AZURE_ENDPOINT', 'https://ai-proxy.lab.epam.com')
-    api_version = os.getenv('API_VERSION', '2024-02-01')
-    
-    if not api_key:
-        raise ValueError("DIAL_API_KEY not found in .env file")
-    
-    return api_key, azure_endpoint, api_version
+from .client_factory import get_async_http_client, get_http_client, load_api_config
 
-def create_langchain_llm(deployment_name="gpt-4.1-mini-2025-04-14"):
-    """
-    Create a LangChain ChatOpenAI wrapper for EPAM DIAL LLM
-    
-    Args:
-        deployment_name: The deployment name to use (default: gpt-4.1-mini-2025-04-14)
+# The optional wrappers (scheduler, hedging, batching, telemetry, embedding
+# store) are imported in the branches that use them, so a plain model does not
+# pay for pandas, numpy and tiktoken at import time
+
+def _resolve_deployments(deployment_name, kind, fallback):
+    """Normalise a deployment name or list, replacing "auto" by the fastest probed deployment"""
+    deployment_names = [deployment_name] if isinstance(deployment_name, str) else list(deployment_name)
+    if "auto" not in deployment_names:
+        return deployment_names
+    from .model_explorer import select_fastest_deployment
     
-    Returns:
-        ChatOpenAI: LangChain-compatible LLM wrapper
-    """
+    return [
+        select_fastest_deployment(kind, fallback=fallback) if name == "auto" else name
+        for name in deployment_names
+    ]
+
+def _create_chat_model(deployment_name, scheduler=None):
+    """ChatOpenAI for one deployment, behind the scheduler when one is given"""
     api_key, azure_endpoint, api_version = load_api_config()
     
     # Use the exact URL format that works
@@ -45,21 +40,95 @@ def create_langchain_llm(deployment_name="gpt-4.1-mini-2025-04-14"):
         default_headers={
             "api-key": api_key,
             "api-version": api_version
-        }
+        },
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        # Caching happens on the outermost wrapper so that cache hits do not
+        # consume rate limit budget
+        cache=False,
+        # Let 429s reach the scheduler instead of the OpenAI client's retries
+        max_retries=0 if scheduler is not None else None
     )
     
+    if scheduler is not None:
+        from .rate_limiter import ScheduledChatModel
+        
+        langchain_llm = ScheduledChatModel(
+            llm=langchain_llm,
+            scheduler=scheduler,
+            deployment=deployment_name,
+            cache=False
+        )
+    
     return langchain_llm
 
-def create_langchain_embeddings(deployment_name="text-embedding-3-small-1"):
+def create_langchain_llm(deployment_name="gpt-4.1-mini-2025-04-14", cache=None, scheduler=None,
+                         telemetry=None, judge_batch_size=None, judge_batch_wait=0.05,
+                         deadline=None, hedge_quantile=0.95):
     """
-    Create a LangChain OpenAIEmbeddings wrapper for EPAM DIAL embeddings
+    Create a LangChain ChatOpenAI wrapper for EPAM DIAL LLM
     
     Args:
-        deployment_name: The deployment name to use (default: text-embedding-3-small-1)
+        deployment_name: The deployment name to use (default: gpt-4.1-mini-2025-04-14);
+            "auto" picks the fastest healthy LLM deployment from the probe catalogue.
+            An ordered list of equivalent deployments enables hedged requests
+        cache: Optional LangChain cache for judge responses, e.g. SQLiteLLMCache
+            (default: None, no caching)
+        scheduler: Optional RateLimitScheduler that keeps requests within the
+            deployment's RPM/TPM quota and handles 429 retries (default: None)
+        telemetry: Optional TelemetryRecorder that records latency, tokens,
+            queue wait and retries of every request (default: None)
+        judge_batch_size: Optional number of concurrent judge prompts packed
+            into one request (default: None, one request per prompt)
+        judge_batch_wait: Seconds to wait for more prompts before sending a
+            partial batch (default: 0.05)
+        deadline: Optional limit in seconds for one call, hedges
+            included; slower calls raise TimeoutError (default: None)
+        hedge_quantile: Observed latency quantile after which a call is also
+            sent to the next deployment in the list (default: 0.95)
     
     Returns:
-        OpenAIEmbeddings: LangChain-compatible embedding wrapper
+        ChatOpenAI: LangChain-compatible LLM wrapper
+            (ScheduledChatModel when a scheduler is given, HedgedChatModel
+            for a deployment list or a deadline, BatchedChatModel when
+            judge_batch_size is set)
     """
+    deployment_names = _resolve_deployments(deployment_name, "llm", "gpt-4.1-mini-2025-04-14")
+    
+    llms = [_create_chat_model(name, scheduler) for name in deployment_names]
+    langchain_llm = llms[0]
+    
+    if len(llms) > 1 or deadline is not None:
+        from .hedging import HedgedChatModel
+        
+        langchain_llm = HedgedChatModel(
+            llms=llms,
+            deployments=deployment_names,
+            hedge_quantile=hedge_quantile,
+            deadline=deadline,
+            cache=False
+        )
+    
+    if judge_batch_size is not None and judge_batch_size > 1:
+        # Batching sits outside the scheduler, so one packed request takes one rate limit slot
+        from .batch_judge import BatchedChatModel
+        
+        langchain_llm = BatchedChatModel(
+            llm=langchain_llm,
+            max_batch_size=judge_batch_size,
+            max_wait=judge_batch_wait,
+            cache=False
+        )
+    
+    # Cache and telemetry belong to the outermost model, so cache hits skip
+    # every wrapper and telemetry sees queue waits, hedges and batches
+    langchain_llm.cache = cache
+    langchain_llm.callbacks = [telemetry] if telemetry is not None else None
+    
+    return langchain_llm
+
+def _create_embedding_model(deployment_name, batch_size=512, scheduler=None, telemetry=None):
+    """OpenAIEmbeddings for one deployment, behind the scheduler or telemetry when given"""
     api_key, azure_endpoint, api_version = load_api_config()
     
     # Use the exact URL format that works
@@ -67,14 +136,82 @@ def create_langchain_embeddings(deployment_name="text-embedding-3-small-1"):
     
     langchain_embeddings = OpenAIEmbeddings(
         model=deployment_name,
+        chunk_size=batch_size,
         api_key=api_key,
         base_url=base_url,
         default_headers={
             "api-key": api_key,
             "api-version": api_version
-        }
+        },
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=0 if scheduler is not None else 2
     )
     
+    if scheduler is not None:
+        from .rate_limiter import ScheduledEmbeddings
+        
+        langchain_embeddings = ScheduledEmbeddings(
+            langchain_embeddings, scheduler, deployment_name, chunk_size=batch_size,
+            telemetry=telemetry
+        )
+    elif telemetry is not None:
+        from .telemetry import InstrumentedEmbeddings
+        
+        langchain_embeddings = InstrumentedEmbeddings(
+            langchain_embeddings, telemetry, deployment_name, chunk_size=batch_size
+        )
+    
+    return langchain_embeddings
+
+def create_langchain_embeddings(deployment_name="text-embedding-3-small-1", store_dir=None,
+                                batch_size=512, scheduler=None, telemetry=None, deadline=None,
+                                hedge_quantile=0.95):
+    """
+    Create a LangChain OpenAIEmbeddings wrapper for EPAM DIAL embeddings
+    
+    Args:
+        deployment_name: The deployment name to use (default: text-embedding-3-small-1);
+            "auto" picks the fastest healthy embedding deployment from the probe catalogue.
+            An ordered list of deployments of the same model enables hedged requests
+        store_dir: Optional directory of a persistent embedding store; when set,
+            texts are deduplicated by hash and only unseen texts are embedded
+            (default: None, no store)
+        batch_size: Number of texts per embedding request (default: 512)
+        scheduler: Optional RateLimitScheduler shared with the LLM wrapper
+            (default: None)
+        telemetry: Optional TelemetryRecorder; only requests that reach the
+            API are recorded, not store hits (default: None)
+        deadline: Optional limit in seconds for one call, hedges
+            included; slower calls raise TimeoutError (default: None)
+        hedge_quantile: Observed latency quantile after which a call is also
+            sent to the next deployment in the list (default: 0.95)
+    
+    Returns:
+        OpenAIEmbeddings: LangChain-compatible embedding wrapper
+            (HedgedEmbeddings for a deployment list or a deadline,
+            CachedEmbeddings when store_dir is set)
+    """
+    deployment_names = _resolve_deployments(deployment_name, "embedding", "text-embedding-3-small-1")
+    
+    models = [
+        _create_embedding_model(name, batch_size, scheduler, telemetry) for name in deployment_names
+    ]
+    langchain_embeddings = models[0]
+    
+    if len(models) > 1 or deadline is not None:
+        from .hedging import HedgedEmbeddings
+        
+        langchain_embeddings = HedgedEmbeddings(
+            models, deployment_names, hedge_quantile=hedge_quantile, deadline=deadline
+        )
+    
+    if store_dir is not None:
+        from .embedding_store import CachedEmbeddings, EmbeddingStore
+        
+        store = EmbeddingStore(store_dir, model=deployment_names[0])
+        langchain_embeddings = CachedEmbeddings(langchain_embeddings, store, batch_size=batch_size)
+    
     return langchain_embeddings
 
 if __name__ == "__main__":
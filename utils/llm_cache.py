@@ -0,0 +1,270 @@
+"""
+Persistent LLM Cache for RAGAS Evaluation
+Contains a content-addressed SQLite cache for judge calls made through create_langchain_llm
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+DEFAULT_CACHE_PATH = os.path.join(".ragas_cache", "llm_cache.sqlite")
+
+# Constructor arguments that do not change the model output (credentials,
+# transport and plumbing) and therefore must not be part of the cache key
+_NON_SEMANTIC_KWARGS = {
+    "default_headers",
+    "default_query",
+    "openai_api_key",
+    "openai_api_base",
+    "openai_organization",
+    "openai_proxy",
+    "http_client",
+    "http_async_client",
+    "request_timeout",
+    "max_retries",
+    "cache",
+    "callbacks",
+    "rate_limiter",
+    "metadata",
+    "tags",
+    "verbose",
+}
+
+
+# generation_info keys describing how one particular request went (scheduling),
+# not the response itself; replaying them from the cache would report stale values
+TRANSIENT_GENERATION_INFO = {
+    "queue_wait", "retries", "cached", "batch_size", "batch_id", "deployment", "hedged",
+}
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a request is not present in the cache"""
+
+
+def _normalize_llm_string(llm_string):
+    """
+    Reduce a LangChain llm_string to the deployment name and sampling parameters
+
+    Args:
+        llm_string: The "<serialized model>---<call params>" string built by LangChain
+
+    Returns:
+        str: Canonical JSON representation used as part of the cache key
+    """
+    serialized, _, call_params = llm_string.partition("---")
+    try:
+        model = json.loads(serialized)
+        kwargs = model.get("kwargs", {})
+    except (ValueError, AttributeError):
+        # Unknown format: fall back to the raw string, which is still deterministic
+        return llm_string
+
+    params = {
+        key: value for key, value in kwargs.items()
+        if key not in _NON_SEMANTIC_KWARGS
+    }
+    return json.dumps(
+        {"model": model.get("id"), "params": params, "call": call_params},
+        sort_keys=True,
+        default=str
+    )
+
+
+def _serialize_generations(generations):
+    """Serialize a list of Generation/ChatGeneration objects to JSON"""
+    records = []
+    for generation in generations:
+        info = generation.generation_info
+        if info:
+            info = {key: value for key, value in info.items() if key not in TRANSIENT_GENERATION_INFO}
+        record = {"text": generation.text, "generation_info": info or None}
+        if isinstance(generation, ChatGeneration):
+            record["message"] = message_to_dict(generation.message)
+        records.append(record)
+    return json.dumps(records)
+
+
+def _deserialize_generations(value):
+    """Rebuild Generation/ChatGeneration objects from their JSON form"""
+    generations = []
+    for record in json.loads(value):
+        if "message" in record:
+            message = messages_from_dict([record["message"]])[0]
+            generations.append(ChatGeneration(
+                message=message, generation_info=record["generation_info"]
+            ))
+        else:
+            generations.append(Generation(
+                text=record["text"], generation_info=record["generation_info"]
+            ))
+    return generations
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    Content-addressed on-disk cache for LangChain chat model calls
+
+    Entries are keyed by a SHA-256 digest of the deployment name, the sampling
+    parameters and the full serialized message list. Total size is bounded and
+    the least recently used entries are evicted first.
+
+    Args:
+        path: SQLite database file (default: .ragas_cache/llm_cache.sqlite)
+        max_size_mb: Maximum total size of cached responses in MB (default: 512)
+        replay: Read-only mode; a lookup miss raises CacheMissError instead of
+            letting the request go to the network (default: False)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_size_mb=512, replay=False):
+        self.path = path
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if replay:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Replay cache not found: {path}")
+            self._conn = sqlite3.connect(
+                f"file:{path}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_last_access"
+                " ON llm_cache (last_access)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt, llm_string):
+        """Build the content-addressed key for a prompt and LLM configuration"""
+        digest = hashlib.sha256()
+        digest.update(_normalize_llm_string(llm_string).encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        """Return cached generations or None on a miss (raises in replay mode)"""
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if not self.replay:
+                    self._conn.execute(
+                        "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                        (time.time(), key)
+                    )
+                    self._conn.commit()
+
+        if row is None:
+            if self.replay:
+                raise CacheMissError(
+                    f"Request not found in replay cache {self.path} (key {key[:12]})"
+                )
+            return None
+        generations = _deserialize_generations(row[0])
+        # Lets telemetry tell replayed responses from requests that were sent
+        for generation in generations:
+            generation.generation_info = {**(generation.generation_info or {}), "cached": True}
+        return generations
+
+    def update(self, prompt, llm_string, return_val):
+        """Store generations for a prompt and evict old entries if over budget"""
+        if self.replay:
+            return
+
+        key = self.make_key(prompt, llm_string)
+        value = _serialize_generations(return_val)
+        size = len(value.encode("utf-8"))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits its size budget"""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()[0]
+        excess = total - self.max_size_bytes
+        if excess <= 0:
+            return
+
+        to_delete = []
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_access ASC"
+        ):
+            if freed >= excess:
+                break
+            to_delete.append((key,))
+            freed += size
+
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", to_delete)
+        self.evictions += len(to_delete)
+
+    def clear(self, **kwargs):
+        """Remove all cached entries"""
+        if self.replay:
+            raise PermissionError("Cannot clear a cache opened in replay mode")
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Return cache counters and size
+
+        Returns:
+            dict: hits, misses, evictions, hit_rate, entries and size_bytes
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def close(self):
+        """Close the underlying database connection"""
+        self._conn.close()
@@ -0,0 +1,454 @@
+"""
+Mock EPAM DIAL Server
+Contains an offline, OpenAI-compatible stand-in for the DIAL proxy used for benchmarks and local testing
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+DEFAULT_DEPLOYMENTS = {
+    "gpt-4.1-mini-2025-04-14": "gpt-4.1-mini",
+    "gpt-4o-mini-2024-07-18": "gpt-4o-mini",
+    "text-embedding-3-small-1": "text-embedding-3-small",
+}
+
+_DEPLOYMENT_PATH = re.compile(r"^/openai/deployments/([^/]+)/(chat/completions|embeddings)$")
+
+
+def parse_latency(spec):
+    """
+    Parse a latency distribution specification
+
+    Args:
+        spec: None, a number of seconds, or a string such as "constant:0.05",
+            "uniform:0.02:0.2" or "lognormal:0.3:0.5" (median seconds, sigma)
+
+    Returns:
+        tuple: (kind, parameters...)
+    """
+    if spec is None:
+        return ("constant", 0.0)
+    if isinstance(spec, (int, float)):
+        return ("constant", float(spec))
+    if isinstance(spec, tuple):
+        return spec
+    kind, *params = spec.split(":")
+    return (kind, *[float(p) for p in params])
+
+
+def sample_latency(rng, spec):
+    """Draw one latency in seconds from a parsed distribution"""
+    kind, *params = spec
+    if kind == "constant":
+        return params[0]
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1])
+    if kind == "lognormal":
+        median, sigma = params
+        return median * float(np.exp(rng.gauss(0.0, sigma)))
+    raise ValueError(f"Unknown latency distribution: {kind}")
+
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).digest()
+
+
+def _json_objects(text):
+    """Yield every top-level JSON object embedded in a prompt, in order"""
+    decoder = json.JSONDecoder()
+    position = text.find("{")
+    while position >= 0:
+        try:
+            value, end = decoder.raw_decode(text, position)
+        except json.JSONDecodeError:
+            end = position + 1
+        else:
+            if isinstance(value, dict):
+                yield value
+        position = text.find("{", end)
+
+
+def _schema_instance(schema, defs, rng, length):
+    """Build a value that validates against a JSON schema"""
+    if "$ref" in schema:
+        return _schema_instance(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, rng, length)
+    for combinator in ("allOf", "anyOf", "oneOf"):
+        if combinator in schema:
+            options = [option for option in schema[combinator] if option.get("type") != "null"]
+            return _schema_instance((options or schema[combinator])[0], defs, rng, length)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: _schema_instance(prop, defs, rng, length)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_schema_instance(schema.get("items", {}), defs, rng, length) for _ in range(length)]
+    if kind == "integer":
+        # RAGAS uses integers as 0/1 verdicts and flags
+        return rng.randint(0, 1)
+    if kind == "number":
+        return round(rng.random(), 3)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return f"Mock {schema.get('title', 'text').lower()} {rng.getrandbits(32):08x}."
+
+
+def _schema_response(text, seed):
+    """
+    Answer a prompt that asks for JSON matching an embedded JSON schema
+
+    RAGAS prompts contain the output schema, worked examples and finally the
+    input object. Arrays in the reply get one element per item of the longest
+    list in that input (e.g. one verdict per statement), or one element.
+
+    Returns:
+        str: JSON reply, or None when the prompt contains no schema
+    """
+    objects = list(_json_objects(text))
+    schema = next((obj for obj in objects if "properties" in obj or "$defs" in obj), None)
+    if schema is None:
+        return None
+    prompt_input = objects[-1] if objects[-1] is not schema else {}
+    length = max([len(v) for v in prompt_input.values() if isinstance(v, list)] + [1])
+    defs = {**schema.get("definitions", {}), **schema.get("$defs", {})}
+    rng = random.Random(seed)
+    return json.dumps(_schema_instance(schema, defs, rng, length))
+
+
+def _batch_requests(messages):
+    """Requests packed by utils.batch_judge.pack_requests, or None for a normal prompt"""
+    if len(messages) < 2 or messages[0].get("role") != "system":
+        return None
+    try:
+        payload = json.loads(str(messages[-1].get("content", "")))
+    except json.JSONDecodeError:
+        return None
+    if isinstance(payload, list) and all(isinstance(item, dict) and "messages" in item for item in payload):
+        return payload
+    return None
+
+
+def _default_chat_response(messages):
+    """
+    Deterministic completion derived from the message list
+
+    Prompts with an embedded JSON schema (every RAGAS metric prompt) get a
+    reply that validates against it; batched judge requests get a JSON array
+    with one such reply per request; anything else gets a short sentence.
+    """
+    requests = _batch_requests(messages)
+    if requests is not None:
+        return json.dumps([_default_chat_response(item["messages"]) for item in requests])
+
+    digest = _digest(messages)
+    text = "\n".join(str(m.get("content", "")) for m in messages)
+    reply = _schema_response(text, int.from_bytes(digest[:8], "little"))
+    return reply if reply is not None else f"Mock response {digest.hex()[:16]}."
+
+
+def _embedding(item, dim):
+    """Deterministic unit vector for a text or token list"""
+    seed = int.from_bytes(_digest(item)[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections under concurrent load
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockDIAL/1.0"
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.mock.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.mock._record(self.path, status)
+
+    def _send_error(self, status, message, headers=None):
+        self._send_json(status, {"error": {"message": message, "code": str(status)}}, headers)
+
+    def _authorized(self):
+        return bool(self.headers.get("api-key") or self.headers.get("Authorization"))
+
+    def do_GET(self):
+        mock = self.server.mock
+        if not self._authorized():
+            return self._send_error(401, "Missing api-key header")
+        if self.path.split("?")[0] != "/openai/deployments":
+            return self._send_error(404, f"Unknown path {self.path}")
+        self._send_json(200, {
+            "object": "list",
+            "data": [
+                {"id": name, "model": model, "status": "succeeded", "object": "deployment"}
+                for name, model in mock.deployments.items()
+            ],
+        })
+
+    def do_POST(self):
+        mock = self.server.mock
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self._authorized():
+            return self._send_error(401, "Missing api-key header")
+
+        match = _DEPLOYMENT_PATH.match(self.path.split("?")[0])
+        if not match:
+            return self._send_error(404, f"Unknown path {self.path}")
+        deployment, endpoint = match.groups()
+        if deployment not in mock.deployments:
+            return self._send_error(404, f"Deployment {deployment} not found")
+
+        fault, delay = mock._draw()
+        time.sleep(delay)
+        if fault == "rate_limit":
+            return self._send_error(
+                429, "Rate limit exceeded", {"Retry-After": str(mock.retry_after)}
+            )
+        if fault == "error":
+            return self._send_error(500, "Injected server error")
+
+        request = json.loads(body or b"{}")
+        if endpoint == "embeddings":
+            return self._embeddings(deployment, request)
+        return self._chat(deployment, request)
+
+    def _chat(self, deployment, request):
+        mock = self.server.mock
+        messages = request.get("messages", [])
+        content = (mock.responder or _default_chat_response)(messages)
+        prompt_tokens = sum(len(str(m.get("content", ""))) // 4 + 4 for m in messages)
+        completion_tokens = len(content) // 4 + 1
+        created = int(time.time())
+        completion_id = f"chatcmpl-{_digest(messages).hex()[:24]}"
+
+        if request.get("stream"):
+            return self._stream_chat(deployment, completion_id, created, content)
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _stream_chat(self, deployment, completion_id, created, content):
+        mock = self.server.mock
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": deployment,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else f" {word}"},
+                    "finish_reason": "stop" if i == len(words) - 1 else None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(mock.stream_interval)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        mock._record(self.path, 200)
+
+    def _embeddings(self, deployment, request):
+        mock = self.server.mock
+        inputs = request.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+
+        data = []
+        for index, item in enumerate(inputs):
+            vector = _embedding(item, request.get("dimensions") or mock.embedding_dim)
+            if request.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+
+        tokens = sum(len(item) if isinstance(item, list) else len(item) // 4 + 1 for item in inputs)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": deployment,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+class MockDialServer:
+    """
+    Local OpenAI-compatible server with the DIAL URL layout
+
+    Serves GET /openai/deployments and POST /openai/deployments/<name>/chat/completions
+    and /embeddings, so create_langchain_llm, create_langchain_embeddings and
+    get_available_models work unchanged when AZURE_ENDPOINT points at base_url.
+    Responses are deterministic for a given request; latency, server errors and
+    429s are injected at configurable rates.
+
+    Args:
+        host: Interface to bind (default: 127.0.0.1)
+        port: Port to bind, 0 picks a free port (default: 0)
+        deployments: Mapping of deployment name to model name (default: DEFAULT_DEPLOYMENTS)
+        latency: Latency distribution, see parse_latency (default: no delay)
+        error_rate: Fraction of requests answered with HTTP 500 (default: 0.0)
+        rate_limit_rate: Fraction of requests answered with HTTP 429 (default: 0.0)
+        retry_after: Retry-After seconds sent with 429 responses (default: 1)
+        embedding_dim: Embedding vector size (default: 1536)
+        responder: Optional callable(messages) -> str producing chat completions
+        stream_interval: Delay between streamed chunks in seconds (default: 0.0)
+        seed: Seed of the fault and latency random generator (default: 0)
+        verbose: Log every request to stderr (default: False)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, deployments=None, latency=None,
+                 error_rate=0.0, rate_limit_rate=0.0, retry_after=1, embedding_dim=1536,
+                 responder=None, stream_interval=0.0, seed=0, verbose=False):
+        self.deployments = dict(deployments or DEFAULT_DEPLOYMENTS)
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.embedding_dim = embedding_dim
+        self.responder = responder
+        self.stream_interval = stream_interval
+        self.verbose = verbose
+        self.request_counts = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Endpoint to use as AZURE_ENDPOINT"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self):
+        """Pick the fault (None, "rate_limit" or "error") and latency of one request"""
+        with self._lock:
+            roll = self._rng.random()
+            delay = sample_latency(self._rng, self.latency)
+        if roll < self.rate_limit_rate:
+            return "rate_limit", delay
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error", delay
+        return None, delay
+
+    def _record(self, path, status):
+        key = (path.split("?")[0].rsplit("/", 1)[-1], status)
+        with self._lock:
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+    def start(self):
+        """Serve requests from a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down and release the port"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    """Run the mock server in the foreground"""
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible EPAM DIAL stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default=None,
+                        help='e.g. "constant:0.05", "uniform:0.02:0.2", "lognormal:0.3:0.5"')
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = MockDialServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        verbose=args.verbose
+    )
+    print("Mock EPAM DIAL Server")
+    print("=" * 50)
+    print(f"Serving on {server.base_url}")
+    print(f"Deployments: {', '.join(server.deployments)}")
+    print(f"Set AZURE_ENDPOINT={server.base_url} and any DIAL_API_KEY to use it")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping mock server")
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,26 @@ Model Explorer Utility for EPAM DIAL API
 Contains functions to explore available models and deployments
 """
 
+import argparse
+import asyncio
+import concurrent.futures
+import json
 import os
-import requests
-from dotenv import load_dotenv
+import time
 
-def load_api_config():
-    """Load API configuration from .env file"""
-    load_dotenv()
-    
-    api_key = os.getenv('DIAL_API_KEY')
-    azure_endpoint = os.getenv('AZURE_ENDPOINT', 'https://ai-proxy.lab.epam.com')
-    api_version = os.getenv('API_VERSION', '2024-02-01')
-    
-    if not api_key:
-        raise ValueError("DIAL_API_KEY not found in .env file")
-    
-    return api_key, azure_endpoint, api_version
+import httpx
+
+try:
+    from .client_factory import get_async_http_client, get_http_client, load_api_config
+except ImportError:
+    # Running as a script (python utils/model_explorer.py)
+    from client_factory import get_async_http_client, get_http_client, load_api_config
+
+LLM_KEYWORDS = ['gpt', 'claude', 'llama', 'text-davinci', 'chat']
+EMBEDDING_KEYWORDS = ['embedding', 'ada', 'text-embedding']
+
+DEFAULT_CATALOGUE_PATH = os.path.join(".ragas_cache", "deployment_catalogue.json")
+DEFAULT_CATALOGUE_TTL = 3600
 
 def get_available_models(api_key, azure_endpoint, api_version):
     """Fetch available models from Azure OpenAI"""
@@ -30,7 +34,7 @@ def get_available_models(api_key, azure_endpoint, api_version):
     try:
         # Azure OpenAI models endpoint
         url = f"{azure_endpoint}/openai/deployments?api-version={api_version}"
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_http_client().get(url, headers=headers, timeout=30)
         
         if response.status_code == 200:
             return response.json()
@@ -39,15 +43,314 @@ def get_available_models(api_key, azure_endpoint, api_version):
             print(f"Response: {response.text}")
             return None
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"Error fetching models: {e}")
         return None
 
+def classify_model(model_name):
+    """
+    Decide whether a model is suitable for LLM judging and/or embeddings
+
+    Returns:
+        tuple: (is_llm, is_embedding)
+    """
+    name = model_name.lower()
+    is_llm = any(keyword in name for keyword in LLM_KEYWORDS)
+    is_embedding = any(keyword in name for keyword in EMBEDDING_KEYWORDS)
+    return is_llm, is_embedding
+
+
+async def _probe_once(client, url, headers, kind):
+    """Send one small request and return (ttft_seconds, total_seconds)"""
+    start = time.perf_counter()
+    if kind == "embedding":
+        response = await client.post(url, headers=headers, json={"input": ["ping"]})
+        response.raise_for_status()
+        total = time.perf_counter() - start
+        return total, total
+
+    payload = {
+        "messages": [{"role": "user", "content": "Reply with OK."}],
+        "max_tokens": 5,
+        "temperature": 0,
+        "stream": True,
+    }
+    ttft = None
+    async with client.stream("POST", url, headers=headers, json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if ttft is None and _has_content(line):
+                ttft = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return (ttft if ttft is not None else total), total
+
+
+def _has_content(line):
+    """True for a streamed chunk that carries completion text (not a role-only or empty delta)"""
+    if not line.startswith("data:"):
+        return False
+    try:
+        chunk = json.loads(line[len("data:"):])
+    except json.JSONDecodeError:
+        return False
+    if not isinstance(chunk, dict):
+        return False
+    return any((choice.get("delta") or {}).get("content") for choice in chunk.get("choices") or [])
+
+
+def _percentile(values, q):
+    # Linear interpolation like np.percentile, without importing numpy for the probe
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return float(ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower))
+
+
+async def _probe_deployment(client, semaphore, azure_endpoint, api_key, api_version,
+                            deployment, kind, samples):
+    endpoint = "embeddings" if kind == "embedding" else "chat/completions"
+    url = f"{azure_endpoint}/openai/deployments/{deployment}/{endpoint}?api-version={api_version}"
+    headers = {'api-key': api_key, 'Content-Type': 'application/json'}
+
+    async def attempt():
+        async with semaphore:
+            try:
+                return await _probe_once(client, url, headers, kind)
+            except httpx.HTTPError:
+                return None
+
+    results = await asyncio.gather(*[attempt() for _ in range(samples)])
+    succeeded = [result for result in results if result is not None]
+    ttfts = [ttft for ttft, _ in succeeded]
+    totals = [total for _, total in succeeded]
+    return {
+        "deployment": deployment,
+        "kind": kind,
+        "samples": samples,
+        "errors": samples - len(succeeded),
+        "error_rate": (samples - len(succeeded)) / samples,
+        "ttft_p50": _percentile(ttfts, 50),
+        "ttft_p95": _percentile(ttfts, 95),
+        "latency_p50": _percentile(totals, 50),
+        "latency_p95": _percentile(totals, 95),
+    }
+
+
+def _run_async(coroutine):
+    """Run a coroutine to completion, also from inside a running loop (e.g. Jupyter)"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def rank_deployments(results, max_error_rate=0.2):
+    """
+    Order probe results: healthy deployments first, then by median latency
+
+    Args:
+        results: List of probe result dicts
+        max_error_rate: Highest error rate still considered healthy (default: 0.2)
+
+    Returns:
+        list: Results sorted best first, each with a "healthy" flag
+    """
+    for result in results:
+        result["healthy"] = result["error_rate"] <= max_error_rate and result["latency_p50"] is not None
+    return sorted(results, key=lambda r: (
+        not r["healthy"],
+        r["latency_p50"] if r["latency_p50"] is not None else float("inf"),
+        r["latency_p95"] if r["latency_p95"] is not None else float("inf"),
+    ))
+
+
+def probe_deployments(deployments=None, samples=5, concurrency=16, max_error_rate=0.2):
+    """
+    Measure TTFT, total latency and error rate of deployments concurrently
+
+    Every candidate receives `samples` small requests (a streamed 5-token chat
+    completion or a one-word embedding), all in flight at the same time up to
+    `concurrency`.
+
+    Args:
+        deployments: Mapping of deployment name to "llm" or "embedding";
+            None probes every suitable deployment returned by the API
+        samples: Requests per deployment (default: 5)
+        concurrency: Maximum requests in flight (default: 16)
+        max_error_rate: Highest error rate still considered healthy (default: 0.2)
+
+    Returns:
+        list: Ranked probe results (see rank_deployments)
+    """
+    api_key, azure_endpoint, api_version = load_api_config()
+
+    if deployments is None:
+        deployments = {}
+        models_data = get_available_models(api_key, azure_endpoint, api_version) or {}
+        for deployment in models_data.get('data', []):
+            is_llm, is_embedding = classify_model(deployment.get('model', ''))
+            if is_embedding:
+                deployments[deployment['id']] = "embedding"
+            elif is_llm:
+                deployments[deployment['id']] = "llm"
+
+    async def probe_all():
+        client = get_async_http_client()
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*[
+            _probe_deployment(client, semaphore, azure_endpoint, api_key, api_version,
+                              name, kind, samples)
+            for name, kind in deployments.items()
+        ])
+
+    return rank_deployments(list(_run_async(probe_all())), max_error_rate)
+
+
+def load_catalogue(path=DEFAULT_CATALOGUE_PATH, ttl=DEFAULT_CATALOGUE_TTL):
+    """
+    Load a cached ranked catalogue if it is younger than ttl seconds
+
+    Returns:
+        list: Ranked probe results, or None when missing, expired or for another endpoint
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        catalogue = json.load(f)
+    _, azure_endpoint, _ = load_api_config()
+    if catalogue.get("endpoint") != azure_endpoint or time.time() - catalogue["created"] > ttl:
+        return None
+    return catalogue["deployments"]
+
+
+def save_catalogue(results, path=DEFAULT_CATALOGUE_PATH):
+    """Write a ranked catalogue with a timestamp for TTL checks"""
+    _, azure_endpoint, _ = load_api_config()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"created": time.time(), "endpoint": azure_endpoint, "deployments": results}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_ranked_catalogue(ttl=DEFAULT_CATALOGUE_TTL, refresh=False, path=DEFAULT_CATALOGUE_PATH,
+                         **probe_kwargs):
+    """
+    Return the ranked deployment catalogue, probing only when the cache is stale
+
+    A probe is only cached when at least one deployment is healthy.
+
+    Args:
+        ttl: Maximum age of the cached catalogue in seconds (default: 3600)
+        refresh: Probe even if the cache is fresh (default: False)
+        path: Catalogue cache file (default: .ragas_cache/deployment_catalogue.json)
+        **probe_kwargs: Options passed to probe_deployments
+
+    Returns:
+        list: Ranked probe results
+    """
+    catalogue = None if refresh else load_catalogue(path, ttl)
+    if catalogue is None:
+        catalogue = probe_deployments(**probe_kwargs)
+        # An empty or all-failed probe (e.g. a network outage) is not cached,
+        # so the next call probes again instead of trusting it for ttl seconds
+        if any(result["healthy"] for result in catalogue):
+            save_catalogue(catalogue, path)
+    return catalogue
+
+
+def select_fastest_deployment(kind="llm", fallback=None, **catalogue_kwargs):
+    """
+    Pick the fastest healthy deployment of a kind from the ranked catalogue
+
+    Args:
+        kind: "llm" or "embedding"
+        fallback: Deployment returned when probing fails or nothing is healthy
+        **catalogue_kwargs: Options passed to get_ranked_catalogue
+
+    Returns:
+        str: Deployment name
+    """
+    try:
+        catalogue = get_ranked_catalogue(**catalogue_kwargs)
+    except (httpx.HTTPError, OSError, ValueError) as e:
+        if fallback is None:
+            raise
+        print(f"Deployment probing failed ({e}); using {fallback}")
+        return fallback
+
+    for result in catalogue:
+        if result["kind"] == kind and result["healthy"]:
+            return result["deployment"]
+    if fallback is None:
+        raise ValueError(f"No healthy {kind} deployment found")
+    return fallback
+
+
+def _format_seconds(value):
+    return f"{value * 1000:8.0f}" if value is not None else f"{'n/a':>8}"
+
+
+def print_probe_results(results):
+    """Print ranked probe results as a table"""
+    print(f"{'Deployment':<40}{'Kind':<11}{'TTFT p50':>9}{'p95':>9}{'Total p50':>10}{'p95':>9}{'Errors':>8}")
+    for result in results:
+        print(f"{result['deployment']:<40}{result['kind']:<11}"
+              f"{_format_seconds(result['ttft_p50'])} {_format_seconds(result['ttft_p95'])}"
+              f"  {_format_seconds(result['latency_p50'])} {_format_seconds(result['latency_p95'])}"
+              f"{result['error_rate']:>8.0%}")
+    print("(latencies in ms)")
+
+
+def probe_main(args):
+    """Probe every deployment and recommend the fastest healthy ones"""
+    results = get_ranked_catalogue(
+        ttl=args.ttl,
+        refresh=args.refresh,
+        samples=args.samples,
+        concurrency=args.concurrency
+    )
+    print_probe_results(results)
+    print()
+    print("RAGAS Evaluation Recommendations:")
+    print("-" * 40)
+    for kind, label in (("llm", "LLM"), ("embedding", "Embedding")):
+        healthy = [r["deployment"] for r in results if r["kind"] == kind and r["healthy"]]
+        if healthy:
+            print(f"Fastest healthy {label} Deployment: {healthy[0]}")
+        else:
+            print(f"No healthy {label} deployments found")
+
+
 def main():
     """Main function to explore EPAM DIAL API"""
+    parser = argparse.ArgumentParser(description="EPAM DIAL API Model Explorer")
+    parser.add_argument("--probe", action="store_true",
+                        help="Measure latency and error rate of every deployment")
+    parser.add_argument("--samples", type=int, default=5, help="Probe requests per deployment")
+    parser.add_argument("--concurrency", type=int, default=16, help="Probe requests in flight")
+    parser.add_argument("--ttl", type=int, default=DEFAULT_CATALOGUE_TTL,
+                        help="Seconds a cached probe catalogue stays valid")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached catalogue")
+    args = parser.parse_args()
+
     print("EPAM DIAL API Model Explorer")
     print("=" * 50)
     
+    if args.probe:
+        try:
+            probe_main(args)
+        except Exception as e:
+            print(f"Error: {e}")
+        return
+    
     try:
         # Load configuration
         api_key, azure_endpoint, api_version = load_api_config()
@@ -78,13 +381,7 @@ def main():
                 print(f"  Status: {deployment.get('status', 'unknown')}")
                 
                 # Determine if it's suitable for LLM or embeddings
-                is_llm = any(keyword in model_name.lower() for keyword in [
-                    'gpt', 'claude', 'llama', 'text-davinci', 'chat'
-                ])
-                
-                is_embedding = any(keyword in model_name.lower() for keyword in [
-                    'embedding', 'ada', 'text-embedding'
-                ])
+                is_llm, is_embedding = classify_model(model_name)
                 
                 print(f"  Suitable for LLM: {is_llm}")
                 print(f"  Suitable for Embeddings: {is_embedding}")
@@ -0,0 +1,302 @@
+"""
+Pre-scoring Cascade for RAGAS Evaluation
+Contains vectorized local proxy scores that resolve clear-cut rows before LLM judging
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+# Accepted column names for each input field (dataset names first, RAGAS names second)
+COLUMN_ALIASES = {
+    "question": ("question", "user_input"),
+    "answer": ("answer", "response"),
+    "reference": ("ground_truth", "reference"),
+    "contexts": ("retrieved_contexts", "contexts"),
+}
+
+# (low, high) proxy thresholds: rows at or below low resolve to 0.0, rows at or
+# above high resolve to 1.0, everything in between goes to the LLM judge
+DEFAULT_THRESHOLDS = {
+    "context_recall": (0.05, 0.95),
+    "context_precision": (0.05, 0.95),
+    "faithfulness": (0.05, 0.95),
+    "answer_correctness": (0.05, 0.95),
+}
+
+
+def _column(df, field):
+    for name in COLUMN_ALIASES[field]:
+        if name in df.columns:
+            return df[name]
+    raise KeyError(f"Dataset has no {field} column (expected one of {COLUMN_ALIASES[field]})")
+
+
+def _coverage(target, source):
+    """
+    Fraction of each target row's distinct tokens that also occur in source
+
+    Rows whose target has no content tokens (blank or only stop words) get
+    NaN, which leaves them uncertain instead of resolving them to 0.0.
+    """
+    overlap = np.asarray(target.multiply(source).sum(axis=1)).ravel()
+    size = np.asarray(target.sum(axis=1)).ravel()
+    return np.divide(overlap, size, out=np.full(overlap.shape, np.nan), where=size > 0)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _embed(embeddings, texts):
+    if hasattr(embeddings, "embed_array"):
+        return _normalize(np.asarray(embeddings.embed_array(texts), dtype=np.float32))
+    return _normalize(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+
+
+def compute_proxy_scores(dataset, embeddings=None):
+    """
+    Compute cheap local proxy scores for the four RAGAS metrics over a whole dataset
+
+    Lexical signals use one binary bag-of-words matrix per field, so every
+    overlap is a sparse element-wise product. With embeddings (ideally a
+    CachedEmbeddings store, so repeated chunks are embedded once) cosine
+    similarities are added and averaged with the lexical signals.
+
+    Args:
+        dataset: HuggingFace Dataset or DataFrame with question, answer,
+            ground_truth/reference and retrieved_contexts columns
+        embeddings: Optional LangChain embeddings for semantic similarity
+
+    Returns:
+        pd.DataFrame: One proxy column per metric, values in [0, 1], or NaN
+            where a row has no content words to compare
+    """
+    df = dataset if isinstance(dataset, pd.DataFrame) else dataset.to_pandas()
+    questions = _column(df, "question").fillna("").astype(str).tolist()
+    answers = _column(df, "answer").fillna("").astype(str).tolist()
+    references = _column(df, "reference").fillna("").astype(str).tolist()
+    contexts = [list(chunks) for chunks in _column(df, "contexts")]
+    joined = [" ".join(chunks) for chunks in contexts]
+    n = len(df)
+
+    # Flatten chunks so per-chunk scores can be averaged per row with bincount
+    chunk_rows = np.repeat(np.arange(n), [len(chunks) for chunks in contexts])
+    chunks = [chunk for row in contexts for chunk in row]
+    chunk_counts = np.bincount(chunk_rows, minlength=n).astype(float)
+
+    # Tokenize every text exactly once, then slice the matrix per field
+    all_texts = questions + answers + references + chunks
+    vectorizer = CountVectorizer(binary=True, stop_words="english")
+    try:
+        M = vectorizer.fit_transform(all_texts).tocsr()
+    except ValueError:
+        # Empty vocabulary: every text is blank or stop words, so there is no
+        # lexical signal and every row stays uncertain
+        M = sparse.csr_matrix((len(all_texts), 0))
+    Q, A, R, K = M[:n], M[n:2 * n], M[2 * n:3 * n], M[3 * n:]
+
+    # Row-level context vocabulary: union of the row's chunks
+    membership = sparse.csr_matrix(
+        (np.ones(len(chunks)), (chunk_rows, np.arange(len(chunks)))), shape=(n, len(chunks))
+    )
+    C = (membership @ K).tocsr()
+    C.data[:] = 1
+
+    def per_row_mean(values):
+        sums = np.bincount(chunk_rows, weights=values, minlength=n)
+        return np.divide(sums, chunk_counts, out=np.zeros(n), where=chunk_counts > 0)
+
+    # Share of each chunk's reference/question vocabulary that it covers
+    R_chunks = R[chunk_rows] if len(chunks) else R[:0]
+    Q_chunks = Q[chunk_rows] if len(chunks) else Q[:0]
+    chunk_relevance = np.fmax(_coverage(R_chunks, K), _coverage(Q_chunks, K))
+
+    answer_in_reference = _coverage(A, R)
+    reference_in_answer = _coverage(R, A)
+    token_f1 = np.divide(
+        2 * answer_in_reference * reference_in_answer,
+        answer_in_reference + reference_in_answer,
+        out=np.where(np.isnan(answer_in_reference + reference_in_answer), np.nan, 0.0),
+        where=(answer_in_reference + reference_in_answer) > 0
+    )
+
+    proxies = {
+        "context_recall": [_coverage(R, C)],
+        "context_precision": [per_row_mean(chunk_relevance)],
+        "faithfulness": [_coverage(A, C)],
+        "answer_correctness": [token_f1],
+    }
+
+    if embeddings is not None:
+        q, a, r, c = (_embed(embeddings, texts) for texts in (questions, answers, references, joined))
+        k = _embed(embeddings, chunks) if chunks else np.zeros((0, q.shape[1]))
+        clip = lambda x: np.clip(x, 0.0, 1.0)
+        proxies["context_recall"].append(clip(np.einsum("ij,ij->i", r, c)))
+        proxies["context_precision"].append(
+            clip(per_row_mean(np.einsum("ij,ij->i", q[chunk_rows], k)))
+        )
+        proxies["faithfulness"].append(clip(np.einsum("ij,ij->i", a, c)))
+        proxies["answer_correctness"].append(clip(np.einsum("ij,ij->i", a, r)))
+
+    return pd.DataFrame(
+        {metric: np.mean(signals, axis=0) for metric, signals in proxies.items()},
+        index=df.index
+    )
+
+
+def resolve_locally(proxy_scores, thresholds=None):
+    """
+    Resolve confidently high or low proxy scores without the LLM judge
+
+    Args:
+        proxy_scores: DataFrame from compute_proxy_scores
+        thresholds: Mapping of metric to (low, high) (default: DEFAULT_THRESHOLDS)
+
+    Returns:
+        pd.DataFrame: Per metric, the local score (1.0, 0.0 or NaN for uncertain
+            rows) and a "<metric>_source" column with "local" or "llm"
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    resolved = pd.DataFrame(index=proxy_scores.index)
+    for metric in proxy_scores.columns:
+        low, high = thresholds[metric]
+        proxy = proxy_scores[metric].to_numpy()
+        scores = np.select([proxy >= high, proxy <= low], [1.0, 0.0], default=np.nan)
+        resolved[metric] = scores
+        resolved[f"{metric}_source"] = np.where(np.isnan(scores), "llm", "local")
+    return resolved
+
+
+def run_cascade(dataset, metrics, llm=None, embeddings=None, thresholds=None,
+                proxy_embeddings=None, **evaluate_kwargs):
+    """
+    Score clear-cut rows locally and send only the uncertain band to RAGAS
+
+    Metrics without a local proxy (see DEFAULT_THRESHOLDS) are judged by the
+    LLM on every row.
+
+    Args:
+        dataset: HuggingFace Dataset or DataFrame in the create_ragas_dataset schema
+        metrics: List of RAGAS metrics
+        llm: LangChain LLM passed to ragas.evaluate
+        embeddings: LangChain embeddings passed to ragas.evaluate
+        thresholds: Mapping of metric name to (low, high) (default: DEFAULT_THRESHOLDS)
+        proxy_embeddings: Optional embeddings for the semantic proxy signals
+        **evaluate_kwargs: Extra keyword arguments for ragas.evaluate
+
+    Returns:
+        pd.DataFrame: Input rows with one score column per metric, a
+            "<metric>_source" flag and a "<metric>_proxy" column
+    """
+    from datasets import Dataset
+    from ragas import evaluate
+
+    df = dataset if isinstance(dataset, pd.DataFrame) else dataset.to_pandas()
+    df = df.reset_index(drop=True)
+    proxies = compute_proxy_scores(df, proxy_embeddings)
+    resolved = resolve_locally(proxies, thresholds)
+
+    results = df.copy()
+    for metric in metrics:
+        name = metric.name
+        if name in proxies.columns:
+            results[name] = resolved[name]
+            results[f"{name}_source"] = resolved[f"{name}_source"]
+            results[f"{name}_proxy"] = proxies[name]
+        else:
+            results[name] = np.nan
+            results[f"{name}_source"] = "llm"
+            results[f"{name}_proxy"] = np.nan
+
+        uncertain = np.flatnonzero(results[f"{name}_source"].to_numpy() == "llm")
+        print(f"{name}: {len(df) - len(uncertain)} rows resolved locally, "
+              f"{len(uncertain)} sent to the LLM judge")
+        if len(uncertain) == 0:
+            continue
+
+        subset = Dataset.from_pandas(df.iloc[uncertain].reset_index(drop=True))
+        scores = evaluate(
+            subset, metrics=[metric], llm=llm, embeddings=embeddings, **evaluate_kwargs
+        ).to_pandas()[name].to_numpy()
+        results.loc[uncertain, name] = scores
+
+    return results
+
+
+def calibration_report(proxy_scores, llm_scores, thresholds=None):
+    """
+    Compare local resolution against full-LLM scores for the same rows
+
+    Args:
+        proxy_scores: DataFrame from compute_proxy_scores
+        llm_scores: DataFrame of full-LLM RAGAS scores in the same row order
+        thresholds: Mapping of metric to (low, high) (default: DEFAULT_THRESHOLDS)
+
+    Returns:
+        pd.DataFrame: Per metric, the share of rows resolved locally (judge calls
+            saved), the mean absolute error and agreement of those local scores
+            with the LLM, and the rank correlation of proxy and LLM scores
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    resolved = resolve_locally(proxy_scores, thresholds)
+    rows = []
+    for metric in proxy_scores.columns:
+        if metric not in llm_scores.columns:
+            continue
+        llm = llm_scores[metric].to_numpy(dtype=float)
+        local = resolved[metric].to_numpy()
+        mask = ~np.isnan(local) & ~np.isnan(llm)
+        error = np.abs(local[mask] - llm[mask])
+        valid = ~np.isnan(llm)
+        rows.append({
+            "metric": metric,
+            "low": thresholds[metric][0],
+            "high": thresholds[metric][1],
+            "local_fraction": float(np.mean(~np.isnan(local))),
+            "local_rows": int(np.sum(~np.isnan(local))),
+            "mae_local": float(error.mean()) if error.size else np.nan,
+            "agreement_local": float(np.mean(error < 0.5)) if error.size else np.nan,
+            "spearman": float(pd.Series(proxy_scores[metric].to_numpy()[valid])
+                              .corr(pd.Series(llm[valid]), method="spearman"))
+                        if valid.sum() > 1 else np.nan,
+        })
+    return pd.DataFrame(rows).set_index("metric")
+
+
+def threshold_sweep(proxy_scores, llm_scores, metric, lows=(0.0, 0.05, 0.1, 0.2),
+                    highs=(0.8, 0.9, 0.95, 1.0)):
+    """
+    Tabulate judge savings against local error for a grid of thresholds
+
+    Args:
+        proxy_scores: DataFrame from compute_proxy_scores
+        llm_scores: DataFrame of full-LLM RAGAS scores in the same row order
+        metric: Metric name to sweep
+        lows: Candidate low thresholds
+        highs: Candidate high thresholds
+
+    Returns:
+        pd.DataFrame: One row per (low, high) with local_fraction and mae_local
+    """
+    proxy = proxy_scores[metric].to_numpy()[:, None, None]
+    llm = llm_scores[metric].to_numpy(dtype=float)[:, None, None]
+    low = np.asarray(lows)[None, :, None]
+    high = np.asarray(highs)[None, None, :]
+
+    # Broadcast all threshold pairs at once: shape (rows, lows, highs)
+    local = np.where(proxy >= high, 1.0, np.where(proxy <= low, 0.0, np.nan))
+    resolved = ~np.isnan(local) & ~np.isnan(llm)
+    error = np.where(resolved, np.abs(np.nan_to_num(local) - np.nan_to_num(llm)), 0.0)
+    counts = resolved.sum(axis=0)
+
+    grid_low, grid_high = np.meshgrid(lows, highs, indexing="ij")
+    return pd.DataFrame({
+        "low": grid_low.ravel(),
+        "high": grid_high.ravel(),
+        "local_fraction": (~np.isnan(local)).mean(axis=0).ravel(),
+        "mae_local": np.divide(error.sum(axis=0), counts,
+                               out=np.full(counts.shape, np.nan), where=counts > 0).ravel(),
+    })
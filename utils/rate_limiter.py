@@ -0,0 +1,472 @@
+"""
+Rate Limit Scheduler for EPAM DIAL Deployments
+Contains token-bucket RPM/TPM budgeting and LangChain wrappers that keep evaluation within proxy quotas
+"""
+
+import asyncio
+import datetime
+import email.utils
+import random
+import threading
+import time
+from typing import Any
+
+import openai
+import tiktoken
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+
+# Errors that are retried by the scheduler instead of the OpenAI client
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Fraction of the configured rate restored after each successful request
+# following a 429 (additive increase, multiplicative decrease)
+_RECOVERY_STEP = 0.05
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with reservation semantics
+
+    reserve() takes the amount immediately (the level may go negative) and
+    returns how long the caller must wait, so concurrent callers are queued in
+    arrival order and the bucket is drained at exactly the refill rate.
+
+    Args:
+        rate_per_minute: Sustained refill rate per minute
+        burst_seconds: Bucket capacity expressed in seconds of refill (default: 10)
+    """
+
+    def __init__(self, rate_per_minute, burst_seconds=10):
+        self.configured_rate = rate_per_minute / 60.0
+        self.rate = self.configured_rate
+        self.burst_seconds = burst_seconds
+        self.level = self.capacity
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return max(self.rate * self.burst_seconds, 1.0)
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        """
+        Reserve amount units from the bucket
+
+        Args:
+            amount: Units to consume; clamped to the bucket capacity
+
+        Returns:
+            float: Seconds to wait before the reservation may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+            wait = -self.level / self.rate if self.level < 0 else 0.0
+            return max(wait, self.blocked_until - now, 0.0)
+
+    def refund(self, amount):
+        """
+        Return units to the bucket (negative amount charges extra usage)
+
+        Like reserve, the amount is clamped to the bucket capacity, and the
+        level never rises above capacity.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            amount = max(-self.capacity, min(amount, self.capacity))
+            self.level = min(self.capacity, self.level + amount)
+
+    def block(self, seconds):
+        """Stop handing out capacity for the given number of seconds"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def scale_rate(self, factor):
+        """Multiply the current refill rate, bounded by the configured rate"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.configured_rate, max(self.rate * factor, self.configured_rate * 0.05))
+            # A lower rate shrinks the capacity; the level must follow
+            self.level = min(self.level, self.capacity)
+
+    def recover(self):
+        """Move the refill rate one step back towards the configured rate"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * _RECOVERY_STEP)
+
+
+class DeploymentBudget:
+    """
+    Requests-per-minute and tokens-per-minute budget for one deployment
+
+    Args:
+        rpm: Requests per minute quota
+        tpm: Tokens per minute quota
+        burst_seconds: Bucket capacity in seconds of quota (default: 10)
+    """
+
+    def __init__(self, rpm, tpm, burst_seconds=10):
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+        self.rate_limited = 0
+
+    def reserve(self, tokens):
+        """Reserve one request and the estimated tokens, returning the wait in seconds"""
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def on_rate_limited(self, retry_after):
+        """Back off after a 429: pause for Retry-After and lower the sustained rate"""
+        self.rate_limited += 1
+        for bucket in (self.requests, self.tokens):
+            bucket.block(retry_after)
+            bucket.scale_rate(0.8)
+
+    def on_success(self, estimated_tokens, actual_tokens=None):
+        """Correct the token estimate with measured usage and recover the rate"""
+        if actual_tokens is not None:
+            # Only the clamped amount was reserved, so only that can be refunded
+            reserved = min(estimated_tokens, self.tokens.capacity)
+            self.tokens.refund(reserved - actual_tokens)
+        self.requests.recover()
+        self.tokens.recover()
+
+
+_encodings = {}
+
+
+def _encoding(deployment):
+    if deployment not in _encodings:
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(deployment)
+            except KeyError:
+                encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # Tokenizer files could not be loaded (e.g. offline): estimate instead
+            encoding = None
+        _encodings[deployment] = encoding
+    return _encodings[deployment]
+
+
+def count_tokens(deployment, texts):
+    """Count tokens of a list of strings with the deployment's tokenizer"""
+    encoding = _encoding(deployment)
+    if encoding is None:
+        return sum(len(text) // 4 + 1 for text in texts)
+    return sum(len(encoding.encode(text, disallowed_special=())) for text in texts)
+
+
+def parse_retry_after(error, default=1.0):
+    """
+    Read the server-requested backoff from an OpenAI error response
+
+    Args:
+        error: openai.APIStatusError or any exception
+        default: Seconds to use when no header is present (default: 1.0)
+
+    Returns:
+        float: Seconds to wait
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            parsed = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            # Malformed header: fall back to the default backoff
+            return default
+        if parsed.tzinfo is None:
+            # HTTP dates are in GMT; "-0000" parses as a naive datetime
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return max(parsed.timestamp() - time.time(), 0.0)
+    return default
+
+
+class RateLimitScheduler:
+    """
+    Per-deployment RPM/TPM scheduler shared by LLM and embedding wrappers
+
+    Args:
+        limits: Mapping of deployment name to (rpm, tpm) quotas
+        default_rpm: RPM quota for deployments not listed in limits (default: 60)
+        default_tpm: TPM quota for deployments not listed in limits (default: 60000)
+        burst_seconds: Bucket capacity in seconds of quota (default: 10)
+        max_attempts: Attempts per request before the error is raised (default: 6)
+    """
+
+    def __init__(self, limits=None, default_rpm=60, default_tpm=60000, burst_seconds=10,
+                 max_attempts=6):
+        self.limits = dict(limits or {})
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.burst_seconds = burst_seconds
+        self.max_attempts = max_attempts
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def budget(self, deployment):
+        """Return (creating on first use) the budget of a deployment"""
+        with self._lock:
+            if deployment not in self._budgets:
+                rpm, tpm = self.limits.get(deployment, (self.default_rpm, self.default_tpm))
+                self._budgets[deployment] = DeploymentBudget(rpm, tpm, self.burst_seconds)
+            return self._budgets[deployment]
+
+    def count_tokens(self, deployment, texts):
+        """Count tokens of a list of strings with the deployment's tokenizer"""
+        return count_tokens(deployment, texts)
+
+    def estimate_chat_tokens(self, deployment, messages, max_tokens=None):
+        """
+        Estimate the TPM cost of a chat request before sending it
+
+        Args:
+            deployment: Deployment name
+            messages: List of LangChain messages
+            max_tokens: Completion limit of the request, counted in full
+
+        Returns:
+            int: Estimated prompt plus completion tokens
+        """
+        # ~4 tokens of chat formatting per message plus 3 for the reply primer
+        prompt = self.count_tokens(deployment, [str(m.content) for m in messages])
+        return prompt + 4 * len(messages) + 3 + (max_tokens or 0)
+
+    def _attempts(self, deployment, tokens):
+        """Yield (attempt, wait_seconds) pairs, reserving budget for every attempt"""
+        budget = self.budget(deployment)
+        for attempt in range(self.max_attempts):
+            yield attempt, budget.reserve(tokens)
+
+    def _backoff(self, deployment, error, attempt):
+        """Update the budget after a failed attempt and return extra sleep seconds"""
+        if isinstance(error, openai.RateLimitError):
+            self.budget(deployment).on_rate_limited(parse_retry_after(error))
+            return 0.0
+        # Transient server or network error: exponential backoff with jitter
+        return min(2 ** attempt, 30) * (0.5 + random.random())
+
+    async def arun(self, deployment, tokens, call):
+        """
+        Run an async request within the deployment budget, retrying transient errors
+
+        Args:
+            deployment: Deployment name
+            tokens: Estimated tokens of the request
+            call: Zero-argument coroutine function performing the request
+
+        Returns:
+            tuple: (result, queue_wait_seconds, retries)
+        """
+        queue_wait = 0.0
+        for attempt, wait in self._attempts(deployment, tokens):
+            if wait > 0:
+                await asyncio.sleep(wait)
+                queue_wait += wait
+            try:
+                return await call(), queue_wait, attempt
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = self._backoff(deployment, e, attempt)
+                await asyncio.sleep(delay)
+                queue_wait += delay
+
+    def run(self, deployment, tokens, call):
+        """Synchronous version of arun for threaded callers"""
+        queue_wait = 0.0
+        for attempt, wait in self._attempts(deployment, tokens):
+            if wait > 0:
+                time.sleep(wait)
+                queue_wait += wait
+            try:
+                return call(), queue_wait, attempt
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = self._backoff(deployment, e, attempt)
+                time.sleep(delay)
+                queue_wait += delay
+
+    def stats(self):
+        """
+        Return the current per-deployment budget state
+
+        Returns:
+            dict: deployment -> rpm/tpm currently allowed and number of 429s seen
+        """
+        with self._lock:
+            budgets = dict(self._budgets)
+        return {
+            deployment: {
+                "rpm": budget.requests.rate * 60,
+                "tpm": budget.tokens.rate * 60,
+                "rate_limited": budget.rate_limited,
+            }
+            for deployment, budget in budgets.items()
+        }
+
+
+def _total_tokens(result):
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    return usage.get("total_tokens")
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    Chat model wrapper that sends every request through a RateLimitScheduler
+
+    The wrapped model should be created with max_retries=0 so that 429s reach
+    the scheduler. Queue wait and retry counts are added to generation_info;
+    SQLiteLLMCache leaves them out of cached entries.
+    """
+
+    llm: BaseChatModel
+    scheduler: Any
+    deployment: str
+
+    @property
+    def _llm_type(self):
+        return f"scheduled-{self.llm._llm_type}"
+
+    @property
+    def _identifying_params(self):
+        return self.llm._identifying_params
+
+    def _get_llm_string(self, stop=None, **kwargs):
+        # Keep cache keys identical to those of the unwrapped model
+        return self.llm._get_llm_string(stop=stop, **kwargs)
+
+    def _estimate(self, messages, kwargs):
+        # A per-call limit (e.g. a packed judge batch) overrides the model's own
+        max_tokens = kwargs.get("max_tokens") or getattr(self.llm, "max_tokens", None)
+        return self.scheduler.estimate_chat_tokens(self.deployment, messages, max_tokens)
+
+    def _finish(self, result, tokens, queue_wait, retries):
+        self.scheduler.budget(self.deployment).on_success(tokens, _total_tokens(result))
+        for generation in result.generations:
+            info = dict(generation.generation_info or {})
+            info.update({"queue_wait": queue_wait, "retries": retries})
+            generation.generation_info = info
+        return result
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._estimate(messages, kwargs)
+        result, queue_wait, retries = self.scheduler.run(
+            self.deployment,
+            tokens,
+            lambda: self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+        return self._finish(result, tokens, queue_wait, retries)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._estimate(messages, kwargs)
+        result, queue_wait, retries = await self.scheduler.arun(
+            self.deployment,
+            tokens,
+            lambda: self.llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+        return self._finish(result, tokens, queue_wait, retries)
+
+    def _combine_llm_outputs(self, llm_outputs):
+        return self.llm._combine_llm_outputs(llm_outputs)
+
+
+class ScheduledEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that sends every request through a RateLimitScheduler
+
+    Texts are split into requests of chunk_size so that each HTTP request is
+    budgeted individually.
+
+    Args:
+        embeddings: The LangChain embeddings model to wrap (created with max_retries=0)
+        scheduler: RateLimitScheduler shared with the other wrappers
+        deployment: Deployment name used for budgeting
+        chunk_size: Texts per request (default: the wrapped model's chunk_size or 512)
+        telemetry: Optional TelemetryRecorder receiving one entry per request
+    """
+
+    def __init__(self, embeddings, scheduler, deployment, chunk_size=None, telemetry=None):
+        self.embeddings = embeddings
+        self.scheduler = scheduler
+        self.deployment = deployment
+        self.chunk_size = chunk_size or getattr(embeddings, "chunk_size", 512)
+        self.telemetry = telemetry
+
+    def _record(self, tokens, start, queue_wait, retries):
+        if self.telemetry is not None:
+            duration = time.perf_counter() - start
+            self.telemetry.record(
+                kind="embedding",
+                deployment=self.deployment,
+                prompt_tokens=tokens,
+                tokens_estimated=True,
+                queue_wait=queue_wait,
+                latency=max(duration - queue_wait, 0.0),
+                duration=duration,
+                retries=retries,
+            )
+
+    def _chunks(self, texts):
+        for start in range(0, len(texts), self.chunk_size):
+            chunk = texts[start:start + self.chunk_size]
+            yield chunk, self.scheduler.count_tokens(self.deployment, chunk)
+
+    def embed_documents(self, texts):
+        vectors = []
+        for chunk, tokens in self._chunks(texts):
+            start = time.perf_counter()
+            result, queue_wait, retries = self.scheduler.run(
+                self.deployment, tokens, lambda: self.embeddings.embed_documents(chunk)
+            )
+            self.scheduler.budget(self.deployment).on_success(tokens)
+            self._record(tokens, start, queue_wait, retries)
+            vectors.extend(result)
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        vectors = []
+        for chunk, tokens in self._chunks(texts):
+            start = time.perf_counter()
+            result, queue_wait, retries = await self.scheduler.arun(
+                self.deployment, tokens, lambda: self.embeddings.aembed_documents(chunk)
+            )
+            self.scheduler.budget(self.deployment).on_success(tokens)
+            self._record(tokens, start, queue_wait, retries)
+            vectors.extend(result)
+        return vectors
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
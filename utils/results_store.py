@@ -0,0 +1,205 @@
+"""
+Results Store for RAGAS Evaluation
+Contains a compact columnar results format with a deduplicated, content-addressed context table
+"""
+
+import ast
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+FORMAT_VERSION = 1
+ROWS_FILE = "rows.arrow"
+CONTEXTS_FILE = "contexts.arrow"
+CONTEXT_COLUMN = "retrieved_contexts"
+CONTEXT_IDS_COLUMN = "context_ids"
+TEXT_COLUMNS = ("user_input", "response", "reference", "question", "answer", "ground_truth")
+
+# Largest offset of an Arrow list with int32 offsets; bigger stores use large_list
+_MAX_LIST_OFFSET = np.iinfo(np.int32).max
+
+
+def context_hash(text):
+    """Content address of a context chunk (first 16 hex digits of its sha256)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_contexts(value):
+    """Accept a list of chunks or the stringified list found in CSV exports"""
+    if isinstance(value, str):
+        value = ast.literal_eval(value) if value.startswith("[") else [value]
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    return [str(chunk) for chunk in value]
+
+
+def _is_score_column(series):
+    return pd.api.types.is_float_dtype(series.dtype)
+
+
+def save_results(results, path="ragas_evaluation_results", context_column=CONTEXT_COLUMN):
+    """
+    Save evaluation results in the compact columnar format
+
+    The store is a directory of two uncompressed Arrow IPC files that can be
+    memory-mapped: rows.arrow holds one row per result with float32 score
+    columns, string text columns and a list of context ids (a large_list with
+    int64 offsets once there are more than 2^31 - 1 references); contexts.arrow
+    holds every distinct context chunk once with its content hash. Row order
+    and all other columns are preserved.
+
+    Args:
+        results: Results DataFrame (e.g. result.to_pandas() or load_shard_results())
+        path: Output directory (default: "ragas_evaluation_results")
+        context_column: Column holding lists of context chunks (default: "retrieved_contexts")
+
+    Returns:
+        str: The directory written
+    """
+    rows = results.reset_index(drop=True)
+    contexts = [_parse_contexts(value) for value in rows[context_column]] \
+        if context_column in rows.columns else [[] for _ in range(len(rows))]
+    rows = rows.drop(columns=[context_column], errors="ignore")
+
+    # Deduplicate chunks: factorize assigns each distinct text one id
+    lengths = np.fromiter((len(chunks) for chunks in contexts), dtype=np.int64, count=len(contexts))
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    flat = [chunk for chunks in contexts for chunk in chunks]
+    codes, uniques = pd.factorize(pd.Series(flat, dtype=object), sort=False)
+    if len(uniques) > np.iinfo(np.int32).max:
+        raise ValueError(f"{len(uniques)} distinct contexts exceed the int32 context id range")
+
+    columns = {}
+    for name in rows.columns:
+        series = rows[name]
+        if _is_score_column(series):
+            columns[name] = pa.array(series.to_numpy(dtype=np.float32), type=pa.float32())
+        elif name in TEXT_COLUMNS:
+            # Numbers read from CSV or JSON (e.g. a reference of 1990) are stored as text
+            values = [None if pd.isna(value) else str(value) for value in series.astype(object)]
+            columns[name] = pa.array(values, type=pa.string())
+        else:
+            columns[name] = pa.array(series, from_pandas=True)
+    context_ids = pa.array(codes.astype(np.int32), type=pa.int32())
+    if offsets[-1] > _MAX_LIST_OFFSET:
+        # More context references than int32 offsets can address
+        columns[CONTEXT_IDS_COLUMN] = pa.LargeListArray.from_arrays(
+            pa.array(offsets, type=pa.int64()), context_ids
+        )
+    else:
+        columns[CONTEXT_IDS_COLUMN] = pa.ListArray.from_arrays(
+            pa.array(offsets.astype(np.int32), type=pa.int32()), context_ids
+        )
+
+    metadata = {
+        "format_version": str(FORMAT_VERSION),
+        "context_column": context_column,
+        "columns": json.dumps(list(results.columns)),
+    }
+    table = pa.table(columns).replace_schema_metadata(metadata)
+    context_table = pa.table({
+        "hash": pa.array([context_hash(text) for text in uniques], type=pa.string()),
+        "text": pa.array(list(uniques), type=pa.string()),
+    })
+
+    os.makedirs(path, exist_ok=True)
+    for name, data in ((ROWS_FILE, table), (CONTEXTS_FILE, context_table)):
+        # Write next to the target and rename, so readers never see half a file
+        temporary = os.path.join(path, f".{name}.tmp")
+        feather.write_feather(data, temporary, compression="uncompressed")
+        os.replace(temporary, os.path.join(path, name))
+    return path
+
+
+def read_results_table(path, columns=None, memory_map=True):
+    """
+    Open the rows of a results store as an Arrow table without parsing
+
+    Args:
+        path: Directory written by save_results
+        columns: Optional list of columns to read (column projection)
+        memory_map: Map the file instead of reading it into memory (default: True)
+
+    Returns:
+        pyarrow.Table: Rows with context ids instead of context text
+    """
+    return feather.read_table(os.path.join(path, ROWS_FILE), columns=columns, memory_map=memory_map)
+
+
+def load_contexts(path, memory_map=True):
+    """
+    Load the deduplicated context table of a results store
+
+    Returns:
+        pd.DataFrame: One row per distinct chunk with hash and text; the row
+            position is the id referenced by context_ids
+    """
+    return feather.read_table(os.path.join(path, CONTEXTS_FILE), memory_map=memory_map).to_pandas()
+
+
+def load_results(path="ragas_evaluation_results", columns=None, with_contexts=True, memory_map=True):
+    """
+    Load evaluation results from a results store
+
+    Args:
+        path: Directory written by save_results (default: "ragas_evaluation_results")
+        columns: Optional list of columns to load; only those are read from disk
+        with_contexts: Rebuild the context column as lists of chunk text
+            (default: True); otherwise only the context_ids column is returned
+        memory_map: Map the files instead of reading them into memory (default: True)
+
+    Returns:
+        pd.DataFrame: Results with the original column order
+    """
+    with pa.memory_map(os.path.join(path, ROWS_FILE)) as source:
+        schema = pa.ipc.open_file(source).schema
+    metadata = {key.decode(): value.decode() for key, value in (schema.metadata or {}).items()}
+    context_column = metadata.get("context_column", CONTEXT_COLUMN)
+    original = json.loads(metadata.get("columns", "[]")) or schema.names
+
+    wanted = list(original) if columns is None else list(columns)
+    rehydrate = with_contexts and context_column in wanted
+    read = [name for name in wanted if name in schema.names]
+    if rehydrate and CONTEXT_IDS_COLUMN not in read:
+        read.append(CONTEXT_IDS_COLUMN)
+    if columns is None and not with_contexts:
+        read.append(CONTEXT_IDS_COLUMN)
+
+    table = read_results_table(path, read, memory_map=memory_map)
+    if rehydrate:
+        ids = table.column(CONTEXT_IDS_COLUMN).combine_chunks()
+        texts = feather.read_table(
+            os.path.join(path, CONTEXTS_FILE), columns=["text"], memory_map=memory_map
+        ).column("text").combine_chunks()
+        # Repeated chunks can take the rehydrated text past 2 GB, beyond int32 string offsets
+        texts = texts.cast(pa.large_string())
+        list_array = pa.LargeListArray if pa.types.is_large_list(ids.type) else pa.ListArray
+        chunks = list_array.from_arrays(ids.offsets, texts.take(ids.values))
+        table = table.append_column(context_column, chunks)
+        if CONTEXT_IDS_COLUMN not in wanted:
+            table = table.drop_columns([CONTEXT_IDS_COLUMN])
+
+    df = table.to_pandas()
+    if rehydrate:
+        df[context_column] = [list(chunks) for chunks in df[context_column]]
+    order = [name for name in wanted if name in df.columns]
+    return df[order + [name for name in df.columns if name not in order]]
+
+
+def convert_csv(csv_path="ragas_evaluation_results.csv", path="ragas_evaluation_results"):
+    """
+    Convert a CSV results export into the compact results store
+
+    Args:
+        csv_path: CSV written by results_df.to_csv (default: "ragas_evaluation_results.csv")
+        path: Output directory (default: "ragas_evaluation_results")
+
+    Returns:
+        str: The directory written
+    """
+    return save_results(pd.read_csv(csv_path), path)
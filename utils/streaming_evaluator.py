@@ -0,0 +1,217 @@
+"""
+Streaming Evaluator for RAGAS
+Contains a checkpointed, resumable driver that evaluates a dataset shard by shard
+"""
+
+import hashlib
+import itertools
+import json
+import os
+
+DEFAULT_SHARD_SIZE = 100
+
+
+def manifest_path(output_path):
+    """Return the checkpoint manifest path that belongs to a results file"""
+    return f"{output_path}.manifest.json"
+
+
+def iter_shards(rows, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Split any iterable of row dicts into lists of shard_size rows
+
+    Args:
+        rows: HuggingFace Dataset, IterableDataset, list or generator of dicts
+        shard_size: Number of rows per shard (default: 100)
+
+    Yields:
+        tuple: (shard_index, list of row dicts)
+    """
+    iterator = iter(rows)
+    for shard_index in itertools.count():
+        shard = list(itertools.islice(iterator, shard_size))
+        if not shard:
+            return
+        yield shard_index, shard
+
+
+def _shard_hash(rows):
+    """Fingerprint the inputs of a shard so a changed dataset is detected on resume"""
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(json.dumps(row, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _metric_names(metrics):
+    return [getattr(metric, "name", metric.__class__.__name__) for metric in metrics]
+
+
+def _load_manifest(path, shard_size, metric_names):
+    if not os.path.exists(path):
+        return {
+            "shard_size": shard_size,
+            "metrics": metric_names,
+            "completed_shards": {},
+            "committed_bytes": 0,
+            "rows_done": 0,
+        }
+
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest["shard_size"] != shard_size or manifest["metrics"] != metric_names:
+        raise ValueError(
+            f"Checkpoint {path} was written with shard_size={manifest['shard_size']} "
+            f"and metrics={manifest['metrics']}; remove it or use the same settings"
+        )
+    return manifest
+
+
+def _json_default(value):
+    """Serialize numpy values that pandas leaves in object columns"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def _to_json_lines(results_df):
+    """
+    Serialize rows as JSON lines with round-trip float precision
+
+    DataFrame.to_json keeps only 10 significant digits, which would make
+    aggregates over merged shards differ from a single in-memory run.
+    """
+    records = results_df.astype(object).where(results_df.notna(), None).to_dict("records")
+    return "".join(json.dumps(record, default=_json_default) + "\n" for record in records)
+
+
+def _save_manifest(path, manifest):
+    """Write the manifest atomically so a crash never leaves it half-written"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def evaluate_in_shards(dataset, metrics, llm=None, embeddings=None,
+                       output_path="ragas_evaluation_results.jsonl",
+                       shard_size=DEFAULT_SHARD_SIZE, row_offset=0, overwrite=False,
+                       **evaluate_kwargs):
+    """
+    Evaluate a dataset in fixed-size shards with an append-only results file
+
+    Each finished shard is appended to output_path as JSON lines (one row per
+    line, with a row_index column) and recorded in a checkpoint manifest next
+    to it. Re-running with the same arguments skips completed shards, so only
+    unfinished work is paid for again. Only one shard is held in memory.
+
+    Args:
+        dataset: HuggingFace Dataset, IterableDataset, or any iterable of row dicts
+        metrics: List of RAGAS metrics
+        llm: LangChain LLM passed to ragas.evaluate
+        embeddings: LangChain embeddings passed to ragas.evaluate
+        output_path: JSONL results file (default: ragas_evaluation_results.jsonl)
+        shard_size: Rows per shard (default: 100)
+        row_offset: Global index of the first row, for slices of a larger
+            dataset evaluated by separate processes (default: 0)
+        overwrite: Replace an existing output_path that has no checkpoint
+            manifest; otherwise such a file is an error (default: False)
+        **evaluate_kwargs: Extra keyword arguments for ragas.evaluate
+
+    Returns:
+        dict: The checkpoint manifest after the run
+    """
+    from datasets import Dataset
+    from ragas import evaluate
+
+    checkpoint = manifest_path(output_path)
+    if os.path.exists(output_path) and not os.path.exists(checkpoint) and not overwrite:
+        raise FileExistsError(
+            f"{output_path} exists but has no checkpoint manifest {checkpoint}; "
+            f"pass overwrite=True to replace it or choose another output_path"
+        )
+    manifest = _load_manifest(checkpoint, shard_size, _metric_names(metrics))
+
+    # Drop any rows appended after the last committed shard (interrupted write)
+    if os.path.exists(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(manifest["committed_bytes"])
+
+    for shard_index, rows in iter_shards(dataset, shard_size):
+        shard_hash = _shard_hash(rows)
+        done = manifest["completed_shards"].get(str(shard_index))
+        if done is not None:
+            if done != shard_hash:
+                raise ValueError(
+                    f"Shard {shard_index} differs from the checkpointed run; "
+                    f"the dataset changed since {checkpoint} was written"
+                )
+            continue
+
+        first_row = row_offset + shard_index * shard_size
+        print(f"Evaluating shard {shard_index} (rows {first_row}-{first_row + len(rows) - 1})...")
+
+        result = evaluate(
+            Dataset.from_list(rows),
+            metrics=metrics,
+            llm=llm,
+            embeddings=embeddings,
+            **evaluate_kwargs
+        )
+        results_df = result.to_pandas()
+        results_df.insert(0, "row_index", range(first_row, first_row + len(results_df)))
+
+        payload = _to_json_lines(results_df)
+
+        with open(output_path, "ab") as f:
+            f.write(payload.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            committed_bytes = f.tell()
+
+        manifest["completed_shards"][str(shard_index)] = shard_hash
+        manifest["committed_bytes"] = committed_bytes
+        manifest["rows_done"] += len(results_df)
+        _save_manifest(checkpoint, manifest)
+
+    print(f"Status: Success {manifest['rows_done']} rows evaluated into {output_path}")
+    return manifest
+
+
+# Keep strings such as "1990" as strings; only JSON numbers become numeric columns
+_READ_OPTIONS = {"lines": True, "precise_float": True, "dtype": False, "convert_dates": False}
+
+
+def _restore_failed_metrics(df):
+    """Read all-null columns (a metric that failed on every row) back as NaN floats"""
+    for name in df.columns:
+        if df[name].dtype == object and df[name].isna().all():
+            df[name] = df[name].astype("float64")
+    return df
+
+
+def iter_results(output_path, chunksize=10000):
+    """
+    Read a sharded results file back in bounded-memory chunks
+
+    Args:
+        output_path: JSONL results file written by evaluate_in_shards
+        chunksize: Rows per returned DataFrame (default: 10000)
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of results
+    """
+    import pandas as pd
+
+    with pd.read_json(output_path, chunksize=chunksize, **_READ_OPTIONS) as reader:
+        for chunk in reader:
+            yield _restore_failed_metrics(chunk)
+
+
+def load_shard_results(output_path):
+    """Load a complete sharded results file into one DataFrame"""
+    import pandas as pd
+
+    return _restore_failed_metrics(pd.read_json(output_path, **_READ_OPTIONS))
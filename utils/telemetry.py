@@ -0,0 +1,425 @@
+"""
+Request Telemetry for EPAM DIAL Models
+Contains per-call latency, token and cost recording with a JSONL trace and a Prometheus text summary
+"""
+
+import json
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+
+from .rate_limiter import count_tokens
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ROW_NAME = re.compile(r"^row (\d+)$")
+
+TRACE_FIELDS = (
+    "timestamp", "kind", "deployment", "metric", "row", "prompt_tokens", "completion_tokens",
+    "tokens_estimated", "queue_wait", "latency", "duration", "retries", "cached", "batch_id",
+    "batch_size", "cost_usd", "error",
+)
+
+
+class TelemetryRecorder(BaseCallbackHandler):
+    """
+    Record one entry per LLM or embedding request
+
+    Pass it as telemetry= to create_langchain_llm / create_langchain_embeddings.
+    To attribute chat requests to a metric and dataset row, also pass it to
+    ragas.evaluate(callbacks=[telemetry]): RAGAS runs every metric of every
+    row as a chain named after the metric below a chain named "row <i>".
+
+    Each entry holds the deployment, metric, row, prompt and completion tokens
+    (reported by the API, otherwise estimated with tiktoken), queue wait
+    (rate limiter delays and backoff), network latency, retries and cost.
+    Responses replayed from the LLM cache are recorded with cached=True and
+    counted as cache hits, not as requests sent; they cost nothing. Judge
+    prompts packed into one request by BatchedChatModel keep one entry each
+    (with their token share) but share a batch_id, so the packed request is
+    counted, and its latency observed, once.
+
+    Args:
+        trace_path: Optional JSONL file; every entry is appended as one line
+        prices: Optional mapping of deployment to (USD per 1K prompt tokens,
+            USD per 1K completion tokens) used for cost_usd
+    """
+
+    def __init__(self, trace_path=None, prices=None):
+        self.trace_path = trace_path
+        self.prices = dict(prices or {})
+        self.records = []
+        self._chains = {}
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._trace = open(trace_path, "a", encoding="utf-8") if trace_path else None
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        with self._lock:
+            self._chains[run_id] = (name, parent_run_id)
+
+    def _forget_chain(self, run_id):
+        with self._lock:
+            self._chains.pop(run_id, None)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._forget_chain(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._forget_chain(run_id)
+
+    def _attribute(self, parent_run_id):
+        """Walk up the run tree to the enclosing metric and "row <i>" chains"""
+        metric = row = None
+        child_name = None
+        while parent_run_id is not None:
+            name, parent_run_id = self._chains.get(parent_run_id, (None, None))
+            match = _ROW_NAME.match(name or "")
+            if match:
+                row = int(match.group(1))
+                metric = child_name
+                break
+            child_name = name
+        return metric, row
+
+    def _start(self, run_id, parent_run_id, prompts, kwargs):
+        params = kwargs.get("invocation_params") or {}
+        metadata = kwargs.get("metadata") or {}
+        deployment = params.get("model_name") or params.get("model") or metadata.get("ls_model_name")
+        with self._lock:
+            metric, row = self._attribute(parent_run_id)
+            self._calls[run_id] = {
+                "timestamp": time.time(),
+                "start": time.perf_counter(),
+                "deployment": deployment,
+                "metric": metric,
+                "row": row,
+                "prompts": prompts,
+            }
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        prompts = [str(message.content) for batch in messages for message in batch]
+        self._start(run_id, parent_run_id, prompts, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, list(prompts), kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        duration = time.perf_counter() - call["start"]
+
+        generations = [g for batch in response.generations for g in batch]
+        info = (generations[0].generation_info or {}) if generations else {}
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if not usage and generations:
+            metadata = getattr(getattr(generations[0], "message", None), "usage_metadata", None) or {}
+            usage = {
+                "prompt_tokens": metadata.get("input_tokens"),
+                "completion_tokens": metadata.get("output_tokens"),
+            }
+
+        prompt_tokens = usage.get("prompt_tokens")
+        completion_tokens = usage.get("completion_tokens")
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(call["deployment"], call["prompts"])
+        if completion_tokens is None:
+            completion_tokens = count_tokens(call["deployment"], [g.text for g in generations])
+
+        queue_wait = float(info.get("queue_wait") or 0.0)
+        self.record(
+            kind="chat",
+            timestamp=call["timestamp"],
+            # Hedged requests report the deployment that actually answered
+            deployment=info.get("deployment") or call["deployment"],
+            metric=call["metric"],
+            row=call["row"],
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            tokens_estimated=estimated,
+            queue_wait=queue_wait,
+            latency=max(duration - queue_wait, 0.0),
+            duration=duration,
+            retries=int(info.get("retries") or 0),
+            cached=bool(info.get("cached")),
+            batch_id=info.get("batch_id"),
+            batch_size=int(info.get("batch_size") or 1),
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        duration = time.perf_counter() - call["start"]
+        self.record(
+            kind="chat",
+            timestamp=call["timestamp"],
+            deployment=call["deployment"],
+            metric=call["metric"],
+            row=call["row"],
+            prompt_tokens=count_tokens(call["deployment"], call["prompts"]),
+            completion_tokens=0,
+            tokens_estimated=True,
+            latency=duration,
+            duration=duration,
+            error=type(error).__name__,
+        )
+
+    def record(self, kind, deployment, prompt_tokens=0, completion_tokens=0, latency=0.0,
+               duration=None, queue_wait=0.0, retries=0, metric=None, row=None,
+               tokens_estimated=False, timestamp=None, error=None, cached=False, batch_id=None,
+               batch_size=1):
+        """Add one request entry (also used by the embedding wrappers)"""
+        prompt_price, completion_price = self.prices.get(deployment, (None, None))
+        cost = None
+        if cached:
+            cost = 0.0
+        elif prompt_price is not None:
+            cost = (prompt_tokens * prompt_price + completion_tokens * (completion_price or 0.0)) / 1000.0
+        entry = {
+            "timestamp": timestamp if timestamp is not None else time.time(),
+            "kind": kind,
+            "deployment": deployment,
+            "metric": metric,
+            "row": row,
+            "prompt_tokens": int(prompt_tokens),
+            "completion_tokens": int(completion_tokens),
+            "tokens_estimated": bool(tokens_estimated),
+            "queue_wait": float(queue_wait),
+            "latency": float(latency),
+            "duration": float(duration if duration is not None else latency + queue_wait),
+            "retries": int(retries),
+            "cached": bool(cached),
+            "batch_id": batch_id,
+            "batch_size": int(batch_size),
+            "cost_usd": cost,
+            "error": error,
+        }
+        with self._lock:
+            self.records.append(entry)
+            if self._trace is not None:
+                self._trace.write(json.dumps(entry) + "\n")
+                self._trace.flush()
+
+    def to_frame(self):
+        """Return all entries as a DataFrame with the TRACE_FIELDS columns"""
+        with self._lock:
+            frame = pd.DataFrame(list(self.records), columns=list(TRACE_FIELDS))
+        frame["row"] = frame["row"].astype("Int64")
+        frame["cached"] = frame["cached"].fillna(False).astype(bool)
+        return frame
+
+    def _request_frame(self):
+        """
+        to_frame() plus a "sent" flag marking one entry per request sent
+
+        Items of a packed batch share one request: only the first one is
+        flagged, and the copies of the batch's retry count are zeroed.
+        """
+        frame = self.to_frame()
+        repeated = frame["batch_id"].notna() & frame["batch_id"].duplicated()
+        frame["sent"] = ~frame["cached"] & ~repeated
+        frame.loc[repeated, "retries"] = 0
+        return frame
+
+    def summary(self, by="metric"):
+        """
+        Aggregate requests, time, tokens and cost per group
+
+        Args:
+            by: Column or list of columns to group by (default: "metric");
+                e.g. "deployment", "row" or ["metric", "deployment"]
+
+        Returns:
+            pd.DataFrame: requests sent, cache hits, total and p95 duration,
+                share of total time, queue wait, tokens, retries, errors and
+                cost per group; p95 and tokens cover the requests sent only.
+                A packed batch counts as a request in the group of its first item
+        """
+        frame = self._request_frame()
+        frame["errors"] = frame["error"].notna()
+        frame["sent_duration"] = frame["duration"].where(frame["sent"])
+        for column in ("prompt_tokens", "completion_tokens"):
+            frame[column] = frame[column].where(~frame["cached"], 0)
+        grouped = frame.groupby(by, dropna=False)
+        table = grouped.agg(
+            requests=("sent", "sum"),
+            cache_hits=("cached", "sum"),
+            duration=("duration", "sum"),
+            p95_duration=("sent_duration", lambda values: values.quantile(0.95)),
+            queue_wait=("queue_wait", "sum"),
+            prompt_tokens=("prompt_tokens", "sum"),
+            completion_tokens=("completion_tokens", "sum"),
+            retries=("retries", "sum"),
+            errors=("errors", "sum"),
+            cost_usd=("cost_usd", lambda values: values.sum(min_count=1)),
+        )
+        total = table["duration"].sum()
+        table.insert(3, "time_share", table["duration"] / total if total else np.nan)
+        return table.sort_values("duration", ascending=False)
+
+    def slowest_rows(self, n=10):
+        """Dataset rows that account for the most request time"""
+        return self.summary(by="row").head(n)
+
+    def prometheus_text(self, buckets=LATENCY_BUCKETS):
+        """
+        Render a Prometheus text-format summary of all recorded requests
+
+        Histograms of network latency, total duration and queue wait, plus
+        request, cache hit, token, retry, error and cost counters, labelled by
+        kind, deployment and metric. Cache hits only appear in their own
+        counter, so the histograms and the other counters describe requests sent.
+        A packed judge batch is one request: its latency is observed once and
+        its items' token shares add up to the batch's tokens.
+
+        Returns:
+            str: Metrics in the Prometheus exposition format
+        """
+        frame = self._request_frame()
+        for column in ("deployment", "metric"):
+            frame[column] = frame[column].fillna("").astype(str)
+        labels = ["kind", "deployment", "metric"]
+        bounds = np.asarray(buckets, dtype=float)
+        lines = []
+
+        def label_text(key, extra=""):
+            pairs = ",".join(
+                f'{name}="{str(value).replace(chr(34), chr(39))}"' for name, value in zip(labels, key)
+            )
+            return "{" + pairs + (("," + extra) if extra else "") + "}"
+
+        groups = list(frame.groupby(labels, sort=True)) if len(frame) else []
+        rows = {
+            "all": groups,
+            "sent": [(key, group[group["sent"]]) for key, group in groups],
+            "billed": [(key, group[~group["cached"]]) for key, group in groups],
+        }
+        for name, column, help_text in (
+            ("ragas_request_latency_seconds", "latency", "Network latency per request"),
+            ("ragas_request_duration_seconds", "duration", "Total duration per request including queue wait"),
+            ("ragas_request_queue_wait_seconds", "queue_wait", "Rate limiter queue wait and backoff per request"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, group in rows["sent"]:
+                values = group[column].to_numpy(dtype=float)
+                # Cumulative bucket counts in one pass over the sorted values
+                cumulative = np.searchsorted(np.sort(values), bounds, side="right")
+                for bound, count in zip(bounds, cumulative):
+                    le = 'le="%s"' % f"{bound:g}"
+                    lines.append(f"{name}_bucket{label_text(key, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{label_text(key, le)} {len(values)}")
+                lines.append(f"{name}_sum{label_text(key)} {values.sum():.6f}")
+                lines.append(f"{name}_count{label_text(key)} {len(values)}")
+
+        # Requests, errors and retries count once per request; tokens and cost
+        # add up the token shares of every item that was not a cache hit
+        counters = (
+            ("ragas_requests_total", "Requests sent", "sent", lambda g: len(g)),
+            ("ragas_cache_hits_total", "Responses replayed from the LLM cache", "all",
+             lambda g: int(g["cached"].sum())),
+            ("ragas_request_errors_total", "Requests that failed", "sent",
+             lambda g: int(g["error"].notna().sum())),
+            ("ragas_request_retries_total", "Retried attempts", "sent", lambda g: int(g["retries"].sum())),
+            ("ragas_prompt_tokens_total", "Prompt tokens", "billed", lambda g: int(g["prompt_tokens"].sum())),
+            ("ragas_completion_tokens_total", "Completion tokens", "billed",
+             lambda g: int(g["completion_tokens"].sum())),
+            ("ragas_cost_usd_total", "Estimated cost in USD", "billed",
+             lambda g: float(g["cost_usd"].fillna(0).sum())),
+        )
+        for name, help_text, selection, value in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, group in rows[selection]:
+                lines.append(f"{name}{label_text(key)} {value(group)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write prometheus_text() to a file (e.g. for the node_exporter textfile collector)"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        return path
+
+    def close(self):
+        """Close the trace file"""
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+
+class InstrumentedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that records one telemetry entry per request
+
+    Texts are sent in requests of chunk_size so each HTTP request is timed
+    individually. Token counts are estimated with tiktoken.
+
+    Args:
+        embeddings: The LangChain embeddings model to wrap
+        telemetry: TelemetryRecorder receiving the entries
+        deployment: Deployment name recorded with each entry
+        chunk_size: Texts per request (default: the wrapped model's chunk_size or 512)
+    """
+
+    def __init__(self, embeddings, telemetry, deployment, chunk_size=None):
+        self.embeddings = embeddings
+        self.telemetry = telemetry
+        self.deployment = deployment
+        self.chunk_size = chunk_size or getattr(embeddings, "chunk_size", 512)
+
+    def _record(self, chunk, start, error=None):
+        elapsed = time.perf_counter() - start
+        self.telemetry.record(
+            kind="embedding",
+            deployment=self.deployment,
+            prompt_tokens=count_tokens(self.deployment, chunk),
+            tokens_estimated=True,
+            latency=elapsed,
+            error=error,
+        )
+
+    def embed_documents(self, texts):
+        vectors = []
+        for begin in range(0, len(texts), self.chunk_size):
+            chunk = texts[begin:begin + self.chunk_size]
+            start = time.perf_counter()
+            try:
+                vectors.extend(self.embeddings.embed_documents(chunk))
+            except Exception as e:
+                self._record(chunk, start, type(e).__name__)
+                raise
+            self._record(chunk, start)
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        vectors = []
+        for begin in range(0, len(texts), self.chunk_size):
+            chunk = texts[begin:begin + self.chunk_size]
+            start = time.perf_counter()
+            try:
+                vectors.extend(await self.embeddings.aembed_documents(chunk))
+            except Exception as e:
+                self._record(chunk, start, type(e).__name__)
+                raise
+            self._record(chunk, start)
+        return vectors
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
@@ -4,9 +4,11 @@ Simple API Test Script
 Tests EPAM DIAL API connection without Unicode characters
 """
 
-import os
-import requests
-from dotenv import load_dotenv
+try:
+    from .client_factory import get_http_client, read_api_settings
+except ImportError:
+    # Running as a script (python utils/test_api.py)
+    from client_factory import get_http_client, read_api_settings
 
 def test_api():
     """Test EPAM DIAL API connection"""
@@ -14,11 +16,7 @@ def test_api():
     print("=" * 40)
     
     # Load environment variables
-    load_dotenv()
-    
-    api_key = os.getenv('DIAL_API_KEY')
-    azure_endpoint = os.getenv('AZURE_ENDPOINT', 'https://ai-proxy.lab.epam.com')
-    api_version = os.getenv('API_VERSION', '2024-02-01')
+    api_key, azure_endpoint, api_version = read_api_settings()
     
     print(f"API Key: {'Set' if api_key and api_key != 'your_api_key_here' else 'NOT SET'}")
     print(f"Endpoint: {azure_endpoint}")
@@ -39,7 +37,7 @@ def test_api():
         url = f"{azure_endpoint}/openai/deployments?api-version={api_version}"
         print(f"\nTesting URL: {url}")
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_client().get(url, headers=headers, timeout=10)
         
         if response.status_code == 200:
             print("SUCCESS: API connection working!")